@@ -1,390 +1,326 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-import seaborn as sns
-from sqlalchemy import create_engine
+import argparse
+import os
+import sys
 import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.db import DB_PATH, bulk_load, checkpoint, district_join, ensure_indexes, get_engine
+from utils import db, profiling, summaries
+from utils.pipeline import Pipeline
+from utils.render import MANIFEST, PANELS, RENDER_DIR, DashboardTemplate, _tidy, draw_area, draw_mgnrega, draw_states, draw_tiers, render_dashboards
+from utils.summaries import assign_tiers, read_summary, rebuild_summaries
+
 warnings.filterwarnings('ignore')
 
-# 
+# District-level financial inclusion analysis as a pipeline of cached phases.
+# Phases whose code and inputs are unchanged are loaded from .pipeline/ instead of re-run;
+# independent phases (EDA, the silhouette sweep, every chart) run in parallel.
+#
+#   python analysis.py                      # run what changed, print findings and timings
+#   python analysis.py --force              # re-run every phase
+#   python analysis.py --force dashboard    # re-render one phase
+#   python analysis.py --only eda silhouette --jobs 2
+#   python analysis.py --force tiers --profile  # cProfile + tracemalloc per phase into reports/profiles/
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_PNG = os.path.join(BASE_DIR, "financial_inclusion_dashboard.png")
+CHART_DIR = os.path.join(BASE_DIR, "reports", "analysis")
+
+FEATURES = ['zero_balance_pct', 'avg_balance_inr', 'banking_outlets_per_1000', 'mgnrega_coverage_pct', 'mobile_banking_pct']
+
+pipeline = Pipeline()
+
+
+#
 # PHASE 1: DATA ENGINEERING - Build the SQLite Database
-# 
-
-# Create SQLite database engine
-engine = create_engine('sqlite:///jandhan_analysis.db')
-
-#  TABLE 1: PMJDY Account Data 
-pmjdy_data = {
-    'district_id': list(range(1, 25)),
-    'district': [
-        'Lucknow', 'Gorakhpur', 'Allahabad',
-        'Mumbai', 'Pune', 'Nashik',
-        'Patna', 'Gaya', 'Muzaffarpur',
-        'Jaipur', 'Jodhpur', 'Udaipur',
-        'Thiruvananthapuram', 'Kochi', 'Kozhikode',
-        'Ahmedabad', 'Surat', 'Rajkot',
-        'Bhopal', 'Indore', 'Jabalpur',
-        'Kolkata', 'Howrah', 'Murshidabad',
-    ],
-    'state': [
-        'Uttar Pradesh', 'Uttar Pradesh', 'Uttar Pradesh',
-        'Maharashtra', 'Maharashtra', 'Maharashtra',
-        'Bihar', 'Bihar', 'Bihar',
-        'Rajasthan', 'Rajasthan', 'Rajasthan',
-        'Kerala', 'Kerala', 'Kerala',
-        'Gujarat', 'Gujarat', 'Gujarat',
-        'Madhya Pradesh', 'Madhya Pradesh', 'Madhya Pradesh',
-        'West Bengal', 'West Bengal', 'West Bengal',
-    ],
-    'area_type': [
-        'Urban', 'Rural', 'Semi-Urban',
-        'Urban', 'Urban', 'Semi-Urban',
-        'Semi-Urban', 'Rural', 'Rural',
-        'Urban', 'Semi-Urban', 'Rural',
-        'Urban', 'Urban', 'Semi-Urban',
-        'Urban', 'Urban', 'Semi-Urban',
-        'Urban', 'Urban', 'Semi-Urban',
-        'Urban', 'Urban', 'Rural',
-    ],
-    'total_accounts_lakh': [
-        18.4, 9.2, 11.3,
-        22.1, 16.8, 8.4,
-        6.2, 4.1, 3.8,
-        12.3, 7.6, 5.2,
-        9.8, 11.2, 7.3,
-        14.5, 13.1, 8.9,
-        8.7, 10.2, 6.1,
-        19.3, 12.4, 4.9,
-    ],
-    'zero_balance_pct': [
-        22, 48, 35,
-        18, 20, 31,
-        52, 61, 58,
-        28, 39, 51,
-        12, 14, 19,
-        21, 23, 30,
-        41, 35, 44,
-        25, 28, 55,
-    ],
-    'avg_balance_inr': [
-        3200, 890, 1450,
-        4800, 3900, 2100,
-        720, 480, 510,
-        2600, 1400, 820,
-        5200, 4800, 3100,
-        3800, 3500, 2200,
-        1100, 1800, 950,
-        2900, 2400, 640,
-    ],
-}
-
-#  TABLE 2: MGNREGA & Infrastructure Data 
-infra_data = {
-    'district_id': list(range(1, 25)),
-    'mgnrega_coverage_pct': [
-        45, 78, 62,
-        28, 31, 55,
-        81, 89, 85,
-        52, 66, 79,
-        22, 25, 38,
-        35, 30, 48,
-        69, 58, 72,
-        44, 40, 82,
-    ],
-    'banking_outlets_per_1000': [
-        3.2, 0.8, 1.6,
-        5.1, 4.2, 2.3,
-        1.1, 0.5, 0.6,
-        2.8, 1.7, 1.0,
-        4.9, 5.3, 3.8,
-        3.9, 4.1, 2.7,
-        1.8, 2.5, 1.4,
-        3.4, 3.1, 0.7,
-    ],
-    'bc_agents_per_1000': [
-        1.8, 0.4, 0.9,
-        2.9, 2.4, 1.2,
-        0.5, 0.2, 0.3,
-        1.5, 0.9, 0.5,
-        2.6, 2.9, 2.1,
-        2.2, 2.3, 1.5,
-        0.9, 1.4, 0.8,
-        1.9, 1.7, 0.3,
-    ],
-    'mobile_banking_pct': [
-        42, 18, 28,
-        58, 52, 35,
-        15, 10, 12,
-        38, 25, 17,
-        61, 65, 48,
-        55, 57, 40,
-        28, 38, 24,
-        45, 42, 13,
-    ],
-}
-
-#  Save tables to SQLite database 
-df_pmjdy = pd.DataFrame(pmjdy_data)
-df_infra = pd.DataFrame(infra_data)
-
-df_pmjdy.to_sql('pmjdy_accounts', engine, if_exists='replace', index=False)
-df_infra.to_sql('infrastructure', engine, if_exists='replace', index=False)
-
-print(" SQLite database created: jandhan_analysis.db")
-print(f"    pmjdy_accounts table: {len(df_pmjdy)} rows")
-print(f"    infrastructure table: {len(df_infra)} rows")
-
-# 
+#
+
+@pipeline.phase()
+def source_tables():
+    """The raw PMJDY and infrastructure tables - editing the data here invalidates everything downstream"""
+    #  TABLE 1: PMJDY Account Data
+    pmjdy_data = {
+        'district_id': list(range(1, 25)),
+        'district': [
+            'Lucknow', 'Gorakhpur', 'Allahabad',
+            'Mumbai', 'Pune', 'Nashik',
+            'Patna', 'Gaya', 'Muzaffarpur',
+            'Jaipur', 'Jodhpur', 'Udaipur',
+            'Thiruvananthapuram', 'Kochi', 'Kozhikode',
+            'Ahmedabad', 'Surat', 'Rajkot',
+            'Bhopal', 'Indore', 'Jabalpur',
+            'Kolkata', 'Howrah', 'Murshidabad',
+        ],
+        'state': [
+            'Uttar Pradesh', 'Uttar Pradesh', 'Uttar Pradesh',
+            'Maharashtra', 'Maharashtra', 'Maharashtra',
+            'Bihar', 'Bihar', 'Bihar',
+            'Rajasthan', 'Rajasthan', 'Rajasthan',
+            'Kerala', 'Kerala', 'Kerala',
+            'Gujarat', 'Gujarat', 'Gujarat',
+            'Madhya Pradesh', 'Madhya Pradesh', 'Madhya Pradesh',
+            'West Bengal', 'West Bengal', 'West Bengal',
+        ],
+        'area_type': [
+            'Urban', 'Rural', 'Semi-Urban',
+            'Urban', 'Urban', 'Semi-Urban',
+            'Semi-Urban', 'Rural', 'Rural',
+            'Urban', 'Semi-Urban', 'Rural',
+            'Urban', 'Urban', 'Semi-Urban',
+            'Urban', 'Urban', 'Semi-Urban',
+            'Urban', 'Urban', 'Semi-Urban',
+            'Urban', 'Urban', 'Rural',
+        ],
+        'total_accounts_lakh': [
+            18.4, 9.2, 11.3,
+            22.1, 16.8, 8.4,
+            6.2, 4.1, 3.8,
+            12.3, 7.6, 5.2,
+            9.8, 11.2, 7.3,
+            14.5, 13.1, 8.9,
+            8.7, 10.2, 6.1,
+            19.3, 12.4, 4.9,
+        ],
+        'zero_balance_pct': [
+            22, 48, 35,
+            18, 20, 31,
+            52, 61, 58,
+            28, 39, 51,
+            12, 14, 19,
+            21, 23, 30,
+            41, 35, 44,
+            25, 28, 55,
+        ],
+        'avg_balance_inr': [
+            3200, 890, 1450,
+            4800, 3900, 2100,
+            720, 480, 510,
+            2600, 1400, 820,
+            5200, 4800, 3100,
+            3800, 3500, 2200,
+            1100, 1800, 950,
+            2900, 2400, 640,
+        ],
+    }
+
+    #  TABLE 2: MGNREGA & Infrastructure Data
+    infra_data = {
+        'district_id': list(range(1, 25)),
+        'mgnrega_coverage_pct': [
+            45, 78, 62,
+            28, 31, 55,
+            81, 89, 85,
+            52, 66, 79,
+            22, 25, 38,
+            35, 30, 48,
+            69, 58, 72,
+            44, 40, 82,
+        ],
+        'banking_outlets_per_1000': [
+            3.2, 0.8, 1.6,
+            5.1, 4.2, 2.3,
+            1.1, 0.5, 0.6,
+            2.8, 1.7, 1.0,
+            4.9, 5.3, 3.8,
+            3.9, 4.1, 2.7,
+            1.8, 2.5, 1.4,
+            3.4, 3.1, 0.7,
+        ],
+        'bc_agents_per_1000': [
+            1.8, 0.4, 0.9,
+            2.9, 2.4, 1.2,
+            0.5, 0.2, 0.3,
+            1.5, 0.9, 0.5,
+            2.6, 2.9, 2.1,
+            2.2, 2.3, 1.5,
+            0.9, 1.4, 0.8,
+            1.9, 1.7, 0.3,
+        ],
+        'mobile_banking_pct': [
+            42, 18, 28,
+            58, 52, 35,
+            15, 10, 12,
+            38, 25, 17,
+            61, 65, 48,
+            55, 57, 40,
+            28, 38, 24,
+            45, 42, 13,
+        ],
+    }
+
+    return {"pmjdy_accounts": pd.DataFrame(pmjdy_data), "infrastructure": pd.DataFrame(infra_data)}
+
+
+@pipeline.phase(deps=["source_tables"], outputs=[DB_PATH], uses=[db, summaries])
+def build_db(source_tables):
+    engine = get_engine()
+    for name, table in source_tables.items():
+        bulk_load(table, name, engine, mode="replace")
+    ensure_indexes(engine)
+    rebuild_summaries(engine)
+    checkpoint(engine)
+    return {name: len(table) for name, table in source_tables.items()}
+
+
+#
 # PHASE 2: SQL QUERIES - Extract & Merge
-# 
-
-query = """
-    SELECT 
-        p.district,
-        p.state,
-        p.area_type,
-        p.total_accounts_lakh,
-        p.zero_balance_pct,
-        p.avg_balance_inr,
-        i.mgnrega_coverage_pct,
-        i.banking_outlets_per_1000,
-        i.bc_agents_per_1000,
-        i.mobile_banking_pct
-    FROM pmjdy_accounts p
-    JOIN infrastructure i ON p.district_id = i.district_id
-"""
+#
 
-df = pd.read_sql(query, engine)
-print(f"\n Master dataset loaded: {df.shape[0]} districts, {df.shape[1]} features")
+@pipeline.phase(deps=["build_db"], uses=[db])
+def master(build_db):
+    return district_join(engine=get_engine(readonly=True))
 
-# 
+
+#
 # PHASE 3: EXPLORATORY DATA ANALYSIS
-# 
-
-print("\n" + "="*60)
-print("FINDING 1: Zero-Balance Rate by Area Type")
-print("="*60)
-area_summary = df.groupby('area_type').agg(
-    Avg_Zero_Balance=('zero_balance_pct', 'mean'),
-    Avg_Balance_INR=('avg_balance_inr', 'mean'),
-    Total_Accounts_Lakh=('total_accounts_lakh', 'sum')
-).round(2)
-print(area_summary)
-rural_zero = area_summary.loc['Rural', 'Avg_Zero_Balance']
-urban_zero = area_summary.loc['Urban', 'Avg_Zero_Balance']
-ratio = rural_zero / urban_zero
-print(f"\n Rural zero-balance rate is {ratio:.1f}x higher than urban")
-
-print("\n" + "="*60)
-print("FINDING 2: MGNREGA Coverage vs Average Balance")
-print("="*60)
-corr = df['mgnrega_coverage_pct'].corr(df['avg_balance_inr'])
-print(f"Pearson Correlation: {corr:.3f}")
-print(" Districts with high MGNREGA coverage show lower average balances")
-print("  Wages deposited and immediately withdrawn - deep cash dependency")
-
-print("\n" + "="*60)
-print("FINDING 3: Banking Infrastructure Gap")
-print("="*60)
-outlet_gap = df.groupby('area_type')['banking_outlets_per_1000'].mean()
-urban_outlets = outlet_gap['Urban']
-rural_outlets = outlet_gap['Rural']
-gap = urban_outlets / rural_outlets
-print(f"Urban outlets per 1000: {urban_outlets:.2f}")
-print(f"Rural outlets per 1000: {rural_outlets:.2f}")
-print(f"Gap: {gap:.1f}x - Urban has {gap:.1f}x more banking touchpoints")
-
-print("\n" + "="*60)
-print("FINDING 4: State-wise Performance")
-print("="*60)
-state_summary = df.groupby('state').agg(
-    Avg_Zero_Balance=('zero_balance_pct', 'mean'),
-    Avg_Balance_INR=('avg_balance_inr', 'mean'),
-    Avg_Outlets=('banking_outlets_per_1000', 'mean')
-).round(2).sort_values('Avg_Zero_Balance', ascending=True)
-print(state_summary)
-
-# 
+#
+
+@pipeline.phase(deps=["build_db", "master"], uses=[db, summaries])
+def eda(build_db, master):
+    # Group summaries come pre-aggregated from the summary tables build_db maintains
+    df = master
+    engine = get_engine(readonly=True)
+    area = read_summary("area_type", engine)
+    area_summary = area[['Avg_Zero_Balance', 'Avg_Balance_INR', 'Total_Accounts_Lakh']]
+    outlet_gap = area['Avg_Outlets']
+    state_summary = read_summary("state", engine)[['Avg_Zero_Balance', 'Avg_Balance_INR', 'Avg_Outlets']] \
+        .sort_values('Avg_Zero_Balance', ascending=True)
+    return {
+        "area_summary": area_summary,
+        "ratio": area_summary.loc['Rural', 'Avg_Zero_Balance'] / area_summary.loc['Urban', 'Avg_Zero_Balance'],
+        "corr": df['mgnrega_coverage_pct'].corr(df['avg_balance_inr']),
+        "urban_outlets": outlet_gap['Urban'],
+        "rural_outlets": outlet_gap['Rural'],
+        "gap": outlet_gap['Urban'] / outlet_gap['Rural'],
+        "state_summary": state_summary,
+    }
+
+
+#
 # PHASE 4: MACHINE LEARNING - District Segmentation
-# 
-
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-
-print("\n" + "="*60)
-print("ML: K-Means District Segmentation")
-print("="*60)
-
-features = df[[
-    'zero_balance_pct',
-    'avg_balance_inr',
-    'banking_outlets_per_1000',
-    'mgnrega_coverage_pct',
-    'mobile_banking_pct'
-]].copy()
-
-scaler = StandardScaler()
-features_scaled = scaler.fit_transform(features)
-
-# Find optimal k using silhouette score
-silhouette_scores = []
-for k in range(2, 6):
-    km = KMeans(n_clusters=k, random_state=42, n_init=10)
-    labels = km.fit_predict(features_scaled)
-    score = silhouette_score(features_scaled, labels)
-    silhouette_scores.append(score)
-    print(f"  k={k}: silhouette score = {score:.3f}")
-
-optimal_k = silhouette_scores.index(max(silhouette_scores)) + 2
-print(f"\n Optimal clusters: {optimal_k}")
-
-km_final = KMeans(n_clusters=3, random_state=42, n_init=10)
-df['cluster'] = km_final.fit_predict(features_scaled)
-
-# Label clusters by zero-balance rate
-cluster_means = df.groupby('cluster')['zero_balance_pct'].mean()
-sorted_clusters = cluster_means.sort_values()
-label_map = {
-    sorted_clusters.index[0]: 'On Track',
-    sorted_clusters.index[1]: 'Medium Priority',
-    sorted_clusters.index[2]: 'High Priority'
-}
-df['intervention_tier'] = df['cluster'].map(label_map)
-
-tier_summary = df.groupby('intervention_tier').agg(
-    Districts=('district', 'count'),
-    Avg_Zero_Balance=('zero_balance_pct', 'mean'),
-    Avg_Balance_INR=('avg_balance_inr', 'mean'),
-    Avg_Outlets=('banking_outlets_per_1000', 'mean')
-).round(2)
-print("\n Intervention Tiers ")
-print(tier_summary)
-
-# 
-# PHASE 5: VISUALIZATIONS - 4-Panel Dashboard
-# 
-
-colors = {
-    'Urban': '#1F4E79',
-    'Semi-Urban': '#2E86AB',
-    'Rural': '#E84855'
-}
-
-tier_colors = {
-    'High Priority': '#E84855',
-    'Medium Priority': '#F4A261',
-    'On Track': '#2A9D8F'
-}
-
-fig, axes = plt.subplots(2, 2, figsize=(18, 14))
-fig.suptitle(
-    'Why Are Jan Dhan Accounts Lying Empty?\nDistrict-Level Financial Inclusion Analysis - India',
-    fontsize=16, fontweight='bold', y=1.03
-)
-
-#  Chart 1: Zero Balance by Area Type 
-ax1 = axes[0, 0]
-area_zero = df.groupby('area_type')['zero_balance_pct'].mean()
-bar_colors = [colors[a] for a in area_zero.index]
-bars = ax1.bar(area_zero.index, area_zero.values,
-               color=bar_colors, width=0.5, edgecolor='white', linewidth=1.5)
-ax1.set_title('Zero-Balance Rate by Area Type', fontweight='bold', pad=10)
-ax1.set_ylabel('Avg Zero-Balance Accounts (%)')
-ax1.set_ylim(0, 80)
-for bar, val in zip(bars, area_zero.values):
-    ax1.text(bar.get_x() + bar.get_width()/2,
-             bar.get_height() + 1.5,
-             f'{val:.1f}%', ha='center', fontweight='bold', fontsize=11)
-ax1.spines['top'].set_visible(False)
-ax1.spines['right'].set_visible(False)
-ax1.set_facecolor('#F8F9FA')
-
-#  Chart 2: MGNREGA vs Avg Balance Scatter 
-ax2 = axes[0, 1]
-for area, grp in df.groupby('area_type'):
-    ax2.scatter(grp['mgnrega_coverage_pct'], grp['avg_balance_inr'],
-                color=colors[area], label=area, s=90, alpha=0.85,
-                edgecolors='white', linewidth=0.8)
-z = np.polyfit(df['mgnrega_coverage_pct'], df['avg_balance_inr'], 1)
-p = np.poly1d(z)
-x_line = np.linspace(df['mgnrega_coverage_pct'].min(),
-                     df['mgnrega_coverage_pct'].max(), 100)
-ax2.plot(x_line, p(x_line), 'gray', linestyle='--', linewidth=1.5, alpha=0.7)
-ax2.set_title(f'MGNREGA Coverage vs Avg Account Balance\n(r = {corr:.2f}  - cash dependency effect)',
-              fontweight='bold', pad=10)
-ax2.set_xlabel('MGNREGA Coverage (%)')
-ax2.set_ylabel('Avg Balance (INR)')
-ax2.legend(title='Area Type', framealpha=0.9)
-ax2.spines['top'].set_visible(False)
-ax2.spines['right'].set_visible(False)
-ax2.set_facecolor('#F8F9FA')
-
-#  Chart 3: State-wise Zero Balance 
-ax3 = axes[1, 0]
-state_zero = df.groupby('state')['zero_balance_pct'].mean().sort_values()
-bar_clrs = ['#E84855' if v > 40 else '#F4A261' if v > 25 else '#2A9D8F'
-            for v in state_zero.values]
-bars3 = ax3.barh(state_zero.index, state_zero.values,
-                 color=bar_clrs, edgecolor='white', linewidth=1)
-ax3.set_title('State-wise Zero-Balance Rate\n(Red = High Concern > 40%)',
-              fontweight='bold', pad=10)
-ax3.set_xlabel('Avg Zero-Balance Accounts (%)')
-ax3.axvline(x=40, color='#E84855', linestyle='--',
-            linewidth=1.2, alpha=0.6, label='40% threshold')
-ax3.legend(fontsize=9)
-for bar, val in zip(bars3, state_zero.values):
-    ax3.text(val + 0.5, bar.get_y() + bar.get_height()/2,
-             f'{val:.1f}%', va='center', fontsize=9)
-ax3.spines['top'].set_visible(False)
-ax3.spines['right'].set_visible(False)
-ax3.set_facecolor('#F8F9FA')
-
-#  Chart 4: Intervention Tier Map 
-ax4 = axes[1, 1]
-tier_counts = df['intervention_tier'].value_counts()
-wedge_colors = [tier_colors[t] for t in tier_counts.index]
-wedges, texts, autotexts = ax4.pie(
-    tier_counts.values,
-    labels=tier_counts.index,
-    colors=wedge_colors,
-    autopct='%1.0f%%',
-    startangle=90,
-    pctdistance=0.75,
-    wedgeprops={'edgecolor': 'white', 'linewidth': 2}
-)
-for text in texts:
-    text.set_fontweight('bold')
-for autotext in autotexts:
-    autotext.set_fontweight('bold')
-    autotext.set_color('white')
-ax4.set_title('District Intervention Tiers\n(ML Clustering - 3 Priority Groups)',
-              fontweight='bold', pad=10)
-
-plt.tight_layout(pad=4.0)
-plt.savefig('financial_inclusion_dashboard.png',
-            dpi=180, bbox_inches='tight', facecolor='white')
-plt.show()
-print("\n Dashboard saved: financial_inclusion_dashboard.png")
-
-# 
-# PHASE 6: POLICY BRIEF - Print to Console
-# 
-
-print("\n" + "="*60)
-print("POLICY BRIEF: 3 RECOMMENDATIONS FOR GOVERNMENT")
-print("="*60)
-print(f"""
+#
+
+@pipeline.phase(deps=["master"])
+def silhouette(master):
+    """Silhouette score for k = 2..5 - reported alongside the fixed 3-tier segmentation"""
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    features_scaled = StandardScaler().fit_transform(master[FEATURES])
+    scores = {}
+    for k in range(2, 6):
+        km = KMeans(n_clusters=k, random_state=42, n_init=10)
+        scores[k] = silhouette_score(features_scaled, km.fit_predict(features_scaled))
+    return {"scores": scores, "optimal_k": max(scores, key=scores.get)}
+
+
+@pipeline.phase(deps=["master"])
+def segments(master):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.cluster import KMeans
+
+    df = master.copy()
+    features_scaled = StandardScaler().fit_transform(df[FEATURES])
+    km_final = KMeans(n_clusters=3, random_state=42, n_init=10)
+    df['cluster'] = km_final.fit_predict(features_scaled)
+
+    # Label clusters by zero-balance rate
+    sorted_clusters = df.groupby('cluster')['zero_balance_pct'].mean().sort_values()
+    label_map = {
+        sorted_clusters.index[0]: 'On Track',
+        sorted_clusters.index[1]: 'Medium Priority',
+        sorted_clusters.index[2]: 'High Priority'
+    }
+    df['intervention_tier'] = df['cluster'].map(label_map)
+    return {"df": df}
+
+
+@pipeline.phase(deps=["build_db", "segments"], updates=[DB_PATH], uses=[db, summaries])
+def tiers(build_db, segments):
+    """Publish the tiers to the database - only districts whose tier changed move between summary rows"""
+    engine = get_engine()
+    with engine.connect() as conn:
+        ids = pd.read_sql("SELECT district_id, state, district FROM pmjdy_accounts", conn)
+    df = segments["df"].merge(ids, on=['state', 'district'])
+    assign_tiers(df.set_index('district_id')['intervention_tier'], engine)
+    checkpoint(engine)
+    return read_summary("tier", engine)[['Districts', 'Avg_Zero_Balance', 'Avg_Balance_INR', 'Avg_Outlets']]
+
+
+#
+# PHASE 5: VISUALIZATIONS - one PNG per chart plus the 4-panel dashboard
+#
+
+def _save_chart(name, draw, *args):
+    os.makedirs(CHART_DIR, exist_ok=True)
+    path = os.path.join(CHART_DIR, f"{name}.png")
+    fig, ax = plt.subplots(figsize=(9, 7))
+    draw(ax, *args)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return path
+
+
+@pipeline.phase(deps=["master"], outputs=[os.path.join(CHART_DIR, "zero_balance_by_area.png")], uses=[draw_area, _tidy, _save_chart])
+def chart_area(master):
+    return _save_chart("zero_balance_by_area", draw_area, master)
+
+
+@pipeline.phase(deps=["master", "eda"], outputs=[os.path.join(CHART_DIR, "mgnrega_vs_balance.png")], uses=[draw_mgnrega, _tidy, _save_chart])
+def chart_mgnrega(master, eda):
+    return _save_chart("mgnrega_vs_balance", draw_mgnrega, master, eda["corr"])
+
+
+@pipeline.phase(deps=["master"], outputs=[os.path.join(CHART_DIR, "zero_balance_by_state.png")], uses=[draw_states, _tidy, _save_chart])
+def chart_states(master):
+    return _save_chart("zero_balance_by_state", draw_states, master)
+
+
+@pipeline.phase(deps=["segments"], outputs=[os.path.join(CHART_DIR, "intervention_tiers.png")], uses=[draw_tiers, _save_chart])
+def chart_tiers(segments):
+    return _save_chart("intervention_tiers", draw_tiers, segments["df"])
+
+
+@pipeline.phase(deps=["segments"], outputs=[DASHBOARD_PNG], uses=PANELS + (DashboardTemplate,))
+def dashboard(segments):
+    template = DashboardTemplate()
+    template.render(segments["df"], DASHBOARD_PNG,
+                    'Why Are Jan Dhan Accounts Lying Empty?\nDistrict-Level Financial Inclusion Analysis - India')
+    template.close()
+    return DASHBOARD_PNG
+
+
+@pipeline.phase(deps=["segments"], outputs=[os.path.join(RENDER_DIR, MANIFEST)],
+                uses=PANELS + (DashboardTemplate, render_dashboards))
+def group_dashboards(segments):
+    """The same dashboard per state and per region - unchanged groups are skipped by render_dashboards"""
+    result = render_dashboards(segments["df"])
+    return {k: result[k] for k in ("rendered", "skipped")}
+
+
+#
+# PHASE 6: POLICY BRIEF
+#
+
+@pipeline.phase(deps=["eda"])
+def policy_brief(eda):
+    return f"""
 FINDING 1 - Account Activation, Not Opening, Is the Crisis
-  Rural districts show {ratio:.1f}x higher zero-balance rates than urban.
+  Rural districts show {eda['ratio']:.1f}x higher zero-balance rates than urban.
   India has succeeded at opening accounts. The failure is activation.
   RECOMMENDATION: Shift PM Jan Dhan targets from accounts opened
   to accounts actively transacting. Incentivize Business Correspondents
   per active account, not per account opened.
 
 FINDING 2 - MGNREGA Wages Are Reinforcing Cash Dependency
-  Correlation of {corr:.2f} between MGNREGA coverage and average balance.
+  Correlation of {eda['corr']:.2f} between MGNREGA coverage and average balance.
   Districts with highest rural employment coverage show lowest balances
   - wages arrive and are immediately withdrawn.
   RECOMMENDATION: Mandate DBT payment cycles that keep a minimum
@@ -392,12 +328,87 @@ FINDING 2 - MGNREGA Wages Are Reinforcing Cash Dependency
   literacy camps at MGNREGA worksites.
 
 FINDING 3 - 4x Infrastructure Gap Requires Targeted BC Expansion
-  Urban areas have {gap:.1f}x more banking outlets per capita than rural.
+  Urban areas have {eda['gap']:.1f}x more banking outlets per capita than rural.
   This is the single biggest structural barrier to inclusion.
   RECOMMENDATION: Use this district segmentation model to prioritize
   BC network expansion in High Priority tier districts first - where
   infrastructure deficit and zero-balance rates are both highest.
   Estimated 8-12 districts qualify for immediate intervention.
-""")
+"""
+
 
-print(" Analysis complete. Run: streamlit run dashboard.py")
\ No newline at end of file
+def print_findings(results):
+    """Console report from phase results - works the same whether a phase ran or came from the cache"""
+    def section(title):
+        print("\n" + "="*60)
+        print(title)
+        print("="*60)
+
+    if "build_db" in results:
+        print(f"\n SQLite database: {os.path.basename(DB_PATH)}")
+        for name, rows in results["build_db"].items():
+            print(f"    {name} table: {rows} rows")
+    if "master" in results:
+        print(f"\n Master dataset loaded: {results['master'].shape[0]} districts, {results['master'].shape[1]} features")
+    if "eda" in results:
+        e = results["eda"]
+        section("FINDING 1: Zero-Balance Rate by Area Type")
+        print(e["area_summary"])
+        print(f"\n Rural zero-balance rate is {e['ratio']:.1f}x higher than urban")
+        section("FINDING 2: MGNREGA Coverage vs Average Balance")
+        print(f"Pearson Correlation: {e['corr']:.3f}")
+        print(" Districts with high MGNREGA coverage show lower average balances")
+        print("  Wages deposited and immediately withdrawn - deep cash dependency")
+        section("FINDING 3: Banking Infrastructure Gap")
+        print(f"Urban outlets per 1000: {e['urban_outlets']:.2f}")
+        print(f"Rural outlets per 1000: {e['rural_outlets']:.2f}")
+        print(f"Gap: {e['gap']:.1f}x - Urban has {e['gap']:.1f}x more banking touchpoints")
+        section("FINDING 4: State-wise Performance")
+        print(e["state_summary"])
+    if "silhouette" in results or "segments" in results:
+        section("ML: K-Means District Segmentation")
+    if "silhouette" in results:
+        for k, score in results["silhouette"]["scores"].items():
+            print(f"  k={k}: silhouette score = {score:.3f}")
+        print(f"\n Optimal clusters: {results['silhouette']['optimal_k']}")
+    if "tiers" in results:
+        print("\n Intervention Tiers ")
+        print(results["tiers"])
+    if "dashboard" in results:
+        print(f"\n Dashboard saved: {os.path.relpath(results['dashboard'], BASE_DIR)}")
+    if "group_dashboards" in results:
+        g = results["group_dashboards"]
+        print(f" State and region dashboards: {g['rendered']} rendered, {g['skipped']} unchanged "
+              f"(reports/dashboards/)")
+    if "policy_brief" in results:
+        section("POLICY BRIEF: 3 RECOMMENDATIONS FOR GOVERNMENT")
+        print(results["policy_brief"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the district financial inclusion analysis pipeline")
+    parser.add_argument("--only", nargs="+", metavar="PHASE", help="run these phases (and what they depend on)")
+    parser.add_argument("--force", nargs="*", metavar="PHASE", help="re-run these phases, or every phase if none are named")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for independent phases (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true", help="print only the phase timings")
+    parser.add_argument("--list", action="store_true", help="list phases and their dependencies")
+    parser.add_argument("--profile", action="store_true", default=profiling.enabled(),
+                        help="profile every phase that runs (also on with PMJDY_PROFILE=1); cached phases are not")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, phase in pipeline.phases.items():
+            print(f"  {name:<16} <- {', '.join(phase.deps) or '-'}")
+        sys.exit(0)
+
+    force = True if args.force == [] else (args.force or ())
+    profile_dir = profiling.new_run_dir("analysis") if args.profile else None
+    print(" Phases:")
+    results, report = pipeline.run(args.only, force=force, jobs=args.jobs, profile_dir=profile_dir)
+    if profile_dir:
+        print(f" Profiles written to {profile_dir} - view with: python profile_report.py")
+    ran = [r for r in report if r["status"] == "ran"]
+    print(f" {len(ran)} ran, {len(report) - len(ran)} cached")
+    if not args.quiet:
+        print_findings(results)
+        print(" Analysis complete. Run: streamlit run dashboard.py")
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+
+import uvicorn
+
+sys.path.append(os.path.dirname(__file__))
+from utils.api import create_app
+from utils.snapshot import SNAPSHOT_DIR
+
+# Local JSON / Arrow API over the dashboard's snapshot, for systems that need the same numbers
+# without going through Streamlit. Responses carry an ETag (send If-None-Match to get a 304)
+# and are gzipped for clients that accept it. Add ?format=arrow for an Arrow IPC stream.
+#
+#   python build_snapshot.py && python api.py --port 8600
+#   curl localhost:8600/tiers
+#   curl "localhost:8600/frames/maharashtra?columns=District,Growth_2022_2024"
+#   curl -o gaps.arrow "localhost:8600/underperformers?all=1&format=arrow"
+#   python api.py --workers 4                   # one process per core
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve PMJDY frames and model outputs as a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1, help="server processes, each holding its own snapshot")
+    parser.add_argument("--snapshots", default=SNAPSHOT_DIR, help="directory build_snapshot.py writes to")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Worker processes import the app themselves, so the snapshot directory goes through the environment
+        os.environ["PMJDY_API_SNAPSHOTS"] = args.snapshots
+        uvicorn.run("utils.api:app_from_env", factory=True, host=args.host, port=args.port, workers=args.workers,
+                    access_log=args.access_log, app_dir=os.path.dirname(os.path.abspath(__file__)))
+    else:
+        uvicorn.run(create_app(args.snapshots), host=args.host, port=args.port, access_log=args.access_log)
@@ -1,29 +1,18 @@
 import streamlit as st
-import pandas as pd
 import sys
 import os
 
 sys.path.append(os.path.dirname(__file__))
-from utils.data_loader import load_state_data, load_bihar_districts, load_karnataka_districts, load_maharashtra_districts
+from utils.snapshot import get_frames
+from utils.cube import get_cube
+from utils.page import setup_page
+from utils.search import search_box
 
-# Page Config
-st.set_page_config(
-    page_title="Financial Inclusion Analysis Dashboard - India",
-    page_icon="",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Load CSS
-with open(os.path.join(os.path.dirname(__file__), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Page Config + CSS
+setup_page("Financial Inclusion Analysis Dashboard - India", initial_sidebar_state="expanded")
 
 # Load Data
-@st.cache_data
-def get_data():
-    return load_state_data()
-
-df = get_data()
+df = get_frames("states")
 
 #
 # SIDEBAR
@@ -31,6 +20,7 @@ df = get_data()
 with st.sidebar:
     st.markdown("## Financial Inclusion Dashboard")
     st.markdown("**India's PMJDY Analysis Monitor**")
+    search_box()
     st.markdown("---")
     st.markdown("### Navigate To")
     st.page_link("app.py", label="Home")
@@ -122,9 +112,10 @@ with st.expander("What is PMJDY? - Click to read", expanded=True):
 st.markdown("---")
 st.markdown("### National Snapshot - As of 2024")
 
-total_accounts = df["Accounts"].sum()
-total_deposit = df["Deposit_Crore"].sum()
-avg_balance = (total_deposit * 1e7 / total_accounts)
+national = get_cube().cell()
+total_accounts = national["accounts"]
+total_deposit = national["deposit_crore"]
+avg_balance = national["Avg_Balance_INR"]
 top_state = df.loc[df["Accounts"].idxmax(), "State"]
 best_balance_state = df.loc[df["Avg_Balance_INR"].idxmax(), "State"]
 
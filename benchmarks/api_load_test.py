@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+# Load test for api.py: N keep-alive connections request a mix of endpoints as fast as they can,
+# a share of them revalidating with If-None-Match, and we report requests/s and latency percentiles.
+# Plain asyncio streams, so it needs nothing beyond the standard library.
+#
+#   python api.py --port 8600 &
+#   python benchmarks/api_load_test.py --port 8600 --connections 32 --seconds 10
+
+PATHS = ["/tiers", "/underperformers", "/forecasts", "/metrics", "/frames/states_ml",
+         "/frames/maharashtra?columns=District,Growth_2022_2024", "/anomalies/bihar", "/tiers?format=arrow"]
+PERCENTILES = [50, 90, 99]
+
+
+async def _request(reader, writer, host, path, etag=None):
+    headers = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n"
+    if etag:
+        headers += f"If-None-Match: {etag}\r\n"
+    writer.write((headers + "\r\n").encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    length, tag = 0, None
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "etag":
+            tag = value.strip()
+    if length:
+        await reader.readexactly(length)
+    return int(status_line.split()[1]), tag
+
+
+async def _client(host, port, deadline, revalidate, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            path = random.choice(PATHS)
+            t = time.perf_counter()
+            status, tag = await _request(reader, writer, host, path,
+                                         etags.get(path) if random.random() < revalidate else None)
+            latencies.append(time.perf_counter() - t)
+            statuses[status] = statuses.get(status, 0) + 1
+            if tag:
+                etags[path] = tag
+    finally:
+        writer.close()
+
+
+async def run(host, port, connections, seconds, revalidate):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, deadline, revalidate, latencies, statuses) for _ in range(connections)])
+    return latencies, statuses, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and latency of a running api.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--revalidate", type=float, default=0.5, help="share of requests sent with If-None-Match")
+    args = parser.parse_args()
+
+    latencies, statuses, elapsed = asyncio.run(run(args.host, args.port, args.connections, args.seconds, args.revalidate))
+    ms = np.array(latencies) * 1000
+    print(f" {len(ms)} requests in {elapsed:.1f}s over {args.connections} connections: {len(ms) / elapsed:,.0f} req/s")
+    print("    status " + ", ".join(f"{code}: {n}" for code, n in sorted(statuses.items())))
+    print("    latency " + ", ".join(f"p{p} {np.percentile(ms, p):.1f} ms" for p in PERCENTILES))
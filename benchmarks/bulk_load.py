@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_loader import STATE_POPULATION
+from utils.db import bulk_load, get_engine
+
+# SQLite ingestion throughput in rows/s for account-level monthly partitions:
+#   to_sql        - pandas df.to_sql(if_exists="append"), the path analysis.py used to take
+#   bulk append   - utils.db.bulk_load: batched executemany in one transaction, deferred indexes
+#   bulk partition- re-load one month in place (delete + insert), the monthly refresh path
+#                   (also with a datetime month column, checked to replace rather than duplicate)
+#   bulk upsert   - insert-or-update a month on (account_id, month)
+# Every run writes into a fresh database in a temp directory.
+#
+#   python benchmarks/bulk_load.py --rows 1000000
+#   python benchmarks/bulk_load.py --rows 200000 --skip-to-sql --json /tmp/bulk.json
+
+
+def monthly_accounts(rows, month, seed=0):
+    """Synthetic account balances for one month; account_id is stable across months"""
+    rng = np.random.default_rng(seed)
+    states = np.array(sorted(STATE_POPULATION))
+    return pd.DataFrame({
+        "account_id": np.arange(rows, dtype=np.int64),
+        "month": month,
+        "state": states[rng.integers(0, len(states), rows)],
+        "district_id": rng.integers(1, 800, rows),
+        "gender": np.where(rng.random(rows) < 0.56, "F", "M"),
+        "balance": np.round(np.where(rng.random(rows) < 0.08, 0.0, rng.lognormal(7.8, 1.3, rows)), 2),
+        "operative": rng.random(rows) < 0.8,
+    })
+
+
+def fresh_engine(directory, name):
+    path = os.path.join(directory, f"{name}.db")
+    engine = get_engine(path)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE accounts (account_id INTEGER, month TEXT, state TEXT, district_id INTEGER, "
+                             "gender TEXT, balance REAL, operative INTEGER)")
+        conn.exec_driver_sql("CREATE INDEX idx_accounts_state ON accounts (state)")
+        conn.exec_driver_sql("CREATE INDEX idx_accounts_district ON accounts (district_id)")
+    return engine
+
+
+def timed(fn):
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+def run(rows, batch_rows, skip_to_sql):
+    jun, jul = monthly_accounts(rows, "2024-06", seed=1), monthly_accounts(rows, "2024-07", seed=2)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if not skip_to_sql:
+            engine = fresh_engine(tmp, "to_sql")
+            results["to_sql"] = timed(lambda: jun.to_sql("accounts", engine, if_exists="append", index=False))
+
+        engine = fresh_engine(tmp, "bulk")
+        results["bulk append"] = timed(lambda: bulk_load(jun, "accounts", engine, batch_rows=batch_rows))
+        results["bulk append (2nd month)"] = timed(lambda: bulk_load(jul, "accounts", engine, batch_rows=batch_rows))
+        jul_revised = jul.assign(balance=jul["balance"] * 1.01)
+        results["bulk partition (re-load month)"] = timed(
+            lambda: bulk_load(jul_revised, "accounts", engine, mode="partition", partition="month", batch_rows=batch_rows))
+        with engine.connect() as conn:
+            total = conn.exec_driver_sql("SELECT COUNT(*) FROM accounts").scalar()
+        assert total == 2 * rows, f"partition re-load left {total} rows"
+
+        # Datetime partition column: the DELETE must bind the same text the INSERT writes
+        engine = fresh_engine(tmp, "partition_dt")
+        jul_dt = jul.assign(month=pd.Timestamp("2024-07-31"))
+        bulk_load(jul_dt, "accounts", engine, mode="partition", partition="month", batch_rows=batch_rows)
+        results["bulk partition (datetime month)"] = timed(lambda: bulk_load(
+            jul_dt.assign(balance=jul["balance"] * 1.01), "accounts", engine, mode="partition", partition="month",
+            batch_rows=batch_rows))
+        with engine.connect() as conn:
+            total = conn.exec_driver_sql("SELECT COUNT(*) FROM accounts").scalar()
+        assert total == rows, f"datetime partition re-load left {total} rows"
+
+        engine = fresh_engine(tmp, "upsert")
+        bulk_load(jun, "accounts", engine, mode="upsert", key=["account_id", "month"], batch_rows=batch_rows)
+        results["bulk upsert (existing month)"] = timed(lambda: bulk_load(
+            jun.assign(balance=jun["balance"] + 1), "accounts", engine, mode="upsert",
+            key=["account_id", "month"], batch_rows=batch_rows))
+    return {name: {"seconds": round(s, 3), "rows_per_second": round(rows / s)} for name, s in results.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite bulk-load throughput: to_sql vs utils.db.bulk_load")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="accounts per monthly partition")
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    parser.add_argument("--skip-to-sql", action="store_true", help="skip the slow pandas baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.batch_rows, args.skip_to_sql)
+    print(f" {args.rows:,} rows per month, batches of {args.batch_rows:,}")
+    for name, r in results.items():
+        print(f"    {name:<32} {r['seconds']:>8.2f}s  {r['rows_per_second']:>12,} rows/s")
+    if "to_sql" in results:
+        print(f" bulk append is {results['to_sql']['seconds'] / results['bulk append']['seconds']:.1f}x faster than to_sql")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "batch_rows": args.batch_rows, "results": results}, f, indent=2)
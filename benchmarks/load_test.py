@@ -0,0 +1,323 @@
+import argparse
+import glob
+import json
+import multiprocessing as mp
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from utils.data_loader import data_version
+
+# Headless load test: N concurrent AppTest sessions click through app.py and the pages,
+# moving sliders and changing selections, while we record rerun latency, RSS and
+# st.cache_* hit rates per page. The JSON report is meant to be diffed across releases.
+#
+# Each session runs in its own process (AppTest isn't thread-safe), so caches are warmed
+# per session and RSS is per session process - "total_peak_rss_mb" is the sum.
+#
+#   python benchmarks/load_test.py --sessions 8 --rounds 3
+#   python benchmarks/load_test.py --compare benchmarks/results/load_test_<old>.json
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+REPORT_FORMAT = 1
+PERCENTILES = [50, 90, 95, 99]
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def page_files():
+    return ["app.py"] + sorted(os.path.relpath(p, ROOT) for p in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+
+class CacheCounter:
+    """Counts st.cache_data / st.cache_resource hits and misses per page and cached function"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        self.installed = False
+
+    def _page(self):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        info = ctx.pages_manager.get_pages().get(ctx.page_script_hash, {})
+        path = info.get("script_path")
+        return os.path.relpath(path, ROOT) if path else None
+
+    def _record(self, cached_func, slot):
+        page = self._page()
+        if page is None:
+            return
+        with self.lock:
+            self.counts[page][cached_func._info.func.__qualname__][slot] += 1
+
+    def install(self):
+        # Hooks Streamlit internals, so this only degrades to "no cache stats" if they move
+        try:
+            from streamlit.runtime.caching.cache_utils import CachedFunc
+            hit, store = CachedFunc._handle_cache_hit, CachedFunc._store_computed_value
+        except (ImportError, AttributeError):
+            return False
+        counter = self
+
+        def _handle_cache_hit(self, *args, **kwargs):
+            counter._record(self, 0)
+            return hit(self, *args, **kwargs)
+
+        def _store_computed_value(self, *args, **kwargs):
+            counter._record(self, 1)
+            return store(self, *args, **kwargs)
+
+        CachedFunc._handle_cache_hit = _handle_cache_hit
+        CachedFunc._store_computed_value = _store_computed_value
+        self.installed = True
+        return True
+
+    def summary(self, page):
+        funcs = self.counts.get(page, {})
+        hits = sum(h for h, _ in funcs.values())
+        misses = sum(m for _, m in funcs.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "functions": {name: {"hits": h, "misses": m} for name, (h, m) in sorted(funcs.items())},
+        }
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss_mb()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.peak = max(self.peak, rss_mb())
+
+
+def interact(at, rng, n):
+    """Change up to n random widgets the way a user would; buttons are left alone"""
+    widgets = list(at.slider) + list(at.selectbox) + list(at.radio) + list(at.multiselect) + list(at.checkbox)
+    changed = 0
+    for w in rng.sample(widgets, len(widgets)):
+        if changed >= n:
+            break
+        try:
+            if w.type == "slider":
+                lo, hi = w.min, w.max
+                if isinstance(w.value, (list, tuple)):
+                    a, b = sorted(rng.uniform(lo, hi) for _ in range(2))
+                    w.set_range(type(lo)(a), type(hi)(b))
+                else:
+                    w.set_value(type(lo)(rng.uniform(lo, hi)))
+            elif w.type == "selectbox":
+                if len(w.options) < 2:
+                    continue
+                w.select_index(rng.randrange(len(w.options)))
+            elif w.type == "radio":
+                if len(w.options) < 2:
+                    continue
+                w.set_value(rng.choice(w.options))
+            elif w.type == "multiselect":
+                if not w.options:
+                    continue
+                w.set_value(rng.sample(w.options, rng.randint(1, len(w.options))))
+            else:
+                w.set_value(not w.value)
+        except Exception:
+            continue
+        changed += 1
+    return changed
+
+
+def run_session(session_id, pages, rounds, interactions, seed, timeout, start, results):
+    """One simulated user in its own process: AppTest swaps process-global runtime state, so it can't share one"""
+    from streamlit.testing.v1 import AppTest
+    counter = CacheCounter()
+    counter.install()
+    sampler = RssSampler()
+    sampler.start()
+    rng = random.Random(seed + session_id)
+    samples, errors = [], []
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+    start.wait()
+    for _ in range(rounds):
+        for page in rng.sample(pages, len(pages)):
+            at.switch_page(page)
+            for step in range(interactions + 1):
+                kind = "interact" if step else "load"
+                if step and not interact(at, rng, 1):
+                    break
+                t = time.perf_counter()
+                try:
+                    at.run()
+                except Exception as e:
+                    errors.append({"session": session_id, "page": page, "error": repr(e)[:300]})
+                    break
+                samples.append((page, kind, (time.perf_counter() - t) * 1000, rss_mb()))
+                for exc in at.exception:
+                    errors.append({"session": session_id, "page": page, "error": exc.message[:300]})
+    sampler.stop()
+    counts = {page: {name: list(c) for name, c in funcs.items()} for page, funcs in counter.counts.items()}
+    results.put({"samples": samples, "errors": errors, "cache": counts if counter.installed else None,
+                 "peak_rss_mb": sampler.peak})
+
+
+def latency_stats(values):
+    if not values:
+        return None
+    arr = np.asarray(values)
+    out = {f"p{p}": round(float(np.percentile(arr, p)), 2) for p in PERCENTILES}
+    out["mean"] = round(float(arr.mean()), 2)
+    out["max"] = round(float(arr.max()), 2)
+    return out
+
+
+def run_load_test(sessions, rounds, interactions, pages=None, seed=0, timeout=180):
+    pages = pages or page_files()
+    ctx = mp.get_context("spawn")
+    start = ctx.Barrier(sessions)
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=run_session, args=(i, pages, rounds, interactions, seed, timeout, start, queue))
+             for i in range(sessions)]
+    t0 = time.perf_counter()
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - t0
+
+    samples = [s for r in results for s in r["samples"]]
+    errors = [e for r in results for e in r["errors"]]
+    cache = CacheCounter()
+    for r in results:
+        for page, funcs in (r["cache"] or {}).items():
+            for name, (hits, misses) in funcs.items():
+                cache.counts[page][name][0] += hits
+                cache.counts[page][name][1] += misses
+    cache_available = any(r["cache"] is not None for r in results)
+
+    by_page = defaultdict(list)
+    for page, kind, ms, rss in samples:
+        by_page[page].append((kind, ms, rss))
+    report_pages = {}
+    for page in pages:
+        rows = by_page.get(page, [])
+        report_pages[page] = {
+            "reruns": len(rows),
+            "latency_ms": latency_stats([ms for _, ms, _ in rows]),
+            "load_ms": latency_stats([ms for kind, ms, _ in rows if kind == "load"]),
+            "interact_ms": latency_stats([ms for kind, ms, _ in rows if kind == "interact"]),
+            "peak_rss_mb": round(max((rss for _, _, rss in rows), default=0.0), 1),
+            "cache": cache.summary(page) if cache_available else None,
+            "errors": sum(1 for e in errors if e["page"] == page),
+        }
+
+    import pandas as pd
+    import streamlit
+    return {
+        "format": REPORT_FORMAT,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "data_version": data_version(),
+        "versions": {"python": platform.python_version(), "streamlit": streamlit.__version__, "pandas": pd.__version__},
+        "config": {"sessions": sessions, "rounds": rounds, "interactions": interactions, "seed": seed, "pages": pages},
+        "wall_seconds": round(wall, 2),
+        "reruns": len(samples),
+        "reruns_per_second": round(len(samples) / wall, 2) if wall else None,
+        "latency_ms": latency_stats([ms for _, _, ms, _ in samples]),
+        "peak_rss_mb": round(max(r["peak_rss_mb"] for r in results), 1),
+        "total_peak_rss_mb": round(sum(r["peak_rss_mb"] for r in results), 1),
+        "pages": report_pages,
+        "errors": errors[:50],
+    }
+
+
+def print_report(report, baseline=None):
+    print(f" {report['config']['sessions']} sessions x {report['config']['rounds']} rounds: "
+          f"{report['reruns']} reruns in {report['wall_seconds']}s ({report['reruns_per_second']}/s), "
+          f"peak RSS {report['peak_rss_mb']} MB per session, {report['total_peak_rss_mb']} MB total")
+    header = f"{'page':<30} {'runs':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'hit%':>6} {'RSS MB':>7}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    print(header)
+    for page, stats in report["pages"].items():
+        lat = stats["latency_ms"] or {}
+        cache = stats["cache"] or {}
+        hit = f"{cache['hit_rate'] * 100:.0f}" if cache.get("hit_rate") is not None else "-"
+        line = (f"{page:<30} {stats['reruns']:>5} {lat.get('p50', 0):>8.1f} {lat.get('p95', 0):>8.1f} "
+                f"{lat.get('p99', 0):>8.1f} {lat.get('max', 0):>8.1f} {hit:>6} {stats['peak_rss_mb']:>7.0f}")
+        if baseline:
+            old = ((baseline.get("pages", {}).get(page) or {}).get("latency_ms") or {}).get("p95")
+            if old and lat.get("p95"):
+                line += f" {(lat['p95'] - old) / old * 100:>+11.1f}%"
+        print(line)
+    if report["errors"]:
+        print(f"\n {len(report['errors'])} errors, first: {report['errors'][0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the dashboard")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--rounds", type=int, default=2, help="passes over every page per session")
+    parser.add_argument("--interactions", type=int, default=3, help="widget changes (reruns) per page visit")
+    parser.add_argument("--pages", nargs="*", help="subset of page files, e.g. pages/1_National_View.py")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=180, help="per-rerun timeout in seconds")
+    parser.add_argument("--out", help="report path (default: benchmarks/results/load_test_<commit>_<time>.json)")
+    parser.add_argument("--compare", help="earlier report to show p95 deltas against")
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.rounds, args.interactions, args.pages, args.seed, args.timeout)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"load_test_{report['git_commit'] or report['data_version']}_{stamp}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n Report written: {out}")
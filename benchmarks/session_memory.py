@@ -0,0 +1,108 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Per-session memory of the two data-layer strategies:
+#   copy   - @st.cache_data: every caller gets its own unpickled copy of the frames
+#   shared - @st.cache_resource + shallow copy-on-write views (utils.snapshot.get_frames)
+# Each mode runs in a fresh subprocess so RSS readings don't bleed into each other.
+#
+#   python benchmarks/session_memory.py --sessions 20 --rows 200000
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def scaled_frames(rows):
+    """Snapshot frames tiled up to `rows` rows each so per-session cost is measurable"""
+    import numpy as np
+    from utils.snapshot import build_snapshot
+    frames = build_snapshot()["frames"]
+    out = {}
+    for name, df in frames.items():
+        reps = max(1, rows // max(len(df), 1))
+        # take() keeps string columns in a single Arrow chunk like a CSV load; concat would leave thousands
+        out[name] = df.take(np.tile(np.arange(len(df)), reps)).reset_index(drop=True)
+    return out
+
+
+def run_mode(mode, sessions, rows):
+    import streamlit as st
+    frames = scaled_frames(rows)
+    gc.collect()
+    base = rss_mb()
+
+    if mode == "copy":
+        @st.cache_data(show_spinner=False)
+        def get_data(_n):
+            return frames
+
+        def session_frames():
+            return get_data(rows)
+    else:
+        @st.cache_resource(show_spinner=False)
+        def get_data(_n):
+            return frames
+
+        def session_frames():
+            return {name: df.copy(deep=False) for name, df in get_data(rows).items()}
+
+    held = []
+    readings = []
+    for _ in range(sessions):
+        held.append(session_frames())
+        gc.collect()
+        readings.append(rss_mb() - base)
+    first = readings[0]
+    per_session = (readings[-1] - first) / max(sessions - 1, 1)
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "rows_per_frame": rows,
+        "frame_mb": round(sum(df.memory_usage(deep=True).sum() for df in frames.values()) / 2**20, 2),
+        "first_session_mb": round(first, 2),
+        "total_mb": round(readings[-1], 2),
+        "per_session_mb": round(per_session, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-session memory: st.cache_data copies vs shared copy-on-write frames")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=200000, help="rows each snapshot frame is tiled up to")
+    parser.add_argument("--mode", choices=["copy", "shared"], help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.sessions, args.rows)))
+        sys.exit(0)
+
+    results = []
+    for mode in ["copy", "shared"]:
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, "--sessions", str(args.sessions), "--rows", str(args.rows)],
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8} {'frames MB':>10} {'1st session MB':>15} {f'{args.sessions} sessions MB':>16} {'MB/session':>11}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['frame_mb']:>10} {r['first_session_mb']:>15} {r['total_mb']:>16} {r['per_session_mb']:>11}")
+    if results[1]["per_session_mb"] > 0:
+        print(f"\n Shared layer uses {results[0]['per_session_mb'] / results[1]['per_session_mb']:.0f}x less memory per session")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,342 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import utils.data_loader as data_loader
+import utils.districts as districts
+from load_test import RESULTS_DIR, git_commit, page_files
+from utils.db import bulk_load, district_join, ensure_indexes, get_engine
+
+# Micro and macro benchmarks for the data layer, the models, the SQLite join and full page
+# reruns, each at several data scales. Scale N tiles every CSV in data/ and both SQLite tables
+# N times (suffixing names so states and districts stay distinct), so the same code paths run
+# on N times the rows. Page reruns use the real data and run at the first scale only.
+#
+# Every run writes a full report to benchmarks/results/suite_<commit>_<time>.json and appends
+# its medians to benchmarks/results/suite_history.jsonl; the report is compared against the
+# previous run (or --compare) and slowdowns beyond --threshold are flagged.
+#
+#   python benchmarks/suite.py                             # everything at scales 1, 10, 100
+#   python benchmarks/suite.py --only loader model --scales 1 1000
+#   python benchmarks/suite.py --skip page --fail-on-regression
+#   python benchmarks/suite.py --history                   # medians across past runs
+
+REPORT_FORMAT = 1
+HISTORY = os.path.join(RESULTS_DIR, "suite_history.jsonl")
+DEFAULT_SCALES = [1, 10, 100]
+
+BENCHMARKS = {}
+
+
+def benchmark(name, group, scaled=True):
+    """Register setup(data) -> zero-argument callable that is timed"""
+    def register(setup):
+        BENCHMARKS[name] = {"setup": setup, "group": group, "scaled": scaled}
+        return setup
+    return register
+
+
+class ScaledData:
+    """data/ and the SQLite tables tiled scale times, in a temporary directory"""
+
+    def __init__(self, scale, tmp):
+        self.scale = scale
+        self.data_dir = os.path.join(tmp, f"data_x{scale}")
+        self.db_path = os.path.join(tmp, f"jandhan_x{scale}.db")
+        os.makedirs(self.data_dir)
+        for path in glob.glob(os.path.join(data_loader.DATA_DIR, "*.csv")):
+            name = os.path.basename(path)
+            df = pd.read_csv(path, encoding="utf-8-sig")
+            # Balance slabs are categories rather than named entities - repeat them as they are
+            self._tile(df, suffix=name != "balance_distribution.csv").to_csv(os.path.join(self.data_dir, name), index=False)
+
+        source = get_engine(readonly=True)
+        engine = get_engine(self.db_path)
+        with source.connect() as conn:
+            for table in ("pmjdy_accounts", "infrastructure"):
+                df = pd.read_sql(f"SELECT * FROM {table}", conn)
+                n = len(df)
+                tiled = pd.concat([df.assign(district_id=df["district_id"] + k * n) for k in range(self.scale)],
+                                  ignore_index=True)
+                if "district" in tiled.columns:
+                    tiled["district"] = self._suffix(tiled["district"], n)
+                bulk_load(tiled, table, engine, mode="replace")
+        ensure_indexes(engine)
+        self.engine = get_engine(self.db_path, readonly=True)
+
+    def _suffix(self, names, n):
+        copy = pd.Series(range(len(names))) // n
+        return names.astype(str).where(copy == 0, names.astype(str) + " #" + (copy + 1).astype(str))
+
+    def _tile(self, df, suffix=True):
+        """suffix: make the first text column (the state or district name) unique per copy"""
+        if self.scale == 1:
+            return df
+        n = len(df)
+        out = pd.concat([df] * self.scale, ignore_index=True)
+        names = data_loader._drop_serial_cols(out)
+        name_col = next((c for c in names.columns if not pd.api.types.is_numeric_dtype(names[c])), None)
+        if suffix and name_col is not None:
+            out[name_col] = self._suffix(out[name_col], n)
+        return out
+
+    def __enter__(self):
+        self._saved = data_loader.DATA_DIR, districts.DATA_DIR
+        data_loader.DATA_DIR = districts.DATA_DIR = self.data_dir
+        return self
+
+    def __exit__(self, *exc):
+        data_loader.DATA_DIR, districts.DATA_DIR = self._saved
+
+
+#
+# Benchmarks
+#
+
+@benchmark("load_state_data", "loader")
+def _(data):
+    return data_loader.load_state_data
+
+
+for _state, _spec in districts.DISTRICT_SOURCES.items():
+    @benchmark(f"load_districts[{_state}]", "loader")
+    def _(data, state=_state):
+        return lambda: districts.load_district_source(state)
+
+
+@benchmark("load_balance_distribution", "loader")
+def _(data):
+    return data_loader.load_balance_distribution
+
+
+@benchmark("cluster_states", "model")
+def _(data):
+    from utils.ml_models import cluster_states
+    df = data_loader.load_state_data()
+    return lambda: cluster_states(df)
+
+
+@benchmark("predict_underperformers", "model")
+def _(data):
+    from utils.ml_models import predict_underperformers
+    df = data_loader.load_state_data()
+    return lambda: predict_underperformers(df)
+
+
+@benchmark("growth_predictor", "model")
+def _(data):
+    from utils.ml_models import growth_predictor
+    df = data_loader.load_maharashtra_districts()
+    return lambda: growth_predictor(df)
+
+
+@benchmark("detect_anomalies", "model")
+def _(data):
+    from utils.ml_models import detect_anomalies
+    df = data_loader.load_bihar_districts()
+    return lambda: detect_anomalies(df, "Accounts")
+
+
+@benchmark("district_join", "db")
+def _(data):
+    return lambda: district_join(engine=data.engine)
+
+
+@benchmark("district_join[state]", "db")
+def _(data):
+    with data.engine.connect() as conn:
+        state = conn.exec_driver_sql("SELECT state FROM pmjdy_accounts LIMIT 1").scalar()
+    return lambda: district_join(state, engine=data.engine)
+
+
+def _page_benchmark(page):
+    def setup(data):
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300)
+        at.run()
+        if page != "app.py":
+            at.switch_page(page)
+        # The first call is the cold page load, the rest are reruns with warm caches
+        return lambda: at.run()
+    return setup
+
+
+for _page in page_files():
+    benchmark(f"page[{os.path.splitext(os.path.basename(_page))[0]}]", "page", scaled=False)(_page_benchmark(_page))
+
+
+#
+# Runner
+#
+
+def measure(fn, min_time=0.5, min_repeat=3, max_repeat=50):
+    """Time fn until min_time has elapsed (at least min_repeat calls); the first call is reported apart"""
+    t = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t
+    samples, total = [], 0.0
+    while len(samples) < max_repeat and (len(samples) < min_repeat or total < min_time):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+        total += samples[-1]
+    ms = [s * 1000 for s in samples]
+    return {
+        "first_ms": round(first * 1000, 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "min_ms": round(min(ms), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "stdev_ms": round(statistics.stdev(ms), 3) if len(ms) > 1 else 0.0,
+        "repeat": len(ms),
+    }
+
+
+def selected(only=None, skip=None):
+    def match(name, spec, patterns):
+        return any(p == spec["group"] or p in name for p in patterns)
+    return {name: spec for name, spec in BENCHMARKS.items()
+            if (not only or match(name, spec, only)) and not (skip and match(name, spec, skip))}
+
+
+def run_suite(scales, only=None, skip=None, min_time=0.5, log=print):
+    benches = selected(only, skip)
+    results = {name: {} for name in benches}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, scale in enumerate(scales):
+            todo = {n: s for n, s in benches.items() if s["scaled"] or i == 0}
+            if not todo:
+                continue
+            t = time.perf_counter()
+            with ScaledData(scale, tmp) as data:
+                log(f" scale x{scale} (data prepared in {time.perf_counter() - t:.1f}s)")
+                for name, spec in todo.items():
+                    try:
+                        stats = measure(spec["setup"](data), min_time=min_time)
+                    except Exception as e:
+                        stats = {"error": f"{type(e).__name__}: {e}"}
+                    results[name][str(scale)] = stats
+                    log(f"    {name:<36} " + (f"{stats['median_ms']:>10.3f} ms  (n={stats['repeat']})"
+                                               if "error" not in stats else stats["error"]))
+
+    import sklearn
+    import streamlit
+    return {
+        "format": REPORT_FORMAT,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "data_version": data_loader.data_version(),
+        "versions": {"python": platform.python_version(), "pandas": pd.__version__,
+                     "sklearn": sklearn.__version__, "streamlit": streamlit.__version__},
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"scales": scales, "min_time": min_time},
+        "results": results,
+    }
+
+
+def latest_report(exclude=None):
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "suite_*.json")), key=os.path.getmtime)
+    paths = [p for p in paths if p != exclude]
+    return paths[-1] if paths else None
+
+
+def compare(report, baseline, threshold=0.10, floor_ms=0.5):
+    """[(benchmark, scale, old_ms, new_ms, change)] for every pair measured in both reports;
+    a regression is change > threshold and more than floor_ms slower"""
+    rows = []
+    for name, by_scale in report["results"].items():
+        for scale, stats in by_scale.items():
+            old = baseline.get("results", {}).get(name, {}).get(scale, {})
+            if "median_ms" in stats and "median_ms" in old:
+                change = (stats["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else 0.0
+                regressed = change > threshold and stats["median_ms"] - old["median_ms"] > floor_ms
+                rows.append((name, scale, old["median_ms"], stats["median_ms"], change, regressed))
+    return rows
+
+
+def print_comparison(rows, baseline):
+    print(f"\n vs {baseline.get('git_commit') or '?'} ({baseline.get('generated_at')}):")
+    print(f"    {'benchmark':<36} {'scale':>6} {'before':>11} {'after':>11} {'change':>8}")
+    for name, scale, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"    {name:<36} {'x' + scale:>6} {old:>9.3f}ms {new:>9.3f}ms {change * 100:>+7.1f}%{flag}")
+
+
+def append_history(report, path=HISTORY):
+    line = {"generated_at": report["generated_at"], "git_commit": report["git_commit"],
+            "data_version": report["data_version"],
+            "median_ms": {f"{name}@x{scale}": stats["median_ms"]
+                          for name, by_scale in report["results"].items()
+                          for scale, stats in by_scale.items() if "median_ms" in stats}}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+
+
+def print_history(path=HISTORY, last=8, only=None):
+    if not os.path.exists(path):
+        print(" No benchmark history yet")
+        return
+    with open(path, encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()][-last:]
+    keys = sorted({k for r in runs for k in r["median_ms"] if not only or any(p in k for p in only)})
+    print(f"    {'benchmark':<44}" + "".join(f"{(r['git_commit'] or '?')[:9]:>11}" for r in runs))
+    for key in keys:
+        print(f"    {key:<44}" + "".join(f"{r['median_ms'][key]:>11.3f}" if key in r["median_ms"] else f"{'-':>11}"
+                                      for r in runs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark loaders, models, the SQLite join and page reruns")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="data multipliers")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="groups (loader, model, db, page) or name substrings")
+    parser.add_argument("--skip", nargs="+", metavar="NAME", help="groups or name substrings to leave out")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds of samples per benchmark")
+    parser.add_argument("--compare", help="report to compare against (default: the previous run)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown fraction flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any benchmark regressed")
+    parser.add_argument("--out", help="report path (default: benchmarks/results/suite_<commit>_<time>.json)")
+    parser.add_argument("--history", action="store_true", help="print medians across past runs and exit")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in selected(args.only, args.skip).items():
+            print(f"  {spec['group']:<7} {name}{'' if spec['scaled'] else '  (scale 1 only)'}")
+        sys.exit(0)
+    if args.history:
+        print_history(only=args.only)
+        sys.exit(0)
+
+    baseline_path = args.compare or latest_report()
+    report = run_suite(args.scales, args.only, args.skip, args.min_time)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = args.out
+    if not out:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"suite_{report['git_commit'] or report['data_version']}_{stamp}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    append_history(report)
+    print(f"\n Report written: {out}")
+
+    regressions = []
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print_comparison(rows, baseline)
+        regressions = [r for r in rows if r[-1]]
+        print(f"\n {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%")
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from utils.aggregate import ACCOUNT_COLUMNS, aggregate_accounts, load_pmjdy_accounts, metrics, rollup
+
+# Derive district zero-balance rates, mean balances and account counts from account-level
+# extracts too large for memory: files are streamed in chunks, in parallel, into mergeable sums.
+#
+#   python build_aggregates.py synthetic/accounts/part-*.parquet
+#   python build_aggregates.py exports/*.csv --db synthetic/synthetic.db      # (re)write pmjdy_accounts
+#   python build_aggregates.py exports/*.csv --db jandhan_analysis.db --mode upsert
+
+parser = argparse.ArgumentParser(description="Aggregate account-level records into per-district PMJDY metrics")
+parser.add_argument("paths", nargs="+", help="CSV or Parquet files with one row per account")
+for key, default in ACCOUNT_COLUMNS.items():
+    parser.add_argument(f"--{key.replace('_', '-')}-col", default=default)
+parser.add_argument("--chunksize", type=int, default=1_000_000, help="rows read per chunk")
+parser.add_argument("--jobs", type=int, default=None, help="files aggregated in parallel (default: CPU count)")
+parser.add_argument("--db", help="SQLite database whose pmjdy_accounts table receives the districts")
+parser.add_argument("--mode", choices=["replace", "upsert"], default="replace")
+args = parser.parse_args()
+
+columns = {key: getattr(args, f"{key}_col") for key in ACCOUNT_COLUMNS}
+partial, rows, seconds = aggregate_accounts(args.paths, columns, args.chunksize, args.jobs)
+if partial is None:
+    sys.exit(" No account rows found")
+print(f" Aggregated {rows:,} accounts from {len(args.paths)} files into {len(partial)} districts "
+      f"in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+if "area_type" in partial.index.names:
+    print(metrics(rollup(partial, ["area_type"])).to_string())
+if args.db:
+    from utils.db import get_engine
+    result = load_pmjdy_accounts(partial, get_engine(args.db), args.mode)
+    print(f" pmjdy_accounts ({args.mode}): {result['rows']} districts written to {args.db}")
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from utils.sketch import RELATIVE_ACCURACY, SKETCH_DIR, BalanceSketch, sketch_accounts, write_sketches
+
+# Stream account-level balance exports into one mergeable quantile sketch per district.
+# The Balance Analysis page merges them into any state, region or national view on demand.
+#
+#   python build_sketches.py exports/accounts_*.csv
+#   python build_sketches.py exports/accounts.parquet --balance-col Balance_INR
+
+parser = argparse.ArgumentParser(description="Build per-district balance sketches from account-level exports")
+parser.add_argument("paths", nargs="+", help="CSV or Parquet files with one row per account")
+parser.add_argument("--state-col", default="State")
+parser.add_argument("--district-col", default="District")
+parser.add_argument("--balance-col", default="Balance", help="account balance in rupees")
+parser.add_argument("--chunksize", type=int, default=1_000_000, help="rows read per chunk")
+parser.add_argument("--accuracy", type=float, default=RELATIVE_ACCURACY, help="relative accuracy of every quantile")
+parser.add_argument("--out", default=SKETCH_DIR, help="directory to write the sketches into")
+args = parser.parse_args()
+
+start = time.perf_counter()
+sketches, rows = sketch_accounts(args.paths, args.state_col, args.district_col, args.balance_col,
+                                 args.chunksize, args.accuracy)
+elapsed = time.perf_counter() - start
+path = write_sketches(sketches, args.paths, args.out)
+
+national = BalanceSketch.merged(sketches.values(), args.accuracy)
+p50, p90, p99 = national.quantiles([0.5, 0.9, 0.99])
+print(f" Sketched {rows:,} accounts into {len(sketches)} districts across {len({s for s, _ in sketches})} states "
+      f"in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+print(f"    median ₹{p50:,.0f}  p90 ₹{p90:,.0f}  p99 ₹{p99:,.0f}  zero-balance {national.zero_count / max(national.count, 1) * 100:.1f}%")
+print(f" Written: {path} ({os.path.getsize(path)/1024:.0f} KB)")
@@ -0,0 +1,28 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from utils.snapshot import SNAPSHOT_DIR, build_snapshot, write_snapshot
+
+# Precompute every loader and model once per data release.
+# The dashboard boots from the written artifact instead of computing at request time.
+#
+#   python build_snapshot.py
+#   streamlit run app.py
+
+parser = argparse.ArgumentParser(description="Build the versioned PMJDY snapshot the dashboard boots from")
+parser.add_argument("--out", default=SNAPSHOT_DIR, help="directory to write the snapshot into")
+args = parser.parse_args()
+
+start = time.perf_counter()
+snap = build_snapshot()
+path = write_snapshot(snap, args.out)
+
+print(f" Snapshot built for data version {snap['data_version']}")
+for name, frame in snap["frames"].items():
+    print(f"    {name:<12} {frame.shape[0]:>4} rows x {frame.shape[1]} cols")
+for name, secs in snap["timings"].items():
+    print(f"    {name:<36} {secs*1000:8.1f} ms")
+print(f" Written: {path} ({os.path.getsize(path)/1024:.0f} KB) in {time.perf_counter() - start:.2f}s")
@@ -1,34 +1,37 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import create_engine
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
+import sys, os
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.dirname(__file__))
+from utils import profiling
+from utils.db import district_join
+from utils.summaries import district_tiers, read_summary, summarize
+
 #  Page Config 
 st.set_page_config(
     page_title="Jan Dhan Financial Inclusion Analysis",
     page_icon="",
     layout="wide"
 )
+profiling.label_run("District Dashboard")
 
 #  Load Data from SQLite 
 @st.cache_data
 def load_data():
-    engine = create_engine('sqlite:///jandhan_analysis.db')
-    df = pd.read_sql("""
-        SELECT p.district, p.state, p.area_type,
-               p.total_accounts_lakh, p.zero_balance_pct,
-               p.avg_balance_inr, i.mgnrega_coverage_pct,
-               i.banking_outlets_per_1000, i.bc_agents_per_1000,
-               i.mobile_banking_pct
-        FROM pmjdy_accounts p
-        JOIN infrastructure i ON p.district_id = i.district_id
-    """, engine)
+    df = district_join()
+
+    # Tiers published by analysis.py; cluster here only if it has not run against this database
+    tiers = district_tiers()
+    if tiers is not None:
+        df['intervention_tier'] = [tiers.get(k) for k in zip(df['state'], df['district'])]
+        if df['intervention_tier'].notna().all():
+            return df, True
 
     # ML Clustering
     features = df[[
@@ -48,9 +51,17 @@ def load_data():
         sorted_clusters.index[2]: 'High Priority'
     }
     df['intervention_tier'] = df['cluster'].map(label_map)
-    return df
+    return df, False
+
+@st.cache_data
+def load_summary(kind):
+    return read_summary(kind)
 
-df = load_data()
+@st.cache_data
+def load_rollup(by, states, areas, tiers):
+    return summarize(by, state=list(states), area_type=list(areas), intervention_tier=list(tiers))
+
+df, tiers_published = load_data()
 
 #  Colors 
 colors = {'Urban': '#1F4E79', 'Semi-Urban': '#2E86AB', 'Rural': '#E84855'}
@@ -78,12 +89,13 @@ st.markdown("""
 # 
 col1, col2, col3, col4 = st.columns(4)
 
-rural_zero = df[df['area_type']=='Rural']['zero_balance_pct'].mean()
-urban_zero = df[df['area_type']=='Urban']['zero_balance_pct'].mean()
+# Pre-aggregated rows from the database's summary tables
+area_summary = load_summary('area_type')
+rural_zero = area_summary.loc['Rural', 'Avg_Zero_Balance']
+urban_zero = area_summary.loc['Urban', 'Avg_Zero_Balance']
 corr = df['mgnrega_coverage_pct'].corr(df['avg_balance_inr'])
-gap = df[df['area_type']=='Urban']['banking_outlets_per_1000'].mean() / \
-      df[df['area_type']=='Rural']['banking_outlets_per_1000'].mean()
-high_priority = len(df[df['intervention_tier']=='High Priority'])
+gap = area_summary.loc['Urban', 'Avg_Outlets'] / area_summary.loc['Rural', 'Avg_Outlets']
+high_priority = (df['intervention_tier'] == 'High Priority').sum()
 
 col1.metric("Rural Zero-Balance Rate", f"{rural_zero:.1f}%",
             f"{rural_zero/urban_zero:.1f}x higher than urban")
@@ -125,6 +137,15 @@ filtered_df = df[
 st.sidebar.markdown("---")
 st.sidebar.markdown(f"**Showing {len(filtered_df)} of {len(df)} districts**")
 
+def filtered_summary(by):
+    """Filtered group summary - rolled up from summary_cell when the tiers are in the database"""
+    if tiers_published:
+        return load_rollup(by, tuple(selected_states), tuple(selected_area), tuple(selected_tier))
+    return filtered_df.groupby(by).agg(
+        Districts=('district', 'count'),
+        Avg_Zero_Balance=('zero_balance_pct', 'mean')
+    )
+
 # 
 # ROW 1: CHARTS
 # 
@@ -133,7 +154,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("#### Zero-Balance Rate by Area Type")
     fig, ax = plt.subplots(figsize=(6, 4))
-    area_zero = filtered_df.groupby('area_type')['zero_balance_pct'].mean()
+    area_zero = filtered_summary('area_type')['Avg_Zero_Balance']
     bar_colors = [colors.get(a, '#888') for a in area_zero.index]
     bars = ax.bar(area_zero.index, area_zero.values,
                   color=bar_colors, width=0.5, edgecolor='white')
@@ -186,8 +207,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("#### State-wise Zero-Balance Rate")
     fig, ax = plt.subplots(figsize=(6, 5))
-    state_zero = filtered_df.groupby('state')['zero_balance_pct'] \
-                            .mean().sort_values()
+    state_zero = filtered_summary('state')['Avg_Zero_Balance'].sort_values()
     bar_clrs = ['#E84855' if v > 40 else '#F4A261' if v > 25
                 else '#2A9D8F' for v in state_zero.values]
     bars = ax.barh(state_zero.index, state_zero.values,
@@ -208,7 +228,8 @@ with col1:
 with col2:
     st.markdown("#### ML District Segmentation - Intervention Tiers")
     fig, ax = plt.subplots(figsize=(6, 5))
-    tier_counts = filtered_df['intervention_tier'].value_counts()
+    tier_counts = filtered_summary('intervention_tier')['Districts'] \
+                    .sort_values(ascending=False)
     wedge_colors = [tier_colors.get(t, '#888') for t in tier_counts.index]
     wedges, texts, autotexts = ax.pie(
         tier_counts.values,
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from utils.synthetic import FORMATS, SYNTHETIC_DIR, write_dataset
+
+# Seeded synthetic PMJDY data at national scale for offline benchmarking: every state, ~700
+# districts with blocks, monthly district snapshots and account-level records, calibrated to the
+# repo's CSVs (state totals and averages, real district splits, the balance slab distribution).
+#
+#   python generate_data.py --accounts 1e6
+#   python generate_data.py --accounts 1e8 --formats parquet --jobs 8 --out /data/pmjdy_synthetic
+#   python build_sketches.py synthetic/accounts/part-*.parquet
+
+parser = argparse.ArgumentParser(description="Generate synthetic PMJDY states, districts, blocks, monthly snapshots and accounts")
+parser.add_argument("--accounts", type=lambda s: int(float(s)), default=1_000_000, help="account records, e.g. 1e6 or 1e8")
+parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--chunk-rows", type=lambda s: int(float(s)), default=1_000_000, help="accounts per part file")
+parser.add_argument("--months", type=int, default=24, help="monthly district snapshots, ending Jun 2024")
+parser.add_argument("--jobs", type=int, default=None, help="worker processes writing account parts (default: CPU count)")
+parser.add_argument("--out", default=SYNTHETIC_DIR)
+args = parser.parse_args()
+
+start = time.perf_counter()
+manifest = write_dataset(args.out, args.accounts, args.formats, args.seed, args.chunk_rows, args.months, args.jobs,
+                         log=lambda msg: None)
+elapsed = time.perf_counter() - start
+print(f" {manifest['accounts']:,} accounts in {manifest['districts']} districts / {manifest['blocks']} blocks "
+      f"({', '.join(manifest['formats'])}) in {elapsed:.1f}s ({manifest['accounts'] / elapsed:,.0f} accounts/s)")
+for name, rows in manifest["tables"].items():
+    print(f"    {name:<18} {rows:>10,} rows")
+print(f"    timings: {manifest['timings']}")
+print(f" Written: {args.out}")
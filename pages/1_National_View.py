@@ -1,36 +1,22 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_state_data
-from utils.ml_models import cluster_states, predict_underperformers
+from utils.page import setup_page, page_header
+from utils.data_loader import data_version
+from utils.exports import download_button, export_format_picker
+from utils.search import matching_names
+from utils.snapshot import get_frames
+from utils.cube import get_cube
+from utils.geo import choropleth, state_geojson
 
-st.set_page_config(page_title="National View - PMJDY", page_icon="", layout="wide")
+setup_page("National View - PMJDY", "National View")
 
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-@st.cache_data
-def get_data():
-    df = load_state_data()
-    df = cluster_states(df)
-    df = predict_underperformers(df)
-    return df
-
-df = get_data()
+df = get_frames("states_ml")
 
 #  SIDEBAR FILTERS 
 with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  National View")
-    st.markdown("---")
-    st.markdown("---")
-
     st.markdown("###  Filters")
 
     search = st.text_input(" Search State", placeholder="e.g. Bihar, Goa...")
@@ -79,10 +65,10 @@ with st.sidebar:
     st.markdown(f"**Total states:** {len(df)}")
 
 #  APPLY FILTERS 
-filtered = df.copy()
+filtered = df
 
 if search:
-    filtered = filtered[filtered["State"].str.contains(search, case=False, na=False)]
+    filtered = filtered[filtered["State"].isin(matching_names(search, "state"))]
 
 filtered = filtered[
     filtered["Region"].isin(region_filter) &
@@ -96,12 +82,7 @@ if show_underperforming and "Underperforming" in filtered.columns:
     filtered = filtered[filtered["Underperforming"] == True]
 
 #  HEADER 
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> National View - All 36 States & UTs</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Complete state-wise PMJDY performance across India</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("National View - All 36 States & UTs", "Complete state-wise PMJDY performance across India")
 
 #  ACTIVE FILTER SUMMARY 
 active = []
@@ -199,17 +180,28 @@ with st.expander(" What does this mean?"):
 
 st.markdown("---")
 
+#  MAP - only when boundary files are installed under data/geo/
+states_geo = state_geojson(df["State"])
+if states_geo is not None:
+    st.markdown("####  State Map")
+    map_metric = st.radio("Shade states by:", ["Accounts_Per_1000", "Avg_Balance_INR", "Accounts_Lakh"],
+                          format_func=label_map.get, horizontal=True)
+    st.plotly_chart(choropleth(filtered, states_geo, "State", map_metric, label_map[map_metric]), use_container_width=True)
+    missing = sorted(set(filtered["State"]) - {f["properties"]["name"] for f in states_geo["features"]})
+    if missing:
+        st.caption(f"No boundary for: {', '.join(missing)}")
+    st.markdown("---")
+
 #  CHART 3: Region Summary 
 st.markdown("####  Region-wise Performance Summary")
 
 region_metric = st.radio("Show region chart by:", ["Avg Balance (₹)", "Accounts per 1,000", "Total Deposits (Cr)"], horizontal=True)
 metric_col = {"Avg Balance (₹)": "Avg_Balance_INR", "Accounts per 1,000": "Accounts_Per_1000", "Total Deposits (Cr)": "Deposit_Crore"}[region_metric]
 
-region_summary = filtered.groupby("Region").agg(
-    Avg_Balance_INR=("Avg_Balance_INR", "mean"),
-    Accounts_Per_1000=("Accounts_Per_1000", "mean"),
-    Deposit_Crore=("Deposit_Crore", "sum")
-).reset_index().round(0)
+# Rolled up from the cube's state cells, so regions show account-weighted balances and coverage
+region_summary = get_cube().regroup("region", filtered["State"]).rename(
+    columns={"region": "Region", "deposit_crore": "Deposit_Crore"}
+)[["Region", "Avg_Balance_INR", "Accounts_Per_1000", "Deposit_Crore"]].round(0)
 
 fig3 = px.bar(region_summary.sort_values(metric_col), x="Region", y=metric_col,
               color=metric_col, color_continuous_scale="Blues", text=metric_col,
@@ -238,7 +230,7 @@ show_cols = st.multiselect("Columns to show:", options=available_cols,
     default=[c for c in ["State", "Region", "Tier", "Accounts_Lakh", "Avg_Balance_INR", "Accounts_Per_1000"] if c in available_cols])
 
 if show_cols:
-    sort_col = table_sort if table_sort in filtered.columns else show_cols[0]
+    sort_col = table_sort if table_sort in show_cols else show_cols[0]
     display_df = filtered[show_cols].sort_values(sort_col, ascending=(sort_order == "Ascending")).reset_index(drop=True)
     display_df.index = display_df.index + 1
     st.dataframe(display_df, use_container_width=True, height=400)
@@ -256,11 +248,15 @@ if "Underperforming" in filtered.columns:
 
 #  DOWNLOAD 
 st.markdown("---")
+export_fmt = export_format_picker()
+version = data_version()
+filters = {"search": search, "regions": tuple(region_filter), "tiers": tuple(tier_filter), "balance": balance_range,
+           "coverage": coverage_range, "accounts": accounts_range, "underperforming": show_underperforming}
 col1, col2 = st.columns(2)
 with col1:
-    st.download_button(" Download Filtered Data (CSV)", filtered.to_csv(index=False), "pmjdy_filtered_states.csv", "text/csv")
+    download_button(f" Download Filtered Data ({export_fmt})", filtered, "pmjdy_filtered_states", version, filters, export_fmt)
 with col2:
-    st.download_button(" Download Full Dataset (CSV)", df.to_csv(index=False), "pmjdy_all_states.csv", "text/csv")
+    download_button(f" Download Full Dataset ({export_fmt})", df, "pmjdy_all_states_ml", version, fmt=export_fmt)
 
 st.markdown("---")
 st.markdown("<div class='gov-footer'> PMJDY Dashboard  Source: Ministry of Finance, GoI  Data: 2024</div>", unsafe_allow_html=True)
\ No newline at end of file
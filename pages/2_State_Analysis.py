@@ -5,33 +5,31 @@ import plotly.graph_objects as go
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_state_data
+from utils.page import setup_page, page_header
+from utils.data_loader import data_version
+from utils.exports import download_button, export_format_picker
+from utils.compare import STATE_METRICS, get_similarity, similarity_heatmap
+from utils.search import matching_names
+from utils.snapshot import get_frames
 
-st.set_page_config(page_title="State Analysis - PMJDY", page_icon="", layout="wide")
+setup_page("State Analysis - PMJDY", "State Analysis")
 
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-@st.cache_data
-def get_data():
-    return load_state_data()
-
-df = get_data()
+df = get_frames("states")
+similarity = get_similarity()
 
 with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  State Analysis")
-    st.markdown("---")
-    st.markdown("---")
     st.markdown("###  Filters")
-    state_search = st.text_input(" Search State", placeholder="Type to filter...")
-    filtered_states = sorted([s for s in df["State"].tolist() if state_search.lower() in s.lower()]) if state_search else sorted(df["State"].tolist())
-    selected_state = st.selectbox(" Select Primary State", filtered_states)
+    state_search = st.text_input(" Search State", placeholder="Type to filter...", key="state_analysis_search")
+    filtered_states = sorted(matching_names(state_search, "state") & set(df["State"])) if state_search else sorted(df["State"].tolist())
+    if st.session_state.get("state_analysis_state") not in filtered_states:
+        st.session_state.pop("state_analysis_state", None)
+    selected_state = st.selectbox(" Select Primary State", filtered_states, key="state_analysis_state")
     st.markdown("---")
-    compare_mode = st.checkbox(" Compare with another state", value=False)
+    compare_mode = st.checkbox(" Compare with other states", value=False)
     if compare_mode:
-        compare_state = st.selectbox("Compare with", [s for s in sorted(df["State"].tolist()) if s != selected_state])
+        compare_states = st.multiselect("Compare with", [s for s in sorted(df["State"].tolist()) if s != selected_state],
+                                        default=similarity.nearest(selected_state, 2)["Name"].tolist(),
+                                        help="Defaults to the two most similar states")
     st.markdown("---")
     st.markdown("**Chart Options**")
     chart_sort = st.selectbox("National context - sort by",
@@ -45,12 +43,7 @@ with st.sidebar:
         format_func=lambda x: {"Performance_Score": "Performance Score", "Avg_Balance_INR": "Avg Balance", "Accounts_Per_1000": "Coverage/1000"}[x])
     show_all_regions = st.checkbox("Show all regions as peers", value=False)
 
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> State Deep Dive</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Detailed analysis for any state - accounts, deposits, rankings, and peer comparison</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("State Deep Dive", "Detailed analysis for any state - accounts, deposits, rankings, and peer comparison")
 
 state_data = df[df["State"] == selected_state].iloc[0]
 
@@ -73,26 +66,35 @@ col4.metric("vs National Avg Coverage", f"{state_data['Accounts_Per_1000'] - nat
 st.markdown("<p class='source-tag'>Source: Ministry of Finance, Rajya Sabha Q239, 2024</p>", unsafe_allow_html=True)
 st.markdown("---")
 
-if compare_mode:
-    compare_data = df[df["State"] == compare_state].iloc[0]
-    st.markdown(f"###  {selected_state} vs {compare_state}")
-    metrics = ["Accounts", "Deposit_Crore", "Avg_Balance_INR", "Accounts_Per_1000", "Performance_Score"]
-    labels = ["Total Accounts", "Deposits (Cr)", "Avg Balance (₹)", "Accounts/1000", "Performance Score"]
-    vals1 = [state_data[m] for m in metrics]
-    vals2 = [compare_data[m] for m in metrics]
-    max_vals = [max(v1, v2) for v1, v2 in zip(vals1, vals2)]
-    norm1 = [v/m*100 if m > 0 else 0 for v, m in zip(vals1, max_vals)]
-    norm2 = [v/m*100 if m > 0 else 0 for v, m in zip(vals2, max_vals)]
+if compare_mode and compare_states:
+    group = [selected_state] + compare_states
+    group_df = df.set_index("State").loc[group]
+    st.markdown(f"###  {selected_state} vs {', '.join(compare_states)}")
+    metrics, labels = list(STATE_METRICS), list(STATE_METRICS.values())
+    max_vals = group_df[metrics].max()
+    palette = [highlight_color] + px.colors.qualitative.Set2
     fig = go.Figure()
-    fig.add_trace(go.Bar(name=selected_state, x=labels, y=norm1, marker_color=highlight_color,
-                         text=[f"{v:,.0f}" for v in vals1], textposition="outside"))
-    fig.add_trace(go.Bar(name=compare_state, x=labels, y=norm2, marker_color="#2E86AB",
-                         text=[f"{v:,.0f}" for v in vals2], textposition="outside"))
+    for i, state in enumerate(group):
+        vals = group_df.loc[state, metrics]
+        fig.add_trace(go.Bar(name=state, x=labels, y=[v/m*100 if m > 0 else 0 for v, m in zip(vals, max_vals)],
+                             marker_color=palette[i % len(palette)],
+                             text=[f"{v:,.0f}" for v in vals], textposition="outside"))
     fig.update_layout(barmode="group", plot_bgcolor="#F8F9FA", paper_bgcolor="white", yaxis_title="Relative Score (%)", height=400)
     st.plotly_chart(fig, use_container_width=True)
-    summary = [{"Metric": l, selected_state: f"{v1:,.0f}", compare_state: f"{v2:,.0f}", "Winner ": selected_state if v1 > v2 else compare_state}
-               for l, m, v1, v2 in zip(labels, metrics, vals1, vals2)]
-    st.dataframe(pd.DataFrame(summary), hide_index=True, use_container_width=True)
+    summary = pd.DataFrame({state: [f"{v:,.0f}" for v in group_df.loc[state, metrics]] for state in group})
+    summary.insert(0, "Metric", labels)
+    summary["Leader "] = [group_df[m].idxmax() for m in metrics]
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown("**Similarity Across the Selection**")
+        st.plotly_chart(similarity_heatmap(similarity.matrix(group)), use_container_width=True)
+    with col2:
+        st.markdown("**z-Score Profile** (standard deviations from the national mean)")
+        profile = similarity.profile(group).rename(columns=STATE_METRICS).T.round(2)
+        st.dataframe(profile.style.background_gradient(cmap="RdYlGn", axis=None, vmin=-2, vmax=2), use_container_width=True)
+    st.markdown("<small>Similarity compares all five metrics at once after standardising each across the 36 states/UTs - 100% means identical profiles.</small>", unsafe_allow_html=True)
     st.markdown("---")
 
 st.markdown(f"###  {selected_state} in National Context")
@@ -121,6 +123,17 @@ with col2:
     fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), showlegend=True, paper_bgcolor="white", height=400)
     st.plotly_chart(fig_radar, use_container_width=True)
 
+st.markdown("---")
+st.markdown(f"###  States Most Like {selected_state}")
+col1, col2 = st.columns([2, 3])
+with col1:
+    neighbours = similarity.nearest(selected_state, k=8)
+    neighbours["Region"] = neighbours["Name"].map(df.set_index("State")["Region"])
+    st.dataframe(neighbours.rename(columns={"Name": "State"}), hide_index=True, use_container_width=True)
+with col2:
+    st.plotly_chart(similarity_heatmap(similarity.matrix([selected_state] + neighbours["Name"].tolist()), height=380),
+                    use_container_width=True)
+
 st.markdown("---")
 region = state_data["Region"]
 peers = df if show_all_regions else df[df["Region"] == region]
@@ -139,11 +152,13 @@ st.dataframe(peer_display.style.apply(highlight_selected, axis=1).background_gra
 st.markdown("<small> Yellow = selected state</small>", unsafe_allow_html=True)
 
 st.markdown("---")
+export_fmt = export_format_picker()
+version = data_version()
 col1, col2 = st.columns(2)
 with col1:
-    st.download_button(" Download All State Data", df.to_csv(index=False), "pmjdy_all_states.csv", "text/csv")
+    download_button(" Download All State Data", df, "pmjdy_all_states", version, fmt=export_fmt)
 with col2:
-    st.download_button(f" Download {selected_state} Data", df[df["State"]==selected_state].to_csv(index=False), f"pmjdy_{selected_state.lower().replace(' ','_')}.csv", "text/csv")
+    download_button(f" Download {selected_state} Data", df[df["State"]==selected_state], f"pmjdy_{selected_state.lower().replace(' ','_')}", version, fmt=export_fmt)
 
 st.markdown("---")
 st.markdown("<div class='gov-footer'> PMJDY Dashboard  Source: Ministry of Finance, GoI  Data: 2024</div>", unsafe_allow_html=True)
\ No newline at end of file
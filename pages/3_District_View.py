@@ -5,219 +5,228 @@ import plotly.graph_objects as go
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_bihar_districts, load_karnataka_districts, load_maharashtra_districts
-from utils.ml_models import detect_anomalies
-
-st.set_page_config(page_title="District Explorer - PMJDY", page_icon="", layout="wide")
-
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-@st.cache_data
-def get_data():
-    return load_bihar_districts(), load_karnataka_districts(), load_maharashtra_districts()
-
-bihar, karnataka, maharashtra = get_data()
+from utils.page import setup_page, page_header
+from utils.data_loader import data_version
+from utils.compare import get_similarity, similarity_heatmap
+from utils.exports import download_button, export_format_picker
+from utils.search import matching_names
+from utils.districts import (
+    DISTRICT_METRICS, district_sources, get_districts, available_metrics, accounts_column, period_columns,
+)
+from utils.changes import CHANGE_MEASURES, get_change
+from utils.geo import choropleth, district_geojson
+from utils.panel import district_entity, get_panel
+
+setup_page("District Explorer - PMJDY", "District Explorer")
+
+sources = district_sources()
 
 with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  District Explorer")
-    st.markdown("---")
-    st.markdown("---")
-    selected_state = st.radio(" Select State", ["Bihar", "Karnataka", "Maharashtra"])
+    selected_state = st.selectbox(" Select State", list(sources), key="district_state")
     st.markdown("---")
     st.markdown("###  Filters")
-    district_search = st.text_input(" Search District", placeholder="Type district name...")
-    top_n = st.slider("Show Top N districts in charts", min_value=5, max_value=38, value=10, step=5)
+    district_search = st.text_input(" Search District", placeholder="Type district name...", key="district_search")
+    top_n = st.slider("Show Top N districts in charts", min_value=5, max_value=50, value=10, step=5)
     sort_direction = st.radio("Sort order", ["Descending", "Ascending"], horizontal=True)
+    export_fmt = export_format_picker()
     st.markdown("---")
-    st.markdown("<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'><small>District data: Bihar (38), Karnataka (30), Maharashtra (36)</small></div>", unsafe_allow_html=True)
+    st.markdown(f"<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'><small>District data available for {len(sources)} states: {', '.join(sources)}</small></div>", unsafe_allow_html=True)
 
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> District Explorer</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Search, compare and analyse districts - Bihar  Karnataka  Maharashtra</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("District Explorer", f"Search, compare and analyse districts - {'  '.join(sources)}")
 
 asc = (sort_direction == "Ascending")
-
-if selected_state == "Bihar":
-    df = bihar.copy()
-    df = detect_anomalies(df, "Accounts", "Balance_Crore")
-    if district_search:
-        df = df[df["District"].str.contains(district_search, case=False, na=False)]
-
-    st.markdown("###  Bihar - District Analysis")
-    st.markdown("<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>Data: Rajya Sabha Unstarred Question No. 246, 2022.</div>", unsafe_allow_html=True)
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Districts Shown", len(df))
-    col2.metric("Total Accounts", f"{df['Accounts'].sum()/1e5:.0f} Lakh")
-    col3.metric("Total Balance", f"₹{df['Balance_Crore'].sum():.0f} Cr")
-    col4.metric("Avg Balance/Account", f"₹{df['Avg_Balance_INR'].mean():.0f}")
-
-    # Sort metric selector
-    sort_metric = st.radio("Sort districts by:", ["Accounts", "Avg_Balance_INR", "Balance_Crore"], horizontal=True,
-                            format_func=lambda x: {"Accounts": "Total Accounts", "Avg_Balance_INR": "Avg Balance", "Balance_Crore": "Total Balance"}[x])
-
-    st.markdown("---")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f"**Top {top_n} Districts by {sort_metric.replace('_',' ')}**")
-        top_df = df.nlargest(top_n, sort_metric).sort_values(sort_metric, ascending=asc)
-        fig = px.bar(top_df, x=sort_metric, y="District", orientation="h",
-                     color="Avg_Balance_INR", color_continuous_scale="Blues",
-                     labels={sort_metric: sort_metric.replace("_"," "), "Avg_Balance_INR": "Avg Balance (₹)"}, height=400)
-        fig.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
-        st.plotly_chart(fig, use_container_width=True)
-
-    with col2:
-        st.markdown("**Accounts vs Balance - Anomaly Scatter**")
-        anomaly_filter = st.multiselect("Filter anomaly type:", df["Anomaly_Type"].unique().tolist(), default=df["Anomaly_Type"].unique().tolist())
-        scatter_df = df[df["Anomaly_Type"].isin(anomaly_filter)]
-        fig2 = px.scatter(scatter_df, x="Accounts", y="Avg_Balance_INR", hover_name="District",
-                          size="Accounts", color="Anomaly_Type",
-                          color_discrete_map={"Normal": "#2A9D8F", "Unusually High": "#E76F51", "Unusually Low": "#F4A261"},
-                          labels={"Accounts": "Total Accounts", "Avg_Balance_INR": "Avg Balance (₹)"}, height=400)
-        fig2.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
-        st.plotly_chart(fig2, use_container_width=True)
-
-    st.markdown("** Full Bihar District Data**")
-    bal_range = st.slider("Filter by Avg Balance (₹):", int(df["Avg_Balance_INR"].min()), int(df["Avg_Balance_INR"].max()),
-                           (int(df["Avg_Balance_INR"].min()), int(df["Avg_Balance_INR"].max())))
-    display = df[df["Avg_Balance_INR"].between(bal_range[0], bal_range[1])][
-        ["District", "Accounts", "Accounts_Lakh", "Balance_Crore", "Avg_Balance_INR", "Anomaly_Type"]
-    ].rename(columns={"Accounts_Lakh": "Accounts (Lakh)", "Balance_Crore": "Balance (Cr)", "Avg_Balance_INR": "Avg Balance (₹)", "Anomaly_Type": "Pattern"}
-    ).sort_values("Avg Balance (₹)", ascending=asc).reset_index(drop=True)
-    display.index = display.index + 1
-    st.dataframe(display.style.background_gradient(subset=["Avg Balance (₹)"], cmap="Greens"), use_container_width=True)
-    st.download_button(" Download Bihar Data", df.to_csv(index=False), "bihar_districts.csv", "text/csv")
-
-elif selected_state == "Karnataka":
-    df = karnataka.copy()
-    df = detect_anomalies(df, "Total_Accounts")
-    if district_search:
-        df = df[df["District"].str.contains(district_search, case=False, na=False)]
-
-    st.markdown("###  Karnataka - District Analysis")
-    st.markdown("<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>Data: Rajya Sabha Unstarred Question No. 2313, 2023.</div>", unsafe_allow_html=True)
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Districts Shown", len(df))
-    col2.metric("Total Accounts", f"{df['Total_Accounts'].sum()/1e5:.0f} Lakh")
-    col3.metric("Avg Operative %", f"{df['Operative_Pct'].mean():.1f}%")
-    col4.metric("Avg Female %", f"{df['Female_Pct'].mean():.1f}%")
-
-    # Operative % filter
-    op_range = st.slider("Filter by Operative % range:", 0, 100, (0, 100))
-    df_filtered = df[df["Operative_Pct"].between(op_range[0], op_range[1])]
-
-    sort_metric_k = st.radio("Sort districts by:", ["Total_Accounts", "Operative_Pct", "Female_Pct", "Inactive_Pct"], horizontal=True,
-                              format_func=lambda x: {"Total_Accounts": "Total Accounts", "Operative_Pct": "Operative %", "Female_Pct": "Female %", "Inactive_Pct": "Inactive %"}[x])
-
-    st.markdown("---")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f"**Operative vs Inactive - Top {top_n} Districts**")
-        df_sorted = df_filtered.sort_values("Operative_Pct", ascending=asc).tail(top_n)
-        fig = go.Figure()
-        fig.add_trace(go.Bar(name="Operative", y=df_sorted["District"], x=df_sorted["Operative_Accounts"], orientation="h", marker_color="#2A9D8F"))
-        fig.add_trace(go.Bar(name="Inactive", y=df_sorted["District"], x=df_sorted["Inactive_Accounts"], orientation="h", marker_color="#E76F51"))
-        fig.update_layout(barmode="stack", height=500, plot_bgcolor="#F8F9FA", paper_bgcolor="white", xaxis_title="Number of Accounts")
-        st.plotly_chart(fig, use_container_width=True)
-
-    with col2:
-        st.markdown("**Female Account Share by District**")
-        fig2 = px.bar(df_filtered.sort_values("Female_Pct", ascending=asc),
-                      x="Female_Pct", y="District", orientation="h",
-                      color="Female_Pct", color_continuous_scale="RdYlGn", range_color=[40, 60],
-                      labels={"Female_Pct": "Female Accounts (%)", "District": ""}, height=500)
-        fig2.add_vline(x=50, line_dash="dash", line_color="#1F4E79", annotation_text="50% parity")
-        fig2.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
-        st.plotly_chart(fig2, use_container_width=True)
-
-    st.markdown("** Full Karnataka District Data**")
-    display = df_filtered[["District", "Total_Accounts", "Male_Accounts", "Female_Accounts",
-                            "Operative_Accounts", "Female_Pct", "Operative_Pct", "Inactive_Pct"]].rename(columns={
-        "Total_Accounts": "Total", "Male_Accounts": "Male", "Female_Accounts": "Female",
-        "Operative_Accounts": "Operative", "Female_Pct": "Female %", "Operative_Pct": "Operative %", "Inactive_Pct": "Inactive %"
-    }).sort_values(sort_metric_k.replace("_Pct", " %").replace("_Accounts", "").replace("Total_Accounts","Total"), ascending=asc).reset_index(drop=True)
-    display.index = display.index + 1
-    st.dataframe(display.style.background_gradient(subset=["Operative %"], cmap="Greens"), use_container_width=True)
-    st.download_button(" Download Karnataka Data", df.to_csv(index=False), "karnataka_districts.csv", "text/csv")
-
-elif selected_state == "Maharashtra":
-    df = maharashtra.copy()
-    if district_search:
-        df = df[df["District"].str.contains(district_search, case=False, na=False)]
-
-    st.markdown("###  Maharashtra - 4-Year Trend (20222024)")
-    st.markdown("<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>Data: Rajya Sabha Unstarred Question No. 886, 2024. 4-point time series: Mar 2022, Mar 2023, Mar 2024, Jun 2024.</div>", unsafe_allow_html=True)
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Districts Shown", len(df))
-    col2.metric("Accounts (Jun 2024)", f"{df['Jun_2024'].sum()/1e5:.0f} Lakh")
-    col3.metric("Avg 2yr Growth", f"{df['Growth_2022_2024'].mean():.1f}%")
+panel = get_panel()
+has_history = len(panel.dates("Accounts", level="district", state=selected_state)) > 1
+version = data_version()
+
+# Only the selected state is loaded; each state is cached once per process after first use
+state_df = get_districts(selected_state)
+df = state_df
+if district_search:
+    df = df[df["District"].isin(matching_names(district_search, "district", selected_state))]
+
+metrics = available_metrics(df)
+account_col = accounts_column(selected_state, df)
+periods = period_columns(selected_state, df)
+label = lambda c: DISTRICT_METRICS.get(c, periods.get(c, c.replace("_", " ")))
+
+st.markdown(f"###  {selected_state} - District Analysis")
+st.markdown(f"<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>Data: {sources[selected_state]['source']}</div>", unsafe_allow_html=True)
+
+if df.empty:
+    st.warning("No districts match the search.")
+    st.stop()
+
+#  KPIs - district count, accounts, then the first two headline metrics the source has
+#  (sources with growth keep the last slot for the fastest-growing district)
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Districts Shown", len(df))
+if account_col:
+    col2.metric(f"Accounts ({periods[account_col]})" if account_col in periods else "Total Accounts",
+                f"{df[account_col].sum()/1e5:.0f} Lakh")
+headline = [m for m in ["Balance_Crore", "Avg_Balance_INR", "Operative_Pct", "Female_Pct", "Growth_2022_2024"] if m in metrics]
+has_growth = "Growth_2022_2024" in metrics and df["Growth_2022_2024"].notna().any()
+if has_growth:
     col4.metric("Fastest Growing", df.loc[df["Growth_2022_2024"].idxmax(), "District"])
+for col, m in zip([col3] if has_growth else [col3, col4], headline):
+    if m == "Balance_Crore":
+        col.metric("Total Balance", f"₹{df[m].sum():.0f} Cr")
+    elif m == "Avg_Balance_INR":
+        col.metric("Avg Balance/Account", f"₹{df[m].mean():.0f}")
+    else:
+        col.metric(f"Avg {label(m)}", f"{df[m].mean():.1f}%")
+
+#  Range filter on the first ratio-style metric
+ratio_metrics = [m for m in metrics if m not in ("Accounts", "Total_Accounts", "Balance_Crore")]
+df_filtered = df
+if ratio_metrics:
+    range_metric = ratio_metrics[0]
+    r_min, r_max = int(df[range_metric].min()), int(df[range_metric].max())
+    if r_min < r_max:
+        r_range = st.slider(f"Filter by {label(range_metric)}:", r_min, r_max, (r_min, r_max))
+        df_filtered = df[df[range_metric].between(r_range[0], r_range[1]) | df[range_metric].isna()]
+
+sort_metric = st.radio("Sort districts by:", metrics, horizontal=True, format_func=label)
+color_metric = next((m for m in ["Avg_Balance_INR", "Operative_Pct", "Growth_2022_2024"] if m in metrics), sort_metric)
 
-    # Growth range filter
-    g_min = float(df["Growth_2022_2024"].min())
-    g_max = float(df["Growth_2022_2024"].max())
-    growth_range = st.slider("Filter by Growth % (20222024):", round(g_min), round(g_max), (round(g_min), round(g_max)))
-    df_filtered = df[df["Growth_2022_2024"].between(growth_range[0], growth_range[1])]
-
-    st.markdown("---")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f"**Top {top_n} Districts by Growth %**")
-        top_df = df_filtered.nlargest(top_n, "Growth_2022_2024").sort_values("Growth_2022_2024", ascending=asc)
-        fig = px.bar(top_df, x="Growth_2022_2024", y="District", orientation="h",
-                     color="Growth_2022_2024", color_continuous_scale="RdYlGn",
-                     labels={"Growth_2022_2024": "Growth % (20222024)", "District": ""}, height=500)
-        fig.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
-        st.plotly_chart(fig, use_container_width=True)
-
-    with col2:
-        st.markdown("**Select District - 4-Year Trend**")
-        district_options = sorted(df["District"].tolist())
-        selected_district = st.selectbox("Choose District", district_options)
+st.markdown("---")
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown(f"**Top {top_n} Districts by {label(sort_metric)}**")
+    top_df = df_filtered.nlargest(top_n, sort_metric).sort_values(sort_metric, ascending=asc)
+    fig = px.bar(top_df, x=sort_metric, y="District", orientation="h",
+                 color=color_metric, color_continuous_scale="RdYlGn" if color_metric == "Growth_2022_2024" else "Blues",
+                 labels={sort_metric: label(sort_metric), color_metric: label(color_metric), "District": ""}, height=450)
+    fig.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
+    st.plotly_chart(fig, use_container_width=True)
+
+with col2:
+    # States with account counts at more than one date show a district trend, the rest an
+    # anomaly scatter of accounts vs the next metric
+    y_metric = next((m for m in metrics if m != account_col), None) if account_col else None
+    if has_history:
+        st.markdown("**Select District - Account Trend**")
+        selected_district = st.selectbox("Choose District", sorted(df["District"].tolist()))
         row = df[df["District"] == selected_district].iloc[0]
-        trend_data = pd.DataFrame({
-            "Period": ["Mar 2022", "Mar 2023", "Mar 2024", "Jun 2024"],
-            "Accounts": [row["Mar_2022"], row["Mar_2023"], row["Mar_2024"], row["Jun_2024"]]
-        }).dropna()
+        history = panel.series(district_entity(selected_state, selected_district), "Accounts")
+        trend_data = pd.DataFrame({"Period": history.index.strftime("%b %Y"), "Accounts": history.to_numpy()})
         fig2 = px.line(trend_data, x="Period", y="Accounts", markers=True,
                        title=f"{selected_district} - Account Growth Trend",
                        labels={"Accounts": "PMJDY Accounts", "Period": ""}, height=350)
         fig2.update_traces(line_color="#1F4E79", marker_size=10)
         fig2.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
         st.plotly_chart(fig2, use_container_width=True)
-        if pd.notna(row["Growth_2022_2024"]):
+        if "Growth_2022_2024" in df.columns and pd.notna(row["Growth_2022_2024"]):
             st.metric("2-Year Growth", f"{row['Growth_2022_2024']:.1f}%", f"vs state avg {df['Growth_2022_2024'].mean():.1f}%")
+    elif y_metric and "Anomaly_Type" in df_filtered.columns:
+        st.markdown(f"**{label(account_col)} vs {label(y_metric)} - Anomaly Scatter**")
+        anomaly_types = df_filtered["Anomaly_Type"].unique().tolist()
+        anomaly_filter = st.multiselect("Filter anomaly type:", anomaly_types, default=anomaly_types)
+        scatter_df = df_filtered[df_filtered["Anomaly_Type"].isin(anomaly_filter)]
+        fig2 = px.scatter(scatter_df, x=account_col, y=y_metric, hover_name="District",
+                          size=account_col, color="Anomaly_Type",
+                          color_discrete_map={"Normal": "#2A9D8F", "Unusually High": "#E76F51", "Unusually Low": "#F4A261"},
+                          labels={account_col: label(account_col), y_metric: label(y_metric)}, height=450)
+        fig2.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
+        st.plotly_chart(fig2, use_container_width=True)
 
-    # Multi-district comparison
+#  District map - only when a boundary file for the state is installed under data/geo/
+districts_geo = district_geojson(selected_state, df["District"])
+if districts_geo is not None:
+    st.markdown("---")
+    st.markdown(f"**{selected_state} - {label(sort_metric)} by District**")
+    st.plotly_chart(choropleth(df_filtered, districts_geo, "District", sort_metric, label(sort_metric), height=480),
+                    use_container_width=True)
+
+#  Account composition - sources that split operative / gender counts
+has_operative = {"Operative_Accounts", "Inactive_Accounts"} <= set(df_filtered.columns)
+has_gender = "Female_Pct" in metrics
+if has_operative or has_gender:
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    if has_operative:
+        with col1:
+            st.markdown(f"**Operative vs Inactive - Top {top_n} Districts**")
+            df_sorted = df_filtered.sort_values("Operative_Pct", ascending=asc).tail(top_n)
+            fig = go.Figure()
+            fig.add_trace(go.Bar(name="Operative", y=df_sorted["District"], x=df_sorted["Operative_Accounts"], orientation="h", marker_color="#2A9D8F"))
+            fig.add_trace(go.Bar(name="Inactive", y=df_sorted["District"], x=df_sorted["Inactive_Accounts"], orientation="h", marker_color="#E76F51"))
+            fig.update_layout(barmode="stack", height=500, plot_bgcolor="#F8F9FA", paper_bgcolor="white", xaxis_title="Number of Accounts")
+            st.plotly_chart(fig, use_container_width=True)
+    if has_gender:
+        with col2 if has_operative else col1:
+            st.markdown("**Female Account Share by District**")
+            fig2 = px.bar(df_filtered.sort_values("Female_Pct", ascending=asc),
+                          x="Female_Pct", y="District", orientation="h",
+                          color="Female_Pct", color_continuous_scale="RdYlGn", range_color=[40, 60],
+                          labels={"Female_Pct": "Female Accounts (%)", "District": ""}, height=500)
+            fig2.add_vline(x=50, line_dash="dash", line_color="#1F4E79", annotation_text="50% parity")
+            fig2.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
+            st.plotly_chart(fig2, use_container_width=True)
+
+#  Multi-district comparison - sources with a time series
+if has_history:
     st.markdown("---")
     st.markdown("** Compare Multiple Districts**")
     compare_districts = st.multiselect("Select districts to compare:", sorted(df["District"].tolist()), default=sorted(df["District"].tolist())[:5])
     if compare_districts:
-        comp_df = df[df["District"].isin(compare_districts)].melt(
-            id_vars="District", value_vars=["Mar_2022", "Mar_2023", "Mar_2024", "Jun_2024"],
-            var_name="Period", value_name="Accounts"
-        ).dropna()
-        comp_df["Period"] = comp_df["Period"].map({"Mar_2022": "Mar 2022", "Mar_2023": "Mar 2023", "Mar_2024": "Mar 2024", "Jun_2024": "Jun 2024"})
+        comp_df = panel.range(metric="Accounts", entities=[district_entity(selected_state, d) for d in compare_districts])
+        comp_df = comp_df.rename(columns={"district": "District", "value": "Accounts"})
+        comp_df["Period"] = comp_df["date"].dt.strftime("%b %Y")
         fig3 = px.line(comp_df, x="Period", y="Accounts", color="District", markers=True, height=400)
         fig3.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
         st.plotly_chart(fig3, use_container_width=True)
 
-    st.markdown("** Full Maharashtra District Data**")
-    display = df_filtered[["District", "Mar_2022", "Mar_2023", "Mar_2024", "Jun_2024", "Growth_2022_2024"]].rename(columns={
-        "Mar_2022": "Mar 2022", "Mar_2023": "Mar 2023", "Mar_2024": "Mar 2024", "Jun_2024": "Jun 2024", "Growth_2022_2024": "Growth %"
-    }).sort_values("Growth %", ascending=asc).reset_index(drop=True)
-    display.index = display.index + 1
-    st.dataframe(display.style.background_gradient(subset=["Growth %"], cmap="Greens"), use_container_width=True)
-    st.download_button(" Download Maharashtra Data", df.to_csv(index=False), "maharashtra_districts.csv", "text/csv")
+    # Any pair of snapshots - each (window, metric) is computed once per data version
+    st.markdown("** Period-over-Period Change**")
+    dates = panel.dates("Accounts", level="district", state=selected_state)
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        change_from, change_to = st.select_slider("Between:", options=dates, value=(dates[0], dates[-1]),
+                                                  format_func=lambda d: d.strftime("%b %Y"))
+    with col2:
+        measure = st.radio("Show:", list(CHANGE_MEASURES), format_func=CHANGE_MEASURES.get, horizontal=True)
+    if change_from < change_to:
+        change = get_change("Accounts", change_from, change_to, level="district", state=selected_state)
+        change = change[change["district"].isin(df_filtered["District"])]
+        change_top = change.nlargest(top_n, measure).sort_values(measure, ascending=asc)
+        fig4 = px.bar(change_top, x=measure, y="district", orientation="h", color=measure, color_continuous_scale="RdYlGn",
+                      hover_data={"value_start": ":,.0f", "value_end": ":,.0f", "Years": True},
+                      labels={measure: CHANGE_MEASURES[measure], "district": "", "value_start": change_from.strftime("%b %Y"),
+                              "value_end": change_to.strftime("%b %Y")},
+                      title=f"Top {top_n} Districts by {CHANGE_MEASURES[measure]}, "
+                            f"{change_from.strftime('%b %Y')} - {change_to.strftime('%b %Y')}", height=420)
+        fig4.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white")
+        st.plotly_chart(fig4, use_container_width=True)
+        if len(change) < len(df_filtered):
+            st.caption(f"{len(df_filtered) - len(change)} district(s) have no figure at one of the two dates.")
+    else:
+        st.caption("Pick two different dates to compare.")
+
+#  Similar districts - nearest neighbours on all of the source's metrics at once
+similarity = get_similarity(selected_state)
+if len(similarity.names) > 2 and similarity.metrics:
+    st.markdown("---")
+    st.markdown(f"** Similar Districts** - compared on {', '.join(label(m) for m in similarity.metrics)}")
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        anchor = st.selectbox("Find districts similar to", sorted(df["District"].tolist()), key="district_similar_to")
+        neighbours = similarity.nearest(anchor, k=min(8, len(similarity.names) - 1))
+        st.dataframe(neighbours.rename(columns={"Name": "District"}), hide_index=True, use_container_width=True)
+    with col2:
+        st.plotly_chart(similarity_heatmap(similarity.matrix([anchor] + neighbours["Name"].tolist()), height=380),
+                        use_container_width=True)
+
+st.markdown(f"** Full {selected_state} District Data**")
+table_cols = ["District"] + list(periods) + [m for m in metrics if m not in periods]
+if "Anomaly_Type" in df_filtered.columns:
+    table_cols.append("Anomaly_Type")
+display = df_filtered[table_cols].rename(columns={**{m: label(m) for m in table_cols}, "Anomaly_Type": "Pattern"}
+    ).sort_values(label(sort_metric), ascending=asc).reset_index(drop=True)
+display.index = display.index + 1
+st.dataframe(display.style.background_gradient(subset=[label(sort_metric)], cmap="Greens"), use_container_width=True)
+download_button(f" Download {selected_state} Data", df, f"{selected_state.lower().replace(' ', '_')}_districts", version,
+                {"search": district_search}, export_fmt)
 
 st.markdown("---")
-st.markdown("<div class='gov-footer'> PMJDY Dashboard  District data: Rajya Sabha Questions 20222024  Ministry of Finance, GoI</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("<div class='gov-footer'> PMJDY Dashboard  District data: Rajya Sabha Questions 20222024  Ministry of Finance, GoI</div>", unsafe_allow_html=True)
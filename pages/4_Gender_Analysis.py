@@ -1,29 +1,19 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_karnataka_districts, load_state_data
+from utils.page import setup_page, page_header
+from utils.data_loader import data_version
+from utils.exports import download_button, export_format_picker
+from utils.snapshot import get_frames
 
-st.set_page_config(page_title="Gender Analysis - PMJDY", page_icon="", layout="wide")
+setup_page("Gender Analysis - PMJDY", "Gender Analysis")
 
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-@st.cache_data
-def get_data():
-    return load_karnataka_districts(), load_state_data()
-
-karnataka, state_df = get_data()
+karnataka, state_df = get_frames("karnataka", "states")
 
 with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  Gender Analysis")
-    st.markdown("---")
-    st.markdown("---")
     st.markdown("###  Filters")
     district_search = st.text_input(" Search District", placeholder="Type district name...")
     female_range = st.slider("Female % range:", 0, 100, (0, 100))
@@ -35,12 +25,7 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'><small>Gender data: Karnataka 30 districts (2023)</small></div>", unsafe_allow_html=True)
 
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> Gender Analysis - Female Financial Inclusion</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Who holds PMJDY accounts? Are women being left behind?</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("Gender Analysis - Female Financial Inclusion", "Who holds PMJDY accounts? Are women being left behind?")
 
 st.markdown("""
 <div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>
@@ -74,7 +59,7 @@ st.plotly_chart(fig_donut, use_container_width=True)
 st.markdown("---")
 
 #  APPLY FILTERS 
-df = karnataka.copy()
+df = karnataka
 if district_search:
     df = df[df["District"].str.contains(district_search, case=False, na=False)]
 df = df[df["Female_Pct"].between(female_range[0], female_range[1])]
@@ -149,7 +134,8 @@ display = df[["District", "Total_Accounts", "Male_Accounts", "Female_Accounts",
 }).sort_values(table_sort, ascending=asc).reset_index(drop=True)
 display.index = display.index + 1
 st.dataframe(display.style.background_gradient(subset=["Female %", "Operative %"], cmap="Greens"), use_container_width=True)
-st.download_button(" Download Karnataka Gender Data", karnataka.to_csv(index=False), "karnataka_gender.csv", "text/csv")
+export_fmt = export_format_picker()
+download_button(f" Download Karnataka Gender Data ({export_fmt})", karnataka, "karnataka_gender", data_version(), fmt=export_fmt)
 
 st.markdown("---")
 st.markdown("<div class='gov-footer'> PMJDY Dashboard  Gender data: Rajya Sabha Q2313, 2023  Ministry of Finance, GoI</div>", unsafe_allow_html=True)
\ No newline at end of file
@@ -1,29 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_balance_distribution, load_state_data, load_bihar_districts
+from utils.page import setup_page, page_header
+from utils.data_loader import data_version
+from utils.exports import download_button, export_format_picker
+from utils.snapshot import get_frames
+from utils.sketch import BALANCE_SLABS, get_sketch_store
 
-st.set_page_config(page_title="Balance Analysis - PMJDY", page_icon="", layout="wide")
+setup_page("Balance Analysis - PMJDY", "Balance Analysis")
 
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-@st.cache_data
-def get_data():
-    return load_balance_distribution(), load_state_data(), load_bihar_districts()
-
-balance_dist, state_df, bihar = get_data()
+balance_dist, state_df, bihar = get_frames("balance", "states", "bihar")
 
 with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  Balance Analysis")
-    st.markdown("---")
-    st.markdown("---")
     st.markdown("###  Filters")
 
     # Region filter for state chart
@@ -57,17 +48,12 @@ filtered_states = state_df[
     state_df["Avg_Balance_INR"].between(bal_range[0], bal_range[1])
 ]
 
-filtered_bihar = bihar.copy()
+filtered_bihar = bihar
 if bihar_search:
     filtered_bihar = filtered_bihar[filtered_bihar["District"].str.contains(bihar_search, case=False, na=False)]
 filtered_bihar = filtered_bihar[filtered_bihar["Avg_Balance_INR"].between(bihar_bal_range[0], bihar_bal_range[1])]
 
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> Balance Analysis - What's Actually in the Accounts?</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Are PMJDY accounts holding money, or just sitting empty?</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("Balance Analysis - What's Actually in the Accounts?", "Are PMJDY accounts holding money, or just sitting empty?")
 
 st.markdown("""
 <div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>
@@ -126,6 +112,68 @@ with col2:
 
 st.markdown("---")
 
+#  ACCOUNT-LEVEL DISTRIBUTION 
+st.markdown("###  Account-level Balance Distribution")
+store = get_sketch_store()
+if store is None:
+    st.info("Account-level balance sketches haven't been built yet. Run `python build_sketches.py <account exports>` "
+            "to get balance percentiles for any region, state or district.")
+else:
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        scope = st.radio("Scope:", ["National", "Region", "State", "District"], horizontal=True)
+    with col2:
+        sk_regions = sk_states = sk_districts = None
+        if scope == "Region":
+            sk_regions = st.multiselect("Regions:", store.regions(), default=store.regions()[:1])
+        elif scope == "State":
+            sk_states = st.multiselect("States:", sorted(store.states), default=sorted(store.states)[:1])
+        elif scope == "District":
+            sk_state = st.selectbox("State:", sorted(store.states))
+            sk_names = store.districts_of(sk_state)
+            sk_districts = [(sk_state, d) for d in st.multiselect("Districts:", sk_names, default=sk_names[:3])]
+
+    if scope != "National" and not (sk_regions or sk_states or sk_districts):
+        st.info(f"Select at least one {scope.lower()}.")
+    else:
+        sketch, n_parts, merge_ms = store.combine(sk_regions, sk_states, sk_districts)
+        pcts = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+        values = sketch.quantiles([p / 100 for p in pcts])
+        q = dict(zip(pcts, values))
+
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Accounts", f"{sketch.count/1e5:,.1f} Lakh")
+        col2.metric("Median Balance", f"₹{q[50]:,.0f}")
+        col3.metric("90th Percentile", f"₹{q[90]:,.0f}")
+        col4.metric("99th Percentile", f"₹{q[99]:,.0f}")
+        col5.metric("Zero Balance", f"{sketch.zero_count / sketch.count * 100:.1f}%")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            pct_df = pd.DataFrame({"Percentile": pcts, "Balance": values})
+            fig_q = px.line(pct_df, x="Percentile", y="Balance", markers=True, log_y=True,
+                            labels={"Balance": "Account Balance (₹, log scale)", "Percentile": "Percentile of Accounts"},
+                            title="Balance by Percentile")
+            fig_q.update_traces(line_color="#1F4E79", marker_size=8)
+            fig_q.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white", height=380)
+            st.plotly_chart(fig_q, use_container_width=True)
+        with col2:
+            slab_counts = sketch.histogram([lo for _, lo, _ in BALANCE_SLABS] + [BALANCE_SLABS[-1][2]])
+            slab_df = pd.DataFrame({"Particulars": [name for name, _, _ in BALANCE_SLABS], "Accounts": slab_counts})
+            slab_df["Share"] = (slab_df["Accounts"] / max(sketch.count, 1) * 100).round(1)
+            fig_s = px.bar(slab_df, x="Particulars", y="Share", text="Share",
+                           color="Share", color_continuous_scale="Blues",
+                           labels={"Share": "Accounts (%)", "Particulars": "Balance Slab"},
+                           title="Share of Accounts by Balance Slab")
+            fig_s.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+            fig_s.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white", height=380, xaxis_tickangle=-20)
+            st.plotly_chart(fig_s, use_container_width=True)
+        st.caption(f"Merged {n_parts} sketch{'es' if n_parts != 1 else ''} in {merge_ms:.1f} ms  "
+                   f"Percentiles within ±{sketch.relative_accuracy*100:.0f}%  "
+                   f"Built {store.built_at} from {', '.join(store.sources) or 'account exports'}")
+
+st.markdown("---")
+
 #  STATE BALANCE COMPARISON 
 st.markdown(f"###  State-wise Avg Balance - {len(filtered_states)} States")
 
@@ -222,11 +270,15 @@ But average balances remain among the lowest globally. <b>Financial inclusion ac
 """, unsafe_allow_html=True)
 
 st.markdown("---")
+export_fmt = export_format_picker()
+version = data_version()
 col1, col2 = st.columns(2)
 with col1:
-    st.download_button(" Download Filtered State Data", filtered_states.to_csv(index=False), "pmjdy_balance_states.csv", "text/csv")
+    download_button(" Download Filtered State Data", filtered_states, "pmjdy_balance_states", version,
+                    {"regions": tuple(region_filter), "balance": bal_range}, export_fmt)
 with col2:
-    st.download_button(" Download Filtered Bihar Data", filtered_bihar.to_csv(index=False), "pmjdy_balance_bihar.csv", "text/csv")
+    download_button(" Download Filtered Bihar Data", filtered_bihar, "pmjdy_balance_bihar", version,
+                    {"search": bihar_search, "balance": bihar_bal_range}, export_fmt)
 
 st.markdown("---")
 st.markdown("<div class='gov-footer'> PMJDY Dashboard  Source: Ministry of Finance, GoI  World Bank Global Findex 2021  Data: 2024</div>", unsafe_allow_html=True)
\ No newline at end of file
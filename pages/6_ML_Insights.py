@@ -1,41 +1,18 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_state_data, load_maharashtra_districts
-from utils.ml_models import cluster_states, predict_underperformers, growth_predictor, detect_anomalies
+from utils.page import setup_page, page_header
+from utils.snapshot import get_frames
 
-st.set_page_config(page_title="ML Insights - PMJDY", page_icon="", layout="wide")
+setup_page("ML Insights - PMJDY", "ML Insights")
 
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Clusters, growth forecasts and anomaly scores are precomputed by build_snapshot.py
+df, growth_df = get_frames("states_ml", "growth")
+anomaly_df, anomaly_df2 = get_frames("state_accounts", "state_balance", group="anomalies")
 
-@st.cache_data
-def get_data():
-    df = load_state_data()
-    df = cluster_states(df)
-    df = predict_underperformers(df)
-    maha = load_maharashtra_districts()
-    return df, maha
-
-df, maha = get_data()
-
-with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  ML Insights")
-    st.markdown("---")
-
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> ML Insights - Machine Learning on PMJDY Data</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>K-Means clustering  Growth prediction  Anomaly detection  Underperformance identification</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("ML Insights - Machine Learning on PMJDY Data", "K-Means clustering  Growth prediction  Anomaly detection  Underperformance identification")
 
 st.markdown("""
 <div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>
@@ -151,7 +128,6 @@ with tabs[2]:
     Projects the annual growth rate and estimates when each district will reach 120% of current accounts (proxy for saturation).
     """)
 
-    growth_df = growth_predictor(maha)
     growth_df = growth_df.dropna(subset=["Annual_Growth"])
 
     col1, col2 = st.columns(2)
@@ -209,9 +185,6 @@ with tabs[3]:
     These deserve special investigation.
     """)
 
-    anomaly_df = detect_anomalies(df.reset_index(drop=True), "Accounts")
-    anomaly_df2 = detect_anomalies(df.reset_index(drop=True), "Avg_Balance_INR")
-
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("**Account Volume Anomalies**")
@@ -5,21 +5,17 @@ import sys, os
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_loader import load_state_data
+from utils.page import setup_page, page_header
+from utils.data_loader import data_version
+from utils.exports import download_button, export_format_picker
+from utils.snapshot import get_frames
+from utils.reports import (
+    RECOMMENDATIONS, REPORT_FORMATS, brief_status, pending_briefs, read_brief, submit_all, submit_brief,
+)
 
-st.set_page_config(page_title="Policy Brief - PMJDY", page_icon="", layout="wide")
+setup_page("Policy Brief - PMJDY", "Policy Brief")
 
-try:
-    with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-except:
-    pass
-
-@st.cache_data
-def get_data():
-    return load_state_data()
-
-df = get_data()
+df = get_frames("states")
 
 # Safe computed values
 total_accounts = df['Accounts'].sum()
@@ -32,11 +28,6 @@ if 'Region' in df.columns:
 
 #  SIDEBAR 
 with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  Policy Brief")
-    st.markdown("---")
-    st.markdown("---")
     st.markdown("**Who should read this?**")
     st.markdown(" Policy Researchers")
     st.markdown(" Journalists")
@@ -45,12 +36,7 @@ with st.sidebar:
     st.markdown(" Government Officers")
 
 #  HEADER 
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> Policy Brief - PMJDY Financial Inclusion</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Evidence-based findings and actionable recommendations from real government data</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("Policy Brief - PMJDY Financial Inclusion", "Evidence-based findings and actionable recommendations from real government data")
 
 #  EXECUTIVE SUMMARY 
 st.markdown("##  Executive Summary")
@@ -202,44 +188,7 @@ with st.expander(" Evidence for Finding 3 - Geographic Inequality", expanded=Fal
 st.markdown("---")
 st.markdown("##  Six Evidence-Based Recommendations")
 
-recs = [
-    {
-        "icon": "1",
-        "title": "Shift KPIs from Accounts Opened to Accounts Active",
-        "detail": "The government currently measures success by number of accounts opened. This incentivises superficial compliance. Recommended new KPI: % of accounts with at least 4 transactions per quarter. Tie Business Correspondent (BC) agent compensation to active accounts, not opened accounts.",
-        "impact": "High", "feasibility": "High", "timeline": "6 months"
-    },
-    {
-        "icon": "2",
-        "title": "Mandate 7-Day Balance Float on MGNREGA Wages",
-        "detail": "Require all MGNREGA wage payments to PMJDY accounts to maintain a minimum ₹500 balance for 7 days before full withdrawal is permitted. Pair with micro-interest incentive (even 0.5% extra) for maintaining balance. This builds the habit of keeping money in accounts.",
-        "impact": "High", "feasibility": "Medium", "timeline": "12 months"
-    },
-    {
-        "icon": "3",
-        "title": "Prioritize BC Network in ML-Identified High Priority Districts",
-        "detail": "The ML clustering in this dashboard identifies specific states and districts that are underperforming relative to their population. Use this model to guide Business Correspondent network expansion - place new agents in Needs Attention districts first.",
-        "impact": "High", "feasibility": "High", "timeline": "12-18 months"
-    },
-    {
-        "icon": "4",
-        "title": "Women-Specific Financial Literacy at MGNREGA Worksites",
-        "detail": "Karnataka data shows districts with higher female account shares have lower operative rates - suggesting women have accounts but lack agency to use them. Deploy financial literacy camps specifically targeting women at MGNREGA worksites, Anganwadi centres, and SHG meetings.",
-        "impact": "Medium", "feasibility": "High", "timeline": "6 months"
-    },
-    {
-        "icon": "5",
-        "title": "Interoperable Rural Digital Payment Infrastructure",
-        "detail": "People withdraw cash because there's nowhere rural to spend digitally. Expand UPI QR code acceptance among kirana stores, vegetable vendors and transport in districts with low operative rates. Subsidize POS terminals for rural merchants in High Priority districts.",
-        "impact": "High", "feasibility": "Medium", "timeline": "18-24 months"
-    },
-    {
-        "icon": "6",
-        "title": "State-Specific Strategies - One Policy Can't Fit All",
-        "detail": "There is a large gap between top and bottom performing states. These states need fundamentally different approaches. Southern states need activation strategies. Eastern states need infrastructure. Northeastern states need mobile banking solutions adapted to terrain.",
-        "impact": "High", "feasibility": "Medium", "timeline": "Ongoing"
-    }
-]
+recs = RECOMMENDATIONS
 
 for i, rec in enumerate(recs):
     with st.expander(f"{rec['icon']} {rec['title']}", expanded=(i == 0)):
@@ -300,13 +249,60 @@ with col1:
         "text/plain"
     )
 with col2:
-    csv_data = df.to_csv(index=False)
-    st.download_button(
-        " Download Full Dataset (CSV)",
-        csv_data,
-        "pmjdy_complete_dataset.csv",
-        "text/csv"
-    )
+    export_fmt = export_format_picker()
+    download_button(f" Download Full Dataset ({export_fmt})", df, "pmjdy_complete_dataset", data_version(), fmt=export_fmt)
+
+#  STATE BRIEFS 
+st.markdown("---")
+st.markdown("##  State Policy Briefs")
+st.markdown("<div style='background:#FFFFFF;border-left:4px solid #2563B0;border-radius:6px;padding:10px 14px;font-size:13px;color:#1E293B;line-height:1.6;'>Per-state briefs are rendered in the background and cached for this data release - once ready they download instantly.</div>", unsafe_allow_html=True)
+
+version = data_version()
+briefs_df = get_frames("states_ml")
+
+col1, col2 = st.columns([2, 1])
+with col1:
+    brief_state = st.selectbox("State / UT:", sorted(briefs_df["State"]))
+with col2:
+    brief_fmt = st.radio("Brief format:", list(REPORT_FORMATS), horizontal=True)
+
+
+# Poll only while briefs of this format are rendering. run_every is fixed when the fragment is
+# declared, so starting or finishing a batch does one full rerun to switch polling on or off.
+polling = pending_briefs(version, brief_fmt) > 0
+
+
+@st.fragment(run_every=2 if polling else None)
+def brief_panel():
+    # Re-runs on its own while polling so progress updates without rerunning (or blocking) the whole page
+    status = brief_status(version, brief_state, brief_fmt)
+    ready = sum(brief_status(version, s, brief_fmt) == "ready" for s in briefs_df["State"])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if status == "ready":
+            ext, mime = REPORT_FORMATS[brief_fmt]
+            st.download_button(f" Download {brief_state} Brief ({brief_fmt})",
+                               lambda: read_brief(version, brief_state, brief_fmt),
+                               f"pmjdy_brief_{brief_state.lower().replace(' ', '_')}.{ext}", mime, on_click="ignore")
+        elif status == "pending":
+            st.info(f"Rendering {brief_state} brief...")
+        else:
+            if status == "failed":
+                st.error("Previous render failed - try again.")
+            if st.button(f" Generate {brief_state} Brief"):
+                submit_brief(briefs_df, version, brief_state, brief_fmt)
+                st.rerun()
+    with col2:
+        if st.button(f" Generate All {len(briefs_df)} Briefs ({brief_fmt})"):
+            submit_all(briefs_df, version, brief_fmt)
+            st.rerun()
+    with col3:
+        st.metric("Briefs Ready", f"{ready}/{len(briefs_df)}", f"Data version {version}", delta_color="off")
+    if polling and not pending_briefs(version, brief_fmt):
+        st.rerun()
+
+
+brief_panel()
 
 #  SOURCES 
 st.markdown("---")
@@ -2,24 +2,12 @@ import streamlit as st
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from utils.page import setup_page, page_header
+from utils.cube import get_cube
 
-st.set_page_config(page_title="About - PMJDY Dashboard", page_icon="", layout="wide")
+setup_page("About - PMJDY Dashboard", "About")
 
-with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css"), encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-with st.sidebar:
-    st.page_link("app.py", label=" Back to Home")
-    st.markdown("---")
-    st.markdown("##  About")
-    st.markdown("---")
-
-st.markdown("""
-<div class='gov-header'>
-    <h1 style='margin:0; font-size:24px;'> About This Dashboard</h1>
-    <p style='margin:5px 0 0 0; opacity:0.9;'>Data sources  Methodology  Limitations  Contact</p>
-</div>
-""", unsafe_allow_html=True)
+page_header("About This Dashboard", "Data sources  Methodology  Limitations  Contact")
 
 st.markdown("---")
 
@@ -133,6 +121,19 @@ with col2:
 
 st.markdown("---")
 
+st.markdown("###  Reconciliation Against Source Totals")
+st.markdown("""
+District and state figures are rolled up district  state  region  national and compared with the
+**Total** rows the source files report. Gaps between a state's districts and its state-level figure
+mostly reflect the sources being published at different dates.
+""")
+st.dataframe(get_cube().reconciliation, use_container_width=True, hide_index=True,
+             column_config={"Source Figure": st.column_config.NumberColumn(format="%.2f"),
+                            "Computed": st.column_config.NumberColumn(format="%.2f"),
+                            "Gap": st.column_config.NumberColumn(format="%.2f")})
+
+st.markdown("---")
+
 st.markdown("###  Useful Links")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
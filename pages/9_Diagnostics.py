@@ -0,0 +1,97 @@
+import streamlit as st
+import plotly.express as px
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from utils.page import setup_page, page_header
+from utils import instrument, profiling
+from utils.snapshot import get_snapshot
+
+# Internal page - not linked from Home or the sidebar, open it at /Diagnostics
+setup_page("Diagnostics - PMJDY", "Diagnostics")
+
+page_header("Rerun Diagnostics", "Section latency  Cache hits  Memory", font_size=22)
+
+rss, peak = instrument.memory_mb()
+snap = get_snapshot()
+samples = instrument.section_samples()
+
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Process RSS", f"{rss:.0f} MB" if rss else "n/a")
+c2.metric("Peak RSS", f"{peak:.0f} MB" if peak else "n/a")
+c3.metric("Recorded Calls", f"{len(samples):,}")
+c4.metric("Uptime", f"{instrument.uptime_seconds() / 60:.0f} min")
+
+if not instrument.enabled():
+    st.info("Instrumentation is off. Start the app with `PMJDY_METRICS=1 streamlit run app.py` "
+            "to record loader, model, figure and table timings.")
+
+st.markdown("---")
+
+#  SECTION LATENCY
+st.markdown("####  Section Latency")
+if samples.empty:
+    st.caption("No spans recorded yet - browse a few pages and come back.")
+else:
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        page_filter = st.selectbox("Page:", ["All pages"] + sorted(samples["Page"].unique()))
+    view = samples if page_filter == "All pages" else samples[samples["Page"] == page_filter]
+    summary = instrument.section_summary()
+    if page_filter != "All pages":
+        summary = summary[summary["Page"] == page_filter]
+    top_sections = summary.groupby("Section")["Total"].sum().sort_values(ascending=False).index.tolist()
+    with col2:
+        sections = st.multiselect("Sections:", top_sections, default=top_sections[:6])
+
+    if sections:
+        fig = px.histogram(view[view["Section"].isin(sections)], x="ms", color="Section", nbins=40,
+                           barmode="overlay", opacity=0.7, labels={"ms": "Duration (ms)"},
+                           title="Call Duration by Section")
+        fig.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white", height=380)
+        st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(summary.rename(columns={"Mean": "Mean ms", "P50": "P50 ms", "P95": "P95 ms",
+                                         "Max": "Max ms", "Total": "Total ms"}),
+                 use_container_width=True, hide_index=True)
+
+st.markdown("---")
+
+#  CACHES & MEMORY
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("####  Cache Hits")
+    caches = instrument.cache_summary()
+    if caches.empty:
+        st.caption("No cache lookups recorded.")
+    else:
+        st.dataframe(caches, use_container_width=True, hide_index=True)
+with col2:
+    st.markdown("####  Snapshot Frames")
+    frames = [(name, len(df), df.memory_usage(deep=True).sum() / 1024) for name, df in snap["frames"].items()]
+    frames += [(f"anomalies.{name}", len(df), df.memory_usage(deep=True).sum() / 1024) for name, df in snap["anomalies"].items()]
+    st.dataframe(
+        [{"Frame": name, "Rows": rows, "Memory KB": round(kb, 1)} for name, rows, kb in frames],
+        use_container_width=True, hide_index=True,
+    )
+    st.caption(f"Data version {snap['data_version']} - snapshot built {snap['built_at']}")
+
+st.markdown("---")
+
+#  PROFILES
+st.markdown("####  Profiled Runs")
+runs = profiling.list_runs()
+if runs.empty:
+    st.caption("No profiles yet. Start the app with `PMJDY_PROFILE=query` and open any page with `?profile=1` "
+               "(or `PMJDY_PROFILE=1` for every rerun), or run `python analysis.py --profile`.")
+else:
+    run = st.selectbox("Run:", runs["Run"].tolist())
+    path = runs.loc[runs["Run"] == run, "Path"].iloc[0]
+    st.dataframe(profiling.hot_functions(path, top=15), use_container_width=True, hide_index=True)
+    for name, report in profiling.top_allocations(path).items():
+        with st.expander(f"Top allocations - {name}"):
+            st.code(report, language=None)
+    st.caption(f"Profiles in {profiling.PROFILE_DIR} - `python profile_report.py {run}` for the full listing")
+
+if instrument.enabled() and st.button("Reset recorded metrics"):
+    instrument.reset()
+    st.rerun()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from utils.profiling import PROFILE_DIR, SCOPES, hot_functions, list_runs, top_allocations
+
+# Show the hottest functions in utils/ and pages/ for a profiled rerun or analysis.py run.
+# Profiles are recorded with PMJDY_PROFILE=1 (or =query plus ?profile=1) and analysis.py --profile.
+#
+#   python profile_report.py                     # latest run
+#   python profile_report.py --list
+#   python profile_report.py 20261018-2301       # run whose name starts with this
+#   python profile_report.py --sort own --all --top 40 --allocations
+
+parser = argparse.ArgumentParser(description="Summarise cProfile and tracemalloc output from profiled runs")
+parser.add_argument("run", nargs="?", help="run directory name or prefix (default: newest)")
+parser.add_argument("--dir", default=PROFILE_DIR, help="directory the profiled runs are written to")
+parser.add_argument("--list", action="store_true", help="list profiled runs")
+parser.add_argument("--top", type=int, default=25)
+parser.add_argument("--sort", choices=["cumulative", "own"], default="cumulative")
+parser.add_argument("--all", action="store_true", help="include library and stdlib functions, not only utils/, pages/ and the entry scripts")
+parser.add_argument("--allocations", action="store_true", help="also print the top allocation sites")
+args = parser.parse_args()
+
+runs = list_runs(args.dir)
+if runs.empty:
+    print(f" No profiled runs in {args.dir}")
+    sys.exit(1)
+if args.list:
+    print(runs[["Run", "Profiles", "Seconds"]].to_string(index=False))
+    sys.exit(0)
+
+matches = runs[runs["Run"].str.startswith(args.run)] if args.run else runs
+if matches.empty:
+    print(f" No run matching {args.run!r} - try --list")
+    sys.exit(1)
+run = matches.iloc[0]
+print(f" {run['Run']}: {run['Profiles']} profile(s), {run['Seconds']:.2f}s profiled\n")
+
+scopes = None if args.all else SCOPES
+hot = hot_functions(run["Path"], scopes=scopes, top=args.top, sort=args.sort)
+if hot.empty:
+    print(" No functions from utils/, pages/ or the entry scripts were recorded - try --all")
+else:
+    print(hot.to_string(index=False))
+
+if args.allocations:
+    for name, report in top_allocations(run["Path"]).items():
+        print(f"\n {name} - top allocations")
+        print(report)
@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from utils.db import READ_PATH, district_join, get_engine
+from utils.render import RENDER_DIR, render_dashboards
+from utils.summaries import UNASSIGNED, district_tiers
+
+# Render the 4-panel analysis dashboard for every state and region, headless and in parallel.
+# Groups whose data and drawing code are unchanged since the last run are skipped.
+#
+#   python render_dashboards.py
+#   python render_dashboards.py --db /tmp/syn/synthetic.db --out /tmp/dashboards --jobs 4
+#   python render_dashboards.py --by state --dpi 120 --force
+
+parser = argparse.ArgumentParser(description="Render per-state and per-region dashboards as PNGs")
+parser.add_argument("--db", default=READ_PATH, help="SQLite store with pmjdy_accounts and infrastructure")
+parser.add_argument("--out", default=RENDER_DIR, help="directory to write the PNGs and manifest into")
+parser.add_argument("--by", nargs="+", choices=["state", "region"], default=["state", "region"])
+parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+parser.add_argument("--dpi", type=int, default=180)
+parser.add_argument("--force", action="store_true", help="re-render every dashboard")
+args = parser.parse_args()
+
+engine = get_engine(args.db, readonly=True)
+df = district_join(engine=engine)
+# Tiers come from analysis.py's tiers phase; districts it has not seen are drawn as Unassigned
+tiers = district_tiers(engine) or {}
+df["intervention_tier"] = [tiers.get(k, UNASSIGNED) for k in zip(df["state"], df["district"])]
+
+result = render_dashboards(df, args.out, by=args.by, jobs=args.jobs, force=args.force, dpi=args.dpi, log=print)
+print(f" {result['rendered']} rendered, {result['skipped']} unchanged in {result['seconds']:.1f}s -> {args.out}")
@@ -0,0 +1,157 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from utils.db import bulk_load, ensure_indexes, get_engine
+from utils.instrument import timed
+from utils.sketch import _iter_chunks
+from utils.summaries import append_districts, rebuild_summaries
+
+# Account-level column names (the synthetic generator's and build_sketches.py's defaults)
+ACCOUNT_COLUMNS = {
+    "state": "State",
+    "district": "District",
+    "district_id": "District_ID",
+    "area_type": "Area_Type",
+    "balance": "Balance",
+    "gender": "Gender",
+    "operative": "Operative",
+}
+FEMALE = ["F", "f", "Female", "female", "FEMALE"]
+DISTRICT_KEYS = ["state", "district", "district_id", "area_type"]
+
+
+def _present(path, columns):
+    """The configured columns that actually exist in the file"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        names = set(pq.ParquetFile(path).schema_arrow.names)
+    else:
+        names = set(pd.read_csv(path, nrows=0).columns)
+    return {k: c for k, c in columns.items() if c in names}
+
+
+def partial_aggregate(chunk, cols, keys):
+    """One chunk -> sums per key; cols maps logical names to the chunk's column names"""
+    balance = pd.to_numeric(chunk[cols["balance"]], errors="coerce").fillna(0.0).to_numpy()
+    frame = pd.DataFrame({k: chunk[cols[k]] for k in keys})
+    frame["accounts"] = 1
+    frame["zero_accounts"] = (balance <= 0).astype(np.int64)
+    frame["balance_sum"] = balance
+    if "gender" in cols:
+        frame["female_accounts"] = chunk[cols["gender"]].isin(FEMALE).to_numpy(dtype=np.int64)
+    if "operative" in cols:
+        frame["operative_accounts"] = chunk[cols["operative"]].astype(bool).to_numpy(dtype=np.int64)
+    return frame.groupby(keys, observed=True, sort=False).sum()
+
+
+def merge_partials(partials):
+    """Add partial aggregates over the same keys - they are plain sums, so any split of the data merges exactly"""
+    partials = [p for p in partials if p is not None and len(p)]
+    if not partials:
+        return None
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(partials).groupby(level=list(range(partials[0].index.nlevels)), observed=True, sort=False).sum()
+
+
+def aggregate_file(path, columns=None, chunksize=1_000_000):
+    """Stream one CSV/Parquet file of account records into per-district partial sums"""
+    cols = _present(path, columns or ACCOUNT_COLUMNS)
+    missing = {"state", "district", "balance"} - set(cols)
+    if missing:
+        raise ValueError(f"{os.path.basename(path)} lacks columns for {sorted(missing)}")
+    keys = [k for k in DISTRICT_KEYS if k in cols]
+    partial, rows = None, 0
+    for chunk in _iter_chunks(path, list(cols.values()), chunksize):
+        rows += len(chunk)
+        partial = merge_partials([partial, partial_aggregate(chunk, cols, keys)])
+    return partial, rows
+
+
+@timed()
+def aggregate_accounts(paths, columns=None, chunksize=1_000_000, jobs=None):
+    """Per-district partial sums over many files, one worker process per file at a time.
+    Returns (partial, rows, seconds)."""
+    start = time.perf_counter()
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    if jobs <= 1:
+        results = [aggregate_file(p, columns, chunksize) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(aggregate_file, paths, [columns] * len(paths), [chunksize] * len(paths)))
+    partial = merge_partials([p for p, _ in results])
+    return partial, sum(r for _, r in results), time.perf_counter() - start
+
+
+def rollup(partial, keys):
+    """Re-key a partial to a coarser grouping (e.g. ["area_type"] or ["state"]) - exact, since it only adds"""
+    return partial.groupby(level=keys, observed=True, sort=False).sum()
+
+
+def metrics(partial):
+    """zero_balance_pct, avg_balance_inr and total_accounts_lakh (plus shares where available) from sums"""
+    out = pd.DataFrame(index=partial.index)
+    accounts = partial["accounts"].astype(np.float64)
+    out["total_accounts_lakh"] = (accounts / 1e5).round(2)
+    out["zero_balance_pct"] = (partial["zero_accounts"] / accounts * 100).round(2)
+    out["avg_balance_inr"] = (partial["balance_sum"] / accounts).round(0)
+    if "female_accounts" in partial.columns:
+        out["female_pct"] = (partial["female_accounts"] / accounts * 100).round(2)
+    if "operative_accounts" in partial.columns:
+        out["operative_pct"] = (partial["operative_accounts"] / accounts * 100).round(2)
+    return out
+
+
+def existing_district_ids(engine=None):
+    """(state, district) -> district_id of the rows already in pmjdy_accounts"""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'pmjdy_accounts'")).first() is None:
+            return pd.DataFrame(columns=["state", "district", "district_id"])
+        return pd.read_sql(text("SELECT state, district, district_id FROM pmjdy_accounts"), conn)
+
+
+def pmjdy_accounts_table(partial, existing=None):
+    """The district partial in analysis.py's pmjdy_accounts schema.
+
+    Extracts without a District_ID column are numbered 1..N, or - given the existing
+    (state, district, district_id) rows - keep the ids of districts already in the table,
+    new districts numbered after the highest one, so an upsert never overwrites another district.
+    """
+    df = metrics(partial).reset_index()
+    if "district_id" not in df.columns:
+        df = df.sort_values(["state", "district"]).reset_index(drop=True)
+        if existing is None or existing.empty:
+            df.insert(0, "district_id", np.arange(1, len(df) + 1))
+        else:
+            known = existing.drop_duplicates(["state", "district"]).set_index(["state", "district"])["district_id"]
+            ids = pd.Series(known.reindex(pd.MultiIndex.from_frame(df[["state", "district"]])).to_numpy())
+            new = ids.isna().to_numpy()
+            ids[new] = int(existing["district_id"].max()) + np.arange(1, new.sum() + 1)
+            df.insert(0, "district_id", ids.astype(np.int64).to_numpy())
+    if "area_type" not in df.columns:
+        df["area_type"] = "Unknown"
+    df = df.sort_values("district_id").reset_index(drop=True)
+    return df[["district_id", "district", "state", "area_type", "total_accounts_lakh", "zero_balance_pct", "avg_balance_inr"]]
+
+
+def load_pmjdy_accounts(partial, engine=None, mode="replace"):
+    """Write the aggregated districts into pmjdy_accounts and its summary tables - replace
+    rebuilds the summaries, upsert folds only the new districts into them"""
+    engine = engine or get_engine()
+    table = pmjdy_accounts_table(partial, existing_district_ids(engine) if mode == "upsert" else None)
+    if mode == "upsert":
+        start = time.perf_counter()
+        append_districts(table, engine, mode="upsert")
+        seconds = time.perf_counter() - start
+        result = {"rows": len(table), "seconds": round(seconds, 3), "rows_per_second": round(len(table) / max(seconds, 1e-9))}
+    else:
+        result = bulk_load(table, "pmjdy_accounts", engine, mode=mode)
+        rebuild_summaries(engine)
+    ensure_indexes(engine)
+    return result
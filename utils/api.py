@@ -0,0 +1,248 @@
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Route
+
+from utils.data_loader import data_version
+from utils.snapshot import SNAPSHOT_DIR, build_snapshot, load_snapshot
+
+# Read-only HTTP API over the same snapshot the dashboard boots from: loader frames, state tiers,
+# underperformer gaps and growth forecasts as JSON or Arrow. Every response is rendered once per
+# data version and kept (plain and gzipped) with a version-derived ETag, so a repeat request is a
+# dict lookup and a revalidation is a 304.
+JSON_TYPE = "application/json"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+FORMATS = {"json": JSON_TYPE, "arrow": ARROW_TYPE}
+GZIP_MIN_BYTES = 1024
+MAX_RESPONSES = 512
+# data_version() stats every CSV; between checks requests trust the version they last saw
+VERSION_TTL = 1.0
+
+TIER_COLUMNS = ["State", "Region", "Tier", "Performance_Score", "Accounts_Per_1000", "Avg_Balance_INR"]
+GAP_COLUMNS = ["State", "Region", "Population", "Accounts", "Expected_Accounts", "Coverage_Pct", "Gap_Lakh",
+               "Underperforming"]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Rendered:
+    """One representation of one resource: body, optional gzipped body, ETag"""
+
+    def __init__(self, body, media_type, version):
+        self.body = body
+        self.media_type = media_type
+        self.gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+        # Weak: the plain and gzipped bodies are the same resource, so they share a validator
+        self.etag = f'W/"{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def _frame_body(df, fmt, version):
+    if fmt == "arrow":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"data_version": version.encode()})
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+    rows = df.to_json(orient="records", date_format="iso")
+    return f'{{"data_version":"{version}","count":{len(df)},"rows":{rows}}}'.encode()
+
+
+def _json_body(value, version):
+    return json.dumps({"data_version": version, **value}, default=str, separators=(",", ":")).encode()
+
+
+class SnapshotApi:
+    """Snapshot for the current data version plus the responses rendered from it"""
+
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self.snap = None
+        self.version = None
+        self._checked = 0.0
+        self._lock = asyncio.Lock()
+        self._responses = OrderedDict()
+        self.hits = self.misses = 0
+
+    def _load(self, version):
+        # Same fallback as the dashboard: compute in-process if build_snapshot.py hasn't run
+        return load_snapshot(version, self.snapshot_dir) or build_snapshot()
+
+    async def current(self):
+        """The snapshot, reloaded (once, however many requests are waiting) when the data changes"""
+        now = time.monotonic()
+        if self.snap is not None and now - self._checked < VERSION_TTL:
+            return self.snap
+        version = await run_in_threadpool(data_version)
+        if version != self.version:
+            async with self._lock:
+                if version != self.version:
+                    self.snap = await run_in_threadpool(self._load, version)
+                    self.version = version
+                    self._responses.clear()
+        self._checked = now
+        return self.snap
+
+    async def render(self, key, build):
+        """Rendered response for key under the current version; build(snap, version) -> (body, type)"""
+        snap = await self.current()
+        version = self.version
+        cache_key = (version,) + key
+        rendered = self._responses.get(cache_key)
+        if rendered is not None:
+            self.hits += 1
+            self._responses.move_to_end(cache_key)
+            return rendered
+        self.misses += 1
+        body, media_type = await run_in_threadpool(build, snap, version)
+        rendered = await run_in_threadpool(Rendered, body, media_type, version)
+        self._responses[cache_key] = rendered
+        while len(self._responses) > MAX_RESPONSES:
+            self._responses.popitem(last=False)
+        return rendered
+
+
+def _format(request):
+    fmt = request.query_params.get("format")
+    if fmt is None:
+        fmt = "arrow" if ARROW_TYPE in request.headers.get("accept", "") else "json"
+    if fmt not in FORMATS:
+        raise ApiError(400, f"format must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def _columns(request):
+    columns = request.query_params.get("columns")
+    return tuple(c.strip() for c in columns.split(",") if c.strip()) if columns else None
+
+
+def _select(df, columns):
+    if columns is None:
+        return df
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ApiError(400, f"unknown column(s): {', '.join(missing)}")
+    return df[list(columns)]
+
+
+def _accepts_gzip(header):
+    """Whether an Accept-Encoding header allows gzip - an explicit gzip;q=0 refuses it,
+    and * covers gzip only when gzip is not listed"""
+    qualities = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            qualities[coding.strip().lower()] = q
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+
+def _respond(request, rendered):
+    headers = {"ETag": rendered.etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+    match = request.headers.get("if-none-match", "")
+    if match == "*" or rendered.etag in [m.strip() for m in match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if rendered.gzipped is not None and _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(rendered.gzipped, media_type=rendered.media_type, headers=headers)
+    return Response(rendered.body, media_type=rendered.media_type, headers=headers)
+
+
+def _error(status, message):
+    return Response(json.dumps({"error": message}).encode(), status_code=status, media_type=JSON_TYPE)
+
+
+def create_app(snapshot_dir=SNAPSHOT_DIR):
+    """Starlette app serving the snapshot in snapshot_dir"""
+    api = SnapshotApi(snapshot_dir)
+
+    def frame_route(resource, pick):
+        """Endpoint for a table: pick(snap, request) -> DataFrame, with ?columns= and ?format="""
+        async def endpoint(request):
+            try:
+                fmt, columns = _format(request), _columns(request)
+                params = tuple(sorted((k, v) for k, v in request.path_params.items()))
+                extra = tuple(sorted((k, v) for k, v in request.query_params.items() if k not in ("format", "columns")))
+
+                def build(snap, version):
+                    return _frame_body(_select(pick(snap, request), columns), fmt, version), FORMATS[fmt]
+                return _respond(request, await api.render((resource, params, extra, fmt, columns), build))
+            except ApiError as e:
+                return _error(e.status, str(e))
+        return endpoint
+
+    def json_route(resource, pick):
+        async def endpoint(request):
+            rendered = await api.render((resource,), lambda snap, version: (_json_body(pick(snap), version), JSON_TYPE))
+            return _respond(request, rendered)
+        return endpoint
+
+    def named(group):
+        def pick(snap, request):
+            name = request.path_params["name"]
+            if name not in snap[group]:
+                raise ApiError(404, f"no {group[:-1] if group.endswith('s') else group} named {name!r} - see /frames")
+            return snap[group][name]
+        return pick
+
+    def underperformers(snap, request):
+        df = snap["frames"]["states_ml"][GAP_COLUMNS]
+        if request.query_params.get("all") not in ("1", "true", "yes"):
+            df = df[df["Underperforming"]]
+        return df.sort_values("Gap_Lakh", ascending=False)
+
+    def index(snap):
+        return {
+            "built_at": snap["built_at"],
+            "frames": {name: list(frame.shape) for name, frame in snap["frames"].items()},
+            "anomalies": {name: list(frame.shape) for name, frame in snap["anomalies"].items()},
+            "endpoints": ["/version", "/metrics", "/frames", "/frames/{name}", "/anomalies/{name}",
+                          "/tiers", "/underperformers", "/forecasts", "/cache"],
+        }
+
+    async def cache_stats(request):
+        await api.current()
+        return Response(_json_body({"responses": len(api._responses), "hits": api.hits, "misses": api.misses},
+                                   api.version), media_type=JSON_TYPE, headers={"Cache-Control": "no-store"})
+
+    routes = [
+        Route("/", json_route("index", index)),
+        Route("/frames", json_route("index", index)),
+        Route("/version", json_route("version", lambda snap: {"built_at": snap["built_at"], "format": snap["format"]})),
+        Route("/metrics", json_route("metrics", lambda snap: {"metrics": snap["metrics"]})),
+        Route("/frames/{name}", frame_route("frame", named("frames"))),
+        Route("/anomalies/{name}", frame_route("anomalies", named("anomalies"))),
+        Route("/tiers", frame_route("tiers", lambda snap, request: snap["frames"]["states_ml"][TIER_COLUMNS])),
+        Route("/underperformers", frame_route("underperformers", underperformers)),
+        Route("/forecasts", frame_route("forecasts", lambda snap, request: snap["frames"]["growth"])),
+        Route("/cache", cache_stats),
+    ]
+    app = Starlette(routes=routes)
+    app.state.api = api
+    return app
+
+
+def app_from_env():
+    """create_app() for uvicorn workers started by api.py --workers"""
+    return create_app(os.environ.get("PMJDY_API_SNAPSHOTS", SNAPSHOT_DIR))
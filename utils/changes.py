@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import data_version
+from utils.instrument import cache_call, cache_miss, timed
+from utils.panel import get_panel
+
+# Period-over-period change on the panel, for every entity at once.
+# A side of the comparison is either a date (each entity's value as of that date) or a
+# (start, end) window (the mean of the entity's observations inside it).
+CHANGE_MEASURES = {
+    "Abs_Change": "Change",
+    "Pct_Change": "Change %",
+    "CAGR_Pct": "CAGR %",
+}
+DAYS_PER_YEAR = 365.25
+
+
+def _side(store, metric, spec, **filters):
+    """entity -> (value, date) for one side of a comparison"""
+    if isinstance(spec, (tuple, list)):
+        rows = store.range(spec[0], spec[1], metric, **filters)
+        side = rows.groupby("entity", observed=True).agg(value=("value", "mean"), date=("date", "max"))
+    else:
+        side = store.as_of(spec, metric, **filters).set_index("entity")[["value", "date"]]
+    return side
+
+
+def _growth(start, end, years):
+    """Absolute, percentage and annualised change; NaN where the base is not positive"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = np.where(start > 0, start, np.nan)
+        pct = (end / base - 1) * 100
+        cagr = np.where(years > 0, ((end / base) ** (1 / np.where(years > 0, years, 1)) - 1) * 100, np.nan)
+    return end - start, pct, cagr
+
+
+@timed()
+def period_change(store, metric, start, end, **filters):
+    """One row per entity observed on both sides: value and date at start and end, the absolute
+    and percentage change and the CAGR over the years actually between the two observations.
+    Entities whose as-of value is the same observation on both sides are left out."""
+    before = _side(store, metric, start, **filters)
+    after = _side(store, metric, end, **filters)
+    df = before.join(after, how="inner", lsuffix="_start", rsuffix="_end")
+    df = df[df["date_end"] > df["date_start"]]
+    years = ((df["date_end"] - df["date_start"]).dt.days / DAYS_PER_YEAR).to_numpy()
+    abs_change, pct, cagr = _growth(df["value_start"].to_numpy(), df["value_end"].to_numpy(), years)
+    df["Years"] = years.round(2)
+    df["Abs_Change"] = abs_change
+    df["Pct_Change"] = pct.round(2)
+    df["CAGR_Pct"] = cagr.round(2)
+    names = store.latest(metric, **filters).set_index("entity")[["state", "district"]]
+    return names.join(df, how="inner").reset_index()
+
+
+@timed()
+def rolling_growth(store, metric, periods=1, **filters):
+    """Growth of every observation over the one `periods` observations earlier in the same
+    entity's series, with the annualised rate over the gap between them"""
+    df = store.range(None, None, metric, **filters)
+    # Rows are sorted by entity then date, so a shift within entity is a shift of the columns
+    prev_value = df.groupby("entity", observed=True)["value"].shift(periods)
+    prev_date = df.groupby("entity", observed=True)["date"].shift(periods)
+    years = ((df["date"] - prev_date).dt.days / DAYS_PER_YEAR).to_numpy()
+    abs_change, pct, cagr = _growth(prev_value.to_numpy(), df["value"].to_numpy(), years)
+    out = df[["entity", "state", "district", "date", "value"]].assign(
+        prev_date=prev_date, prev_value=prev_value, Abs_Change=abs_change, Pct_Change=pct.round(2), CAGR_Pct=cagr.round(2))
+    return out.dropna(subset=["prev_value"]).reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _get_change(version, metric, start, end, level, state):
+    cache_miss("changes")
+    return period_change(get_panel(), metric, start, end, level=level, state=state)
+
+
+def get_change(metric, start, end, level=None, state=None):
+    """period_change on the shared panel, cached per data version, window and metric.
+    Dates and windows are normalised so equal selections share an entry."""
+    cache_call("changes")
+    norm = lambda s: tuple(pd.Timestamp(d) for d in s) if isinstance(s, (tuple, list)) else pd.Timestamp(s)
+    return _get_change(data_version(), metric, norm(start), norm(end), level, state).copy(deep=False)
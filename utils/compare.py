@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from utils.data_loader import data_version
+from utils.districts import available_metrics, get_districts
+from utils.instrument import cache_call, cache_miss, timed
+
+# The State Analysis page's comparison metrics, in display order
+STATE_METRICS = {
+    "Accounts_Lakh": "Total Accounts (Lakh)",
+    "Deposit_Crore": "Deposits (Cr)",
+    "Avg_Balance_INR": "Avg Balance (₹)",
+    "Accounts_Per_1000": "Accounts/1000",
+    "Performance_Score": "Performance Score",
+}
+
+
+class SimilarityMatrix:
+    """Pairwise distances between entities on z-scored metrics, computed once.
+
+    distance is the RMS difference in standard deviations across the metrics, so it does not
+    grow with the number of metrics; similarity = 100 * exp(-distance), 100 for identical profiles.
+    """
+
+    def __init__(self, names, metrics, values):
+        self.names = list(names)
+        self.metrics = list(metrics)
+        self._pos = {n: i for i, n in enumerate(self.names)}
+        values = np.asarray(values, dtype=np.float64)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        std[~(std > 0)] = 1.0
+        # Missing values sit at the mean: they neither pull entities together nor apart
+        self.z = np.nan_to_num((values - mean) / std)
+        diff = self.z[:, None, :] - self.z[None, :, :]
+        self.distance = np.sqrt((diff ** 2).mean(axis=2))
+        self.similarity = 100 * np.exp(-self.distance)
+
+    def __contains__(self, name):
+        return name in self._pos
+
+    def _index(self, names):
+        return [self._pos[n] for n in names if n in self._pos]
+
+    def matrix(self, names=None, kind="similarity"):
+        """Square DataFrame over the given entities (all by default)"""
+        idx = self._index(names) if names is not None else list(range(len(self.names)))
+        data = getattr(self, kind)[np.ix_(idx, idx)]
+        labels = [self.names[i] for i in idx]
+        return pd.DataFrame(data, index=labels, columns=labels)
+
+    def nearest(self, name, k=5, within=None):
+        """The k most similar entities to name, optionally restricted to the names in within"""
+        if name not in self._pos:
+            return pd.DataFrame(columns=["Name", "Distance", "Similarity %"])
+        i = self._pos[name]
+        candidates = self._index(within) if within is not None else range(len(self.names))
+        candidates = np.array([j for j in candidates if j != i], dtype=np.int64)
+        order = candidates[np.argsort(self.distance[i, candidates], kind="stable")][:k]
+        return pd.DataFrame({
+            "Name": [self.names[j] for j in order],
+            "Distance": self.distance[i, order].round(3),
+            "Similarity %": self.similarity[i, order].round(1),
+        })
+
+    def profile(self, names):
+        """z-scores of the given entities, one row each - what the distances are computed from"""
+        idx = self._index(names)
+        return pd.DataFrame(self.z[idx], index=[self.names[i] for i in idx], columns=self.metrics)
+
+
+@timed()
+def build_similarity(df, id_col, metrics):
+    return SimilarityMatrix(df[id_col].tolist(), metrics, df[metrics].to_numpy(dtype=np.float64))
+
+
+@st.cache_resource(show_spinner=False)
+def _get_district_similarity(state, version):
+    cache_miss("similarity")
+    df = get_districts(state)
+    return build_similarity(df, "District", available_metrics(df))
+
+
+def get_similarity(state=None):
+    """States matrix from the snapshot, or one state's district matrix (built on first use)"""
+    if state is None:
+        from utils.snapshot import get_snapshot
+        return get_snapshot()["similarity"]["states"]
+    cache_call("similarity")
+    return _get_district_similarity(state, data_version())
+
+
+def similarity_heatmap(matrix, height=None):
+    """Plotly heatmap of a similarity DataFrame from SimilarityMatrix.matrix"""
+    n = len(matrix)
+    fig = px.imshow(matrix.round(1), text_auto=n <= 12, color_continuous_scale="Blues", zmin=0, zmax=100,
+                    labels={"color": "Similarity %"}, aspect="auto", height=height or max(350, 28 * n + 120))
+    fig.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white", xaxis_title="", yaxis_title="")
+    return fig
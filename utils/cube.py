@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import data_version, load_state_data
+from utils.districts import _load_source, accounts_column, district_sources, period_columns
+from utils.instrument import cache_call, cache_miss, timed
+from utils.panel import STATE_AS_OF
+
+# Aggregation cube over national > region > state > district, every cell precomputed.
+# State cells take accounts, deposits and population from state_data.csv; the district sources
+# add the measures the state file does not have (operative and female accounts) and their own
+# district cells underneath. Regions and the national cell sum their states.
+LEVELS = ["national", "region", "state", "district"]
+KEYS = ["region", "state", "district"]
+# Additive measures. A partial measure (known only where a source reports it) carries the accounts
+# of the same rows as <measure>_base, so its share stays correct at every level.
+PARTIAL = ["operative_accounts", "female_accounts"]
+MEASURES = ["accounts", "deposit_crore", "population"] + PARTIAL + [f"{m}_base" for m in PARTIAL] + ["states", "districts"]
+DISTRICT_COLUMNS = {"deposit_crore": "Balance_Crore", "operative_accounts": "Operative_Accounts",
+                    "female_accounts": "Female_Accounts"}
+TOTAL_COLUMNS = {"Accounts": "accounts", "Total_Accounts": "accounts", "Balance_Crore": "deposit_crore",
+                 "Deposit_Crore": "deposit_crore", "Operative_Accounts": "operative_accounts",
+                 "Female_Accounts": "female_accounts"}
+MEASURE_LABELS = {"accounts": "Accounts", "deposit_crore": "Deposits (Rs. Cr)",
+                  "operative_accounts": "Operative Accounts", "female_accounts": "Female Accounts"}
+
+
+def _district_cells(state, spec):
+    """District leaf cells of one source, its source total row and the date its accounts are as of"""
+    df = _load_source(state, spec)
+    account_col = accounts_column(state, df)
+    periods = period_columns(state, df)
+    cells = pd.DataFrame({"state": state, "district": df["District"],
+                          "accounts": df[account_col] if account_col else np.nan})
+    for measure, column in DISTRICT_COLUMNS.items():
+        cells[measure] = df[column] if column in df.columns else np.nan
+    for measure in PARTIAL:
+        cells[f"{measure}_base"] = cells["accounts"].where(cells[measure].notna())
+    cells["population"] = np.nan
+    cells["states"] = 0
+    cells["districts"] = 1
+    totals = {TOTAL_COLUMNS[c]: v for c, v in df.attrs.get("source_total", {}).items() if c in TOTAL_COLUMNS}
+    if account_col in periods and account_col in df.attrs.get("source_total", {}):
+        totals["accounts"] = df.attrs["source_total"][account_col]
+    as_of = periods.get(account_col) or spec.get("as_of") or "-"
+    return cells, totals, as_of
+
+
+def _sum(df, keys):
+    # min_count=1 keeps a measure nobody reported as NaN instead of 0
+    return df.groupby(keys, sort=True)[MEASURES].sum(min_count=1).reset_index()
+
+
+class RollupCube:
+    """Precomputed cells with rollup, drill-down and point lookups.
+
+    cells holds one row per node: level plus the region/state/district keys (None above the
+    node's level) and the additive measures. Derived ratios are computed on read.
+    """
+
+    def __init__(self, cells, reconciliation):
+        self.cells = cells
+        self.reconciliation = reconciliation
+        self._index = {tuple(k): i for i, k in enumerate(cells[["level"] + KEYS].itertuples(index=False))}
+        states = cells[cells["level"] == "state"]
+        self._region_of = dict(zip(states["state"], states["region"]))
+
+    @staticmethod
+    def _derive(df):
+        df = df.copy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["Avg_Balance_INR"] = (df["deposit_crore"] * 1e7 / df["accounts"]).round(0)
+            df["Accounts_Per_1000"] = (df["accounts"] / df["population"] * 1000).round(1)
+            for measure in PARTIAL:
+                df[measure.replace("_accounts", "").title() + "_Pct"] = (df[measure] / df[f"{measure}_base"] * 100).round(1)
+        return df
+
+    def rollup(self, level, **filters):
+        """Every cell at level, optionally under given keys, e.g. rollup("state", region="East")"""
+        df = self.cells[self.cells["level"] == level]
+        for key, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set, pd.Index, pd.Series)) else [value]
+            df = df[df[key].isin(values)]
+        return self._derive(df).reset_index(drop=True)
+
+    def drill(self, region=None, state=None):
+        """Children of a node: regions of the nation, states of a region, districts of a state"""
+        if state is not None:
+            return self.rollup("district", state=state)
+        if region is not None:
+            return self.rollup("state", region=region)
+        return self.rollup("region")
+
+    def cell(self, region=None, state=None, district=None):
+        """One node's measures and ratios; the national cell when no keys are given"""
+        if state is not None and region is None:
+            region = self._region_of[state]
+        level = "district" if district is not None else "state" if state is not None else "region" if region is not None else "national"
+        row = self._index[(level, region, state, district)]
+        return self._derive(self.cells.iloc[[row]]).iloc[0]
+
+    def regroup(self, level, states):
+        """Roll a subset of state cells up to region or national - a filtered view that still
+        comes from the precomputed state cells rather than the source rows"""
+        df = self.cells[(self.cells["level"] == "state") & self.cells["state"].isin(states)]
+        keys = ["region"] if level == "region" else []
+        rolled = _sum(df.assign(_all=0), keys or ["_all"]).drop(columns="_all", errors="ignore")
+        return self._derive(rolled.assign(level=level))
+
+
+def _gap_row(check, entity, measure, expected, computed, note=""):
+    gap = round(computed - expected, 2)
+    return {"Check": check, "Entity": entity, "Measure": MEASURE_LABELS[measure], "Source Figure": expected,
+            "Computed": round(computed, 2), "Gap": gap, "Gap %": round(gap / expected * 100, 2) if expected else np.nan, "Note": note}
+
+
+@timed()
+def build_cube():
+    states = load_state_data()
+    state_cells = pd.DataFrame({
+        "region": states["Region"], "state": states["State"], "accounts": states["Accounts"],
+        "deposit_crore": states["Deposit_Crore"], "population": states["Population"],
+        "states": 1,
+    })
+    district_frames, checks = [], []
+    for state, spec in district_sources().items():
+        cells, totals, as_of = _district_cells(state, spec)
+        district_frames.append(cells)
+        for measure, expected in totals.items():
+            checks.append(_gap_row("Districts vs source total row", state, measure, expected,
+                                   float(cells[measure].sum()), f"data/{spec['file']}, as of {as_of}"))
+        state_row = state_cells[state_cells["state"] == state]
+        for measure in ["accounts", "deposit_crore"]:
+            if len(state_row) and cells[measure].notna().any():
+                checks.append(_gap_row("Districts vs state_data.csv", state, measure, float(state_row[measure].iloc[0]),
+                                       float(cells[measure].sum()),
+                                       f"districts as of {as_of}, state figure as of {STATE_AS_OF}"))
+
+    districts = pd.concat(district_frames, ignore_index=True) if district_frames else pd.DataFrame(columns=["state", "district"] + MEASURES)
+    districts["region"] = districts["state"].map(dict(zip(state_cells["state"], state_cells["region"]))).fillna("Other")
+    # State cells fill the measures the state file lacks from their districts
+    via_districts = _sum(districts, ["state"]).set_index("state")
+    state_cells = state_cells.set_index("state")
+    for measure in MEASURES:
+        if measure not in state_cells.columns:
+            state_cells[measure] = np.nan
+        if measure in PARTIAL or measure.endswith("_base") or measure == "districts":
+            state_cells[measure] = state_cells[measure].fillna(via_districts[measure].reindex(state_cells.index))
+    state_cells = state_cells.reset_index()
+
+    regions = _sum(state_cells, ["region"])
+    national = state_cells[MEASURES].sum(min_count=1).to_frame().T
+    source_total = states.attrs.get("source_total", {})
+    for column, expected in source_total.items():
+        if column in TOTAL_COLUMNS:
+            measure = TOTAL_COLUMNS[column]
+            checks.append(_gap_row("States vs source total row", "India", measure, expected,
+                                   float(national[measure].iloc[0]), "data/state_data.csv"))
+
+    cells = pd.concat([
+        national.assign(level="national", region=None, state=None, district=None),
+        regions.assign(level="region", state=None, district=None),
+        state_cells.assign(level="state", district=None),
+        districts.assign(level="district"),
+    ], ignore_index=True)[["level"] + KEYS + MEASURES]
+    cells[MEASURES] = cells[MEASURES].astype(float)
+    for key in KEYS:
+        cells[key] = cells[key].astype(object).where(cells[key].notna(), None)
+    return RollupCube(cells, pd.DataFrame(checks))
+
+
+@st.cache_resource(show_spinner=False)
+def _get_cube(version):
+    cache_miss("cube")
+    return build_cube()
+
+
+def get_cube():
+    """Process-wide cube for the current data version"""
+    cache_call("cube")
+    return _get_cube(data_version())
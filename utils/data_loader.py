@@ -1,9 +1,17 @@
 import pandas as pd
 import numpy as np
+import hashlib
 import os
 
+from utils.instrument import timed
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
+# Cached frames are shared between sessions as shallow views (utils.snapshot.get_frames),
+# which relies on copy-on-write: always on from pandas 3, opt-in before that
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 STATE_POPULATION = {
     "Andaman and Nicobar Islands": 450000,
     "Andhra Pradesh": 54000000,
@@ -83,6 +91,24 @@ REGION_MAP = {
 }
 
 
+_VERSION_CACHE = {}
+
+
+def data_version():
+    """Short content hash of the CSVs in DATA_DIR - changes whenever a data release lands"""
+    names = sorted(n for n in os.listdir(DATA_DIR) if n.endswith(".csv"))
+    stamp = tuple((n, os.stat(os.path.join(DATA_DIR, n)).st_mtime_ns) for n in names)
+    if stamp not in _VERSION_CACHE:
+        h = hashlib.sha1()
+        for n in names:
+            h.update(n.encode())
+            with open(os.path.join(DATA_DIR, n), "rb") as f:
+                h.update(f.read())
+        _VERSION_CACHE.clear()
+        _VERSION_CACHE[stamp] = h.hexdigest()[:12]
+    return _VERSION_CACHE[stamp]
+
+
 def _drop_serial_cols(df):
     for col in ["S.No", "S. No.", "Sl. No.", "Sl. No", "S.No.", "S.No"]:
         if col in df.columns:
@@ -90,6 +116,19 @@ def _drop_serial_cols(df):
     return df
 
 
+def _split_totals(df, col, pattern="total"):
+    """Drop the source's total rows, keeping the last one's figures in df.attrs["source_total"]
+    so aggregates can be reconciled against what the source itself reports"""
+    is_total = df[col].astype(str).str.lower().str.contains(pattern, na=False)
+    totals = df[is_total]
+    df = df[~is_total].reset_index(drop=True)
+    if len(totals):
+        row = totals.iloc[-1].drop(col)
+        df.attrs["source_total"] = {c: float(v) for c, v in pd.to_numeric(row, errors="coerce").items() if pd.notna(v)}
+    return df
+
+
+@timed()
 def load_state_data():
     df = pd.read_csv(os.path.join(DATA_DIR, "state_data.csv"), encoding="utf-8-sig")
     df.columns = df.columns.str.strip()
@@ -112,7 +151,7 @@ def load_state_data():
     # Make sure we have the right columns
     if "State" not in df.columns:
         df.columns = ["State", "Accounts", "Deposit_Crore"]
-    df = df[~df["State"].astype(str).str.lower().str.contains("total", na=False)].reset_index(drop=True)
+    df = _split_totals(df, "State")
     df["State"] = df["State"].astype(str).str.strip()
     df["Accounts"] = pd.to_numeric(df["Accounts"], errors="coerce")
     df["Deposit_Crore"] = pd.to_numeric(df["Deposit_Crore"], errors="coerce")
@@ -132,6 +171,7 @@ def load_state_data():
     return df
 
 
+@timed()
 def load_bihar_districts():
     df = pd.read_csv(os.path.join(DATA_DIR, "bihar_districts.csv"), encoding="utf-8-sig")
     df.columns = df.columns.str.strip()
@@ -149,7 +189,7 @@ def load_bihar_districts():
     df = df.rename(columns=col_map)
     if "District" not in df.columns:
         df.columns = ["District", "Accounts", "Balance_Crore"]
-    df = df[~df["District"].astype(str).str.lower().str.contains("total|grand", na=False)].reset_index(drop=True)
+    df = _split_totals(df, "District", "total|grand")
     df["State"] = "Bihar"
     df["District"] = df["District"].astype(str).str.strip()
     df["Accounts"] = pd.to_numeric(df["Accounts"], errors="coerce")
@@ -160,6 +200,7 @@ def load_bihar_districts():
     return df
 
 
+@timed()
 def load_karnataka_districts():
     df = pd.read_csv(os.path.join(DATA_DIR, "karnataka_districts.csv"), encoding="utf-8-sig")
     df.columns = df.columns.str.strip()
@@ -183,7 +224,7 @@ def load_karnataka_districts():
         # Assume order: District, Total, Male, Female, Operative
         mapping = ["District", "Total_Accounts", "Male_Accounts", "Female_Accounts", "Operative_Accounts"]
         df.columns = mapping[:len(cols)]
-    df = df[~df["District"].astype(str).str.lower().str.contains("total", na=False)].reset_index(drop=True)
+    df = _split_totals(df, "District")
     df["State"] = "Karnataka"
     df["District"] = df["District"].astype(str).str.strip()
     for col in ["Total_Accounts", "Male_Accounts", "Female_Accounts", "Operative_Accounts"]:
@@ -198,6 +239,7 @@ def load_karnataka_districts():
     return df
 
 
+@timed()
 def load_maharashtra_districts():
     df = pd.read_csv(os.path.join(DATA_DIR, "maharashtra_districts.csv"), encoding="utf-8-sig")
     df.columns = df.columns.str.strip()
@@ -221,7 +263,7 @@ def load_maharashtra_districts():
         cols = list(df.columns)
         new_cols = ["District", "Mar_2022", "Mar_2023", "Mar_2024", "Jun_2024"]
         df.columns = new_cols[:len(cols)]
-    df = df[~df["District"].astype(str).str.lower().str.contains("total", na=False)].reset_index(drop=True)
+    df = _split_totals(df, "District")
     df["State"] = "Maharashtra"
     df["District"] = df["District"].astype(str).str.strip()
     for col in ["Mar_2022", "Mar_2023", "Mar_2024", "Jun_2024"]:
@@ -233,6 +275,7 @@ def load_maharashtra_districts():
     return df
 
 
+@timed()
 def load_balance_distribution():
     df = pd.read_csv(os.path.join(DATA_DIR, "balance_distribution.csv"), encoding="utf-8-sig")
     df.columns = df.columns.str.strip()
@@ -253,6 +296,7 @@ def load_balance_distribution():
     return df
 
 
+@timed()
 def load_all_districts():
     bihar = load_bihar_districts()[["District", "State", "Accounts", "Avg_Balance_INR", "Accounts_Lakh"]]
     karnataka = load_karnataka_districts()[["District", "State", "Total_Accounts", "Operative_Pct", "Female_Pct", "Accounts_Lakh"]].rename(columns={"Total_Accounts": "Accounts"})
@@ -0,0 +1,225 @@
+import os
+import time
+from urllib.parse import quote
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jandhan_analysis.db")
+# Point dashboards at a replica (e.g. a copy shipped next to each app server); writes always go to DB_PATH
+READ_PATH = os.environ.get("PMJDY_DB_READ", DB_PATH)
+
+POOL_SIZE = 8
+STATEMENT_CACHE = 256
+
+# name -> (table, columns)
+INDEXES = {
+    "idx_pmjdy_accounts_district_id": ("pmjdy_accounts", "district_id"),
+    "idx_pmjdy_accounts_state": ("pmjdy_accounts", "state"),
+    "idx_infrastructure_district_id": ("infrastructure", "district_id"),
+}
+
+# Prepared once; every pooled connection keeps the compiled statement in its sqlite3 cache
+DISTRICT_JOIN = text("""
+    SELECT p.district, p.state, p.area_type,
+           p.total_accounts_lakh, p.zero_balance_pct,
+           p.avg_balance_inr, i.mgnrega_coverage_pct,
+           i.banking_outlets_per_1000, i.bc_agents_per_1000,
+           i.mobile_banking_pct
+    FROM pmjdy_accounts p
+    JOIN infrastructure i ON p.district_id = i.district_id
+    ORDER BY p.district_id
+""")
+DISTRICT_JOIN_BY_STATE = text("""
+    SELECT p.district, p.state, p.area_type,
+           p.total_accounts_lakh, p.zero_balance_pct,
+           p.avg_balance_inr, i.mgnrega_coverage_pct,
+           i.banking_outlets_per_1000, i.bc_agents_per_1000,
+           i.mobile_banking_pct
+    FROM pmjdy_accounts p
+    JOIN infrastructure i ON p.district_id = i.district_id
+    WHERE p.state = :state
+    ORDER BY p.district_id
+""")
+
+_engines = {}
+
+
+def _on_connect(readonly):
+    def configure(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA busy_timeout = 5000")
+        cur.execute("PRAGMA cache_size = -65536")       # 64 MB page cache per connection
+        cur.execute("PRAGMA mmap_size = 268435456")
+        cur.execute("PRAGMA temp_store = MEMORY")
+        if readonly:
+            cur.execute("PRAGMA query_only = ON")
+        else:
+            # WAL lets any number of readers run alongside the single writer
+            cur.execute("PRAGMA journal_mode = WAL")
+            cur.execute("PRAGMA synchronous = NORMAL")
+        cur.close()
+    return configure
+
+
+def get_engine(path=DB_PATH, readonly=False):
+    """Pooled engine per (process, path, mode) - engines are never shared across a fork"""
+    key = (os.getpid(), os.path.abspath(path), readonly)
+    if key not in _engines:
+        if readonly:
+            url = f"sqlite:///file:{quote(os.path.abspath(path))}?mode=ro&uri=true"
+        else:
+            url = f"sqlite:///{os.path.abspath(path)}"
+        engine = create_engine(url, poolclass=QueuePool, pool_size=POOL_SIZE, max_overflow=POOL_SIZE,
+                               connect_args={"check_same_thread": False, "cached_statements": STATEMENT_CACHE})
+        event.listen(engine, "connect", _on_connect(readonly))
+        _engines[key] = engine
+    return _engines[key]
+
+
+def read_engine():
+    return get_engine(READ_PATH, readonly=True)
+
+
+def ensure_indexes(engine=None):
+    """Create the join/filter indexes (replacing a table drops them with it)"""
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        tables = {r[0] for r in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+        for name, (table, columns) in INDEXES.items():
+            if table in tables:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        conn.execute(text("ANALYZE"))
+
+
+def checkpoint(engine=None):
+    """Fold the WAL back into the database file - so the file alone (a copy, a content hash) is current"""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def district_join(state=None, engine=None):
+    """The PMJDY x infrastructure district frame, optionally for one state"""
+    engine = engine or read_engine()
+    with engine.connect() as conn:
+        if state is None:
+            return pd.read_sql(DISTRICT_JOIN, conn)
+        return pd.read_sql(DISTRICT_JOIN_BY_STATE, conn, params={"state": state})
+
+
+def query_plan(sql, engine=None):
+    """EXPLAIN QUERY PLAN rows - to check a query actually uses the indexes"""
+    engine = engine or read_engine()
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+BULK_BATCH_ROWS = 100_000
+BULK_MODES = ("append", "replace", "upsert", "partition")
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_values(s):
+    """A column as plain Python values sqlite3 can bind: datetimes as text, NaN -> NULL"""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        s = s.dt.strftime("%Y-%m-%d %H:%M:%S")
+    return s.astype(object).where(s.notna(), None).tolist() if s.hasnans else s.tolist()
+
+
+def _batches(df, batch_rows):
+    """Row tuples of plain Python values (NaN -> NULL), batch_rows at a time"""
+    for start in range(0, len(df), batch_rows):
+        chunk = df.iloc[start:start + batch_rows]
+        yield list(zip(*[_sql_values(chunk[col]) for col in chunk.columns]))
+
+
+def bulk_load(df, table, engine=None, mode="append", key=None, partition=None, batch_rows=BULK_BATCH_ROWS):
+    """Write a large frame with batched executemany calls inside a single transaction.
+
+    mode: "append" adds rows; "replace" recreates the table; "upsert" inserts or updates on
+    key (a column or list of columns, backed by a unique index); "partition" deletes the rows
+    whose partition column values appear in df (e.g. one month) and inserts df - re-loading a
+    month is idempotent. The drop/delete, every batch and the index rebuild run in one
+    transaction, so a failed load leaves the table as it was. Secondary indexes are dropped
+    for the load and rebuilt once at the end, and the connection runs with synchronous=OFF.
+    Returns {"rows", "seconds", "rows_per_second"}.
+    """
+    if mode not in BULK_MODES:
+        raise ValueError(f"mode must be one of {BULK_MODES}")
+    keys = [key] if isinstance(key, str) else list(key or [])
+    if mode == "upsert" and not keys:
+        raise ValueError("upsert needs key columns")
+    if mode == "partition" and not partition:
+        raise ValueError("partition mode needs the partition column")
+    engine = engine or get_engine()
+    cols = [_quote(c) for c in df.columns]
+    start = time.perf_counter()
+
+    raw = engine.raw_connection()
+    deferred = []
+    try:
+        conn = raw.driver_connection
+        conn.isolation_level = None             # explicit BEGIN/COMMIT around the whole load
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("BEGIN")
+        if mode == "replace":
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        schema = ", ".join(f"{_quote(c)} {_sql_type(t)}" for c, t in df.dtypes.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({schema})")
+        if keys:
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote('ux_' + table + '_' + '_'.join(keys))} "
+                         f"ON {_quote(table)} ({', '.join(_quote(k) for k in keys)})")
+
+        # Defer every other index: one sorted build at the end beats updating it per row
+        deferred = [(name, sql) for name, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,)) if not (keys and name == "ux_" + table + "_" + "_".join(keys))]
+        for name, _ in deferred:
+            conn.execute(f"DROP INDEX {_quote(name)}")
+
+        insert = f"INSERT INTO {_quote(table)} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        if mode == "upsert":
+            updates = [c for c, name in zip(cols, df.columns) if name not in keys]
+            insert += f" ON CONFLICT ({', '.join(_quote(k) for k in keys)}) DO " + (
+                "UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in updates) if updates else "NOTHING")
+
+        if mode == "partition":
+            # Bound exactly as the inserted rows are, so a datetime month deletes what it re-inserts
+            for value in _sql_values(df[partition].dropna().drop_duplicates()):
+                conn.execute(f"DELETE FROM {_quote(table)} WHERE {_quote(partition)} = ?", (value,))
+        for rows in _batches(df, batch_rows):
+            conn.executemany(insert, rows)
+
+        for _, sql in deferred:
+            conn.execute(sql)
+        conn.execute("COMMIT")
+    except Exception:
+        conn = raw.driver_connection
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        # The rollback restores dropped indexes with the rest of the schema; rebuild any that are
+        # still missing so a failed load never leaves the table unindexed
+        present = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name, sql in deferred:
+            if name not in present:
+                conn.execute(sql)
+        raise
+    finally:
+        raw.driver_connection.execute("PRAGMA synchronous = NORMAL")
+        raw.driver_connection.isolation_level = ""
+        raw.close()
+    seconds = time.perf_counter() - start
+    return {"rows": len(df), "seconds": round(seconds, 3), "rows_per_second": round(len(df) / max(seconds, 1e-9))}
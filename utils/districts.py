@@ -0,0 +1,149 @@
+import os
+import re
+
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import (
+    DATA_DIR, data_version, _drop_serial_cols, _split_totals,
+    load_bihar_districts, load_karnataka_districts, load_maharashtra_districts,
+)
+from utils.instrument import cache_call, cache_miss, timed
+from utils.ml_models import detect_anomalies
+
+# state -> file, loader, citation, the column holding account counts, time-series periods and the
+# date a single-snapshot source is as of (the financial year end of the answer - utils.panel).
+# Any other data/<state>_districts.csv is picked up with the generic loader below.
+DISTRICT_SOURCES = {
+    "Bihar": {
+        "file": "bihar_districts.csv",
+        "loader": load_bihar_districts,
+        "source": "Rajya Sabha Unstarred Question No. 246, 2022.",
+        "accounts": "Accounts",
+        "as_of": "2022-03-31",
+    },
+    "Karnataka": {
+        "file": "karnataka_districts.csv",
+        "loader": load_karnataka_districts,
+        "source": "Rajya Sabha Unstarred Question No. 2313, 2023.",
+        "accounts": "Total_Accounts",
+        "as_of": "2023-03-31",
+    },
+    "Maharashtra": {
+        "file": "maharashtra_districts.csv",
+        "loader": load_maharashtra_districts,
+        "source": "Rajya Sabha Unstarred Question No. 886, 2024. 4-point time series: Mar 2022, Mar 2023, Mar 2024, Jun 2024.",
+        "accounts": "Jun_2024",
+        "periods": {"Mar_2022": "Mar 2022", "Mar_2023": "Mar 2023", "Mar_2024": "Mar 2024", "Jun_2024": "Jun 2024"},
+    },
+}
+
+# Metrics the explorer knows how to chart, in display order; a source offers whichever it has
+DISTRICT_METRICS = {
+    "Accounts": "Total Accounts",
+    "Total_Accounts": "Total Accounts",
+    "Avg_Balance_INR": "Avg Balance (₹)",
+    "Balance_Crore": "Total Balance (₹ Cr)",
+    "Operative_Pct": "Operative %",
+    "Inactive_Pct": "Inactive %",
+    "Female_Pct": "Female %",
+    "Growth_2022_2024": "Growth % (2022-2024)",
+    "Growth_2023_2024": "Growth % (2023-2024)",
+}
+
+_PERIOD_COL = re.compile(r"^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)_\d{4}$")
+
+
+def district_sources():
+    """Registered sources plus any data/<state>_districts.csv dropped in, keyed by state"""
+    sources = {state: spec for state, spec in DISTRICT_SOURCES.items()
+               if os.path.exists(os.path.join(DATA_DIR, spec["file"]))}
+    known = {spec["file"] for spec in DISTRICT_SOURCES.values()}
+    for name in sorted(os.listdir(DATA_DIR)):
+        if name.endswith("_districts.csv") and name not in known:
+            state = name[:-len("_districts.csv")].replace("_", " ").title()
+            sources[state] = {"file": name, "loader": None, "source": f"data/{name}", "accounts": None}
+    return dict(sorted(sources.items()))
+
+
+def _load_generic(path, state):
+    """Districts CSV already in the standard column names - derive the usual ratios"""
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    df.columns = df.columns.str.strip()
+    df = _drop_serial_cols(df)
+    df = _split_totals(df, "District")
+    df["State"] = state
+    df["District"] = df["District"].astype(str).str.strip()
+    for col in df.columns.drop(["District", "State"]):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    if {"Accounts", "Balance_Crore"} <= set(df.columns) and "Avg_Balance_INR" not in df.columns:
+        df["Avg_Balance_INR"] = ((df["Balance_Crore"] * 1e7) / df["Accounts"]).round(0)
+    if "Total_Accounts" in df.columns:
+        if "Operative_Accounts" in df.columns:
+            df["Inactive_Accounts"] = df["Total_Accounts"] - df["Operative_Accounts"]
+            df["Operative_Pct"] = (df["Operative_Accounts"] / df["Total_Accounts"] * 100).round(1)
+            df["Inactive_Pct"] = (100 - df["Operative_Pct"]).round(1)
+        if "Female_Accounts" in df.columns:
+            df["Female_Pct"] = (df["Female_Accounts"] / df["Total_Accounts"] * 100).round(1)
+    return df
+
+
+def period_columns(state, df):
+    """Ordered {column: label} of the time-series points a source provides"""
+    spec = district_sources().get(state, {})
+    if spec.get("periods"):
+        return {c: label for c, label in spec["periods"].items() if c in df.columns}
+    return {c: c.replace("_", " ") for c in df.columns if _PERIOD_COL.match(c)}
+
+
+def accounts_column(state, df):
+    spec = district_sources().get(state, {})
+    if spec.get("accounts") in df.columns:
+        return spec["accounts"]
+    periods = list(period_columns(state, df))
+    for col in ["Accounts", "Total_Accounts"] + periods[::-1]:
+        if col in df.columns:
+            return col
+    return None
+
+
+def available_metrics(df):
+    """Known metrics present in the frame, one per label (Accounts wins over Total_Accounts)"""
+    metrics, labels = [], set()
+    for m, label in DISTRICT_METRICS.items():
+        if m in df.columns and df[m].notna().any() and label not in labels:
+            metrics.append(m)
+            labels.add(label)
+    return metrics
+
+
+def _load_source(state, spec):
+    return spec["loader"]() if spec["loader"] else _load_generic(os.path.join(DATA_DIR, spec["file"]), state)
+
+
+def district_names():
+    """{state: [district names]} for every source - what the search index is built from"""
+    return {state: _load_source(state, spec)["District"].tolist() for state, spec in district_sources().items()}
+
+
+@timed()
+def load_district_source(state):
+    """One state's districts with anomaly flags on its account counts"""
+    df = _load_source(state, district_sources()[state])
+    account_col = accounts_column(state, df)
+    if account_col and len(df) > 2:
+        df = detect_anomalies(df, account_col)
+    return df
+
+
+@st.cache_resource(show_spinner="Loading districts...")
+def _get_districts(state, version):
+    cache_miss("districts")
+    return load_district_source(state)
+
+
+def get_districts(state):
+    """Cached per-state frame - only states somebody actually opens are ever loaded.
+    Returns a shallow copy-on-write view, like utils.snapshot.get_frames."""
+    cache_call("districts")
+    return _get_districts(state, data_version()).copy(deep=False)
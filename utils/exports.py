@@ -0,0 +1,84 @@
+import hashlib
+import importlib.util
+import io
+
+import streamlit as st
+
+from utils.instrument import cache_call, cache_miss, timed
+
+# label -> file extension, MIME type and the optional module the writer needs
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", None),
+    "CSV (gzip)": ("csv.gz", "application/gzip", None),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", "pyarrow"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+}
+
+
+def available_formats():
+    """Export formats whose writer dependency is installed"""
+    return [name for name, (_, _, module) in EXPORT_FORMATS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def filter_hash(filters):
+    """Stable short hash of the widget values that produced a filtered frame"""
+    if not filters:
+        return "all"
+    return hashlib.sha1(repr(sorted(filters.items())).encode()).hexdigest()[:12]
+
+
+@timed()
+def to_bytes(df, fmt):
+    """Serialise a frame into one of EXPORT_FORMATS"""
+    if fmt == "CSV":
+        return df.to_csv(index=False).encode("utf-8")
+    if fmt == "CSV (gzip)":
+        buf = io.BytesIO()
+        df.to_csv(buf, index=False, compression={"method": "gzip", "mtime": 0})
+        return buf.getvalue()
+    buf = io.BytesIO()
+    if fmt == "Parquet":
+        df.to_parquet(buf, index=False)
+    elif fmt == "Excel":
+        df.to_excel(buf, index=False, engine="openpyxl")
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buf.getvalue()
+
+
+def frame_fingerprint(df):
+    """Cheap identity of a frame's shape - columns and row count - so two different frames
+    exported under the same name and filters never share a cache entry"""
+    return (tuple(map(str, df.columns)), len(df))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_export(name, version, fhash, fmt, fingerprint, _df):
+    # _df is excluded from hashing - name, version, filter hash and fingerprint identify it
+    cache_miss("export")
+    return to_bytes(_df, fmt)
+
+
+def export_format_picker(key="export_format"):
+    """One format selector shared by all download buttons in a section"""
+    return st.radio("Export format:", available_formats(), horizontal=True, key=key)
+
+
+def download_button(label, df, file_stem, version, filters=None, fmt="CSV", key=None):
+    """Download button that only serialises the frame when clicked, cached per version/filters/format"""
+    ext, mime, _ = EXPORT_FORMATS[fmt]
+    fhash = filter_hash(filters)
+
+    def data():
+        cache_call("export")
+        return _cached_export(file_stem, version, fhash, fmt, frame_fingerprint(df), df)
+
+    return st.download_button(
+        label,
+        data,
+        f"{file_stem}.{ext}",
+        mime,
+        key=key,
+        on_click="ignore",
+    )
@@ -0,0 +1,315 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from utils.instrument import cache_call, cache_miss, timed
+
+# Choropleth geometry from local boundary files (data/geo/*.geojson), simplified once per file and
+# zoom level and cached in compact form. Rings are split into arcs at the points where borders meet
+# and each shared arc is simplified once, so neighbouring polygons stay gap-free at every zoom.
+#
+#   data/geo/india_states.geojson          state polygons (ST_NM / NAME_1 / name property)
+#   data/geo/<state>_districts.geojson     one state's districts, or
+#   data/geo/india_districts.geojson       every district, with a state property to filter on
+ROOT = os.path.dirname(os.path.dirname(__file__))
+GEO_DIR = os.environ.get("PMJDY_GEO_DIR", os.path.join(ROOT, "data", "geo"))
+GEO_CACHE_DIR = os.path.join(ROOT, "geo_cache")
+STATE_FILE = "india_states.geojson"
+DISTRICT_FILE = "india_districts.geojson"
+
+# Douglas-Peucker tolerance in degrees per zoom (0.001 deg is roughly 100 m)
+ZOOMS = {"national": 0.02, "state": 0.004, "district": 0.001}
+QUANTUM = 1e-5
+# Name properties in the order they are tried; generic "name" last (it is not used to filter districts by state)
+STATE_KEYS = ["ST_NM", "st_nm", "NAME_1", "state", "State", "STATE", "st_name", "name", "NAME"]
+DISTRICT_KEYS = ["DISTRICT", "district", "District", "dtname", "NAME_2", "dist_name", "name", "NAME"]
+ALIASES = {"orissa": "odisha", "pondicherry": "puducherry", "nctofdelhi": "delhi", "uttaranchal": "uttarakhand",
+           "andamanandnicobar": "andamanandnicobarislands", "dadranagarhavelianddamananddiu": "dadraandnagarhavelianddamananddiu"}
+
+
+def normalise(name):
+    key = re.sub(r"[^a-z0-9]", "", str(name).lower().replace("&", "and"))
+    return ALIASES.get(key, key)
+
+
+def _rings(geometry):
+    """[[ring, ...] per polygon] of a Polygon or MultiPolygon"""
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _keys(points):
+    # One int64 per quantised point, so shared vertices compare exactly
+    return (points[:, 0].astype(np.int64) << 32) | (points[:, 1].astype(np.int64) & 0xFFFFFFFF)
+
+
+def _junctions(rings):
+    """Keys of points with more than two distinct neighbours across all rings - where borders meet"""
+    pairs = []
+    for ring in rings:
+        k = _keys(ring)
+        pairs.append(np.stack([k, np.roll(k, 1)], axis=1))
+        pairs.append(np.stack([k, np.roll(k, -1)], axis=1))
+    pairs = np.unique(np.concatenate(pairs), axis=0)
+    points, counts = np.unique(pairs[:, 0], return_counts=True)
+    return set(points[counts > 2].tolist())
+
+
+def _split(ring, junctions):
+    """A closed ring (no repeated last point) as arcs that start and end at junctions"""
+    keys = _keys(ring)
+    cuts = [i for i, k in enumerate(keys.tolist()) if k in junctions]
+    if not cuts:
+        # Unshared or wholly shared ring (island, enclave): start it at its smallest point so
+        # both sides of an enclave produce the same arc
+        start = int(np.argmin(keys))
+        ring = np.roll(ring, -start, axis=0)
+        return [np.vstack([ring, ring[:1]])]
+    ring = np.roll(ring, -cuts[0], axis=0)
+    cuts = [c - cuts[0] for c in cuts] + [len(ring)]
+    ring = np.vstack([ring, ring[:1]])
+    return [ring[a:b + 1] for a, b in zip(cuts, cuts[1:])]
+
+
+def _douglas_peucker(points, tolerance):
+    """Indices kept by Douglas-Peucker; endpoints always kept"""
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    pts = points.astype(float)
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = pts[b] - pts[a]
+        rel = pts[a + 1:b] - pts[a]
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            keep[a + 1 + i] = True
+            stack.append((a, a + 1 + i))
+            stack.append((a + 1 + i, b))
+    return np.flatnonzero(keep)
+
+
+def _simplify_arc(arc, tolerance):
+    kept = arc[_douglas_peucker(arc, tolerance)]
+    closed = len(arc) > 3 and (arc[0] == arc[-1]).all()
+    if closed and len(kept) < 4:
+        # A ring on its own must stay a ring
+        kept = arc[np.unique(np.linspace(0, len(arc) - 1, 4).round().astype(int))]
+    return kept
+
+
+def _encode(arcs):
+    """Concatenated delta-encoded int32 coordinates plus offsets - the on-disk form"""
+    offsets = np.cumsum([0] + [len(a) for a in arcs])
+    deltas = [np.diff(a, axis=0, prepend=np.zeros((1, 2), dtype=a.dtype)) for a in arcs]
+    return (np.concatenate(deltas).astype(np.int32) if deltas else np.zeros((0, 2), np.int32)), offsets
+
+
+def _decode(deltas, offsets):
+    return [np.cumsum(deltas[a:b], axis=0) for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def _code_hash():
+    src = "".join(inspect.getsource(f) for f in (_junctions, _split, _douglas_peucker, _simplify_arc, _encode, build_topology))
+    return hashlib.sha256(src.encode()).hexdigest()[:8]
+
+
+@timed()
+def build_topology(geojson, name_keys=STATE_KEYS, zooms=ZOOMS):
+    """Shared-arc topology of a FeatureCollection simplified at every zoom.
+
+    Returns {"features": [{"name", "properties", "polygons": [[[arc refs]...]...]}],
+             "arcs": {zoom: (deltas, offsets)}} where an arc ref is the arc index, or ~index
+    for the arc reversed (TopoJSON's convention).
+    """
+    features, rings = [], []
+    for feature in geojson.get("features", []):
+        props = feature.get("properties") or {}
+        name = next((props[k] for k in name_keys if props.get(k)), None)
+        polygons = []
+        for polygon in _rings(feature.get("geometry")):
+            refs = []
+            for ring in polygon:
+                q = np.round(np.asarray(ring, dtype=float)[:, :2] / QUANTUM).astype(np.int64)
+                if len(q) > 1 and (q[0] == q[-1]).all():
+                    q = q[:-1]
+                # Drop consecutive duplicates left by quantisation
+                q = q[np.r_[True, (np.diff(q, axis=0) != 0).any(axis=1)]]
+                if len(q) >= 3:
+                    refs.append(len(rings))
+                    rings.append(q)
+            if refs:
+                polygons.append(refs)
+        features.append({"name": name, "properties": {k: v for k, v in props.items() if isinstance(v, (str, int, float))},
+                         "polygons": polygons})
+
+    junctions = _junctions(rings) if rings else set()
+    arcs, arc_ids, ring_arcs = [], {}, []
+    for ring in rings:
+        refs = []
+        for arc in _split(ring, junctions):
+            forward, backward = arc.tobytes(), arc[::-1].tobytes()
+            if forward in arc_ids:
+                refs.append(arc_ids[forward])
+            elif backward in arc_ids:
+                refs.append(~arc_ids[backward])
+            else:
+                arc_ids[forward] = len(arcs)
+                refs.append(len(arcs))
+                arcs.append(arc)
+        ring_arcs.append(refs)
+    for feature in features:
+        feature["polygons"] = [[ring_arcs[r] for r in polygon] for polygon in feature["polygons"]]
+
+    simplified = {zoom: _encode([_simplify_arc(a, tolerance / QUANTUM) for a in arcs]) for zoom, tolerance in zooms.items()}
+    return {"features": features, "arcs": simplified}
+
+
+def _assemble(refs, arcs):
+    parts = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        parts.append(arc if not parts else arc[1:])
+    return np.vstack(parts)
+
+
+def to_geojson(topology, zoom, names=None):
+    """FeatureCollection at a zoom, coordinates rounded to what the tolerance can show.
+    names ({normalised name: display name}) relabels features to match the data's spelling."""
+    deltas, offsets = topology["arcs"][zoom]
+    arcs = _decode(deltas, offsets)
+    digits = max(1, int(np.ceil(-np.log10(ZOOMS.get(zoom, QUANTUM)))) + 1)
+    features = []
+    for feature in topology["features"]:
+        polygons = []
+        for polygon in feature["polygons"]:
+            rings = []
+            for i, refs in enumerate(polygon):
+                ring = _assemble(refs, arcs)
+                if len(ring) < 4:
+                    if i == 0:
+                        break
+                    continue
+                rings.append(np.round(ring * QUANTUM, digits).tolist())
+            if rings:
+                polygons.append(rings)
+        if not polygons:
+            continue
+        name = feature["name"]
+        if names is not None:
+            name = names.get(normalise(name), name)
+        features.append({"type": "Feature", "id": name, "properties": {**feature["properties"], "name": name},
+                         "geometry": {"type": "MultiPolygon", "coordinates": polygons}})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def _cache_path(path, name_keys):
+    digest = hashlib.sha256(f"{_file_digest(path)}{name_keys}{sorted(ZOOMS.items())}{_code_hash()}".encode()).hexdigest()[:16]
+    return os.path.join(GEO_CACHE_DIR, f"{os.path.splitext(os.path.basename(path))[0]}_{digest}.npz")
+
+
+def load_topology(path, name_keys=STATE_KEYS):
+    """build_topology of a boundary file, read from geo_cache/ when the file is unchanged"""
+    cache = _cache_path(path, name_keys)
+    if os.path.exists(cache):
+        with np.load(cache) as npz:
+            arcs = {zoom: (npz[f"{zoom}_deltas"], npz[f"{zoom}_offsets"]) for zoom in ZOOMS}
+            features = json.loads(npz["features"].item())
+        return {"features": features, "arcs": arcs}
+    with open(path, encoding="utf-8") as f:
+        topology = build_topology(json.load(f), name_keys)
+    os.makedirs(GEO_CACHE_DIR, exist_ok=True)
+    arrays = {f"{zoom}_{part}": value for zoom, (deltas, offsets) in topology["arcs"].items()
+              for part, value in (("deltas", deltas), ("offsets", offsets))}
+    tmp = cache + ".tmp.npz"
+    np.savez_compressed(tmp, features=np.array(json.dumps(topology["features"])), **arrays)
+    os.replace(tmp, cache)
+    return topology
+
+
+def state_boundary_file():
+    path = os.path.join(GEO_DIR, STATE_FILE)
+    return path if os.path.exists(path) else None
+
+
+def district_boundary_file(state):
+    path = os.path.join(GEO_DIR, f"{state.lower().replace(' ', '_')}_districts.geojson")
+    if os.path.exists(path):
+        return path
+    path = os.path.join(GEO_DIR, DISTRICT_FILE)
+    return path if os.path.exists(path) else None
+
+
+@st.cache_resource(show_spinner="Loading boundaries...", max_entries=32)
+def _get_geojson(path, mtime, name_keys, zoom, names, state):
+    cache_miss("geo")
+    topology = load_topology(path, list(name_keys))
+    if state is not None:
+        # All-India district file: keep only the one state's features. A file without a state
+        # property matches nothing - never the whole country, whose district names repeat across states
+        wanted = normalise(state)
+        topology = {**topology, "features": [f for f in topology["features"]
+                                             if any(normalise(f["properties"].get(k, "")) == wanted for k in STATE_KEYS[:-2])]}
+    geojson = to_geojson(topology, zoom, dict(names))
+    return geojson if geojson["features"] else None
+
+
+def state_geojson(states, zoom="national"):
+    """Simplified state polygons named as in `states`, or None without a boundary file"""
+    path = state_boundary_file()
+    if path is None:
+        return None
+    cache_call("geo")
+    names = tuple(sorted((normalise(s), s) for s in states))
+    return _get_geojson(path, os.stat(path).st_mtime_ns, tuple(STATE_KEYS), zoom, names, None)
+
+
+def district_geojson(state, districts, zoom="state"):
+    """Simplified district polygons of one state named as in `districts`, or None without a
+    boundary file or any feature of that state"""
+    path = district_boundary_file(state)
+    if path is None:
+        return None
+    cache_call("geo")
+    names = tuple(sorted((normalise(d), d) for d in districts))
+    state_filter = state if os.path.basename(path) == DISTRICT_FILE else None
+    return _get_geojson(path, os.stat(path).st_mtime_ns, tuple(DISTRICT_KEYS), zoom, names, state_filter)
+
+
+def choropleth(df, geojson, location_col, metric, label, height=520, color_scale="Blues"):
+    """Plotly choropleth of df[metric] on a geojson from state_geojson/district_geojson"""
+    fig = px.choropleth(df, geojson=geojson, locations=location_col, featureidkey="properties.name",
+                        color=metric, color_continuous_scale=color_scale, hover_name=location_col,
+                        labels={metric: label}, height=height)
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(plot_bgcolor="#F8F9FA", paper_bgcolor="white", margin={"l": 0, "r": 0, "t": 10, "b": 0})
+    return fig
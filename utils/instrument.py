@@ -0,0 +1,160 @@
+import functools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# Opt-in rerun instrumentation: PMJDY_METRICS=1 streamlit run app.py
+# Disabled, timed() hands back the undecorated function and span() a shared no-op context,
+# so the only cost left in the app is an attribute lookup.
+ENABLED = os.environ.get("PMJDY_METRICS", "").lower() in ("1", "true", "yes", "on")
+MAX_SAMPLES = 1000
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_cache = defaultdict(lambda: [0, 0])
+_local = threading.local()
+_NULL = nullcontext()
+_started = time.time()
+
+
+def enabled():
+    return ENABLED
+
+
+def set_page(name):
+    """Attribute the spans recorded on this script thread to a page"""
+    if ENABLED:
+        _local.page = name
+
+
+def current_page():
+    return getattr(_local, "page", "-")
+
+
+def record(section, ms, page=None):
+    with _lock:
+        _samples[(page or current_page(), section)].append(ms)
+
+
+@contextmanager
+def _span(section):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(section, (time.perf_counter() - t) * 1000)
+
+
+def span(section):
+    """with span("figure.map"): ... - timed when enabled, free otherwise"""
+    return _span(section) if ENABLED else _NULL
+
+
+def timed(section=None):
+    """Decorator timing every call of the function under `section` (default: its qualified name)"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        name = section or f"{fn.__module__.split('.')[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - t) * 1000)
+        return wrapper
+    return decorate
+
+
+def cache_call(name):
+    """Count a lookup of a cached function; pair with cache_miss() inside its body"""
+    if ENABLED:
+        with _lock:
+            _cache[name][0] += 1
+
+
+def cache_miss(name):
+    if ENABLED:
+        with _lock:
+            _cache[name][1] += 1
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _cache.clear()
+
+
+def section_samples():
+    """One row per recorded call: page, section, ms"""
+    with _lock:
+        rows = [(page, section, ms) for (page, section), values in _samples.items() for ms in values]
+    return pd.DataFrame(rows, columns=["Page", "Section", "ms"])
+
+
+def section_summary():
+    samples = section_samples()
+    if samples.empty:
+        return samples
+    summary = samples.groupby(["Page", "Section"])["ms"].agg(
+        Calls="count", Mean="mean", P50="median",
+        P95=lambda s: s.quantile(0.95), Max="max", Total="sum",
+    ).reset_index()
+    return summary.sort_values("Total", ascending=False).round(2).reset_index(drop=True)
+
+
+def cache_summary():
+    with _lock:
+        rows = [(name, calls, misses) for name, (calls, misses) in _cache.items()]
+    df = pd.DataFrame(rows, columns=["Cache", "Lookups", "Misses"])
+    df["Hits"] = df["Lookups"] - df["Misses"]
+    df["Hit Rate %"] = (df["Hits"] / df["Lookups"].where(df["Lookups"] > 0) * 100).round(1)
+    return df.sort_values("Lookups", ascending=False).reset_index(drop=True)
+
+
+def memory_mb():
+    """Current and peak resident set size of the server process"""
+    current = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        peak = None
+    return current, peak
+
+
+def uptime_seconds():
+    return time.time() - _started
+
+
+def _install_hooks():
+    # Figures are built inline on the pages, so time the plotly express builders and the
+    # Streamlit calls that serialise figures and render tables/Stylers
+    import plotly.express as px
+    import streamlit as st
+    from streamlit.delta_generator import DeltaGenerator
+
+    for name in ["bar", "line", "pie", "scatter", "histogram", "box", "choropleth", "treemap", "sunburst"]:
+        if hasattr(px, name):
+            setattr(px, name, timed(f"figure.px.{name}")(getattr(px, name)))
+
+    for name in ["plotly_chart", "dataframe", "table"]:
+        setattr(DeltaGenerator, name, timed(f"render.{name}")(getattr(DeltaGenerator, name)))
+        setattr(st, name, getattr(st._main, name))
+
+
+if ENABLED:
+    _install_hooks()
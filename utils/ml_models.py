@@ -1,14 +1,17 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
 import warnings
 warnings.filterwarnings("ignore")
 
+from utils.instrument import timed
 
-def cluster_states(df):
+
+@timed()
+def cluster_states(df, return_model=False):
     """K-Means clustering of states into performance tiers"""
+    # sklearn is imported lazily - it dominates cold-start time and most pages never cluster
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
     features = df[["Accounts_Per_1000", "Avg_Balance_INR", "Performance_Score"]].dropna()
     scaler = StandardScaler()
     scaled = scaler.fit_transform(features)
@@ -22,14 +25,17 @@ def cluster_states(df):
         means.index[1]: "Developing",
         means.index[2]: "High Performer",
     }
-    df = df.copy()
+    df = df.copy(deep=False)  # new columns only - copy-on-write keeps the caller's frame intact
     df["Tier"] = df.index.map(lambda i: label_map.get(clusters[list(features.index).index(i)], "Unknown") if i in features.index else "Unknown")
+    if return_model:
+        return df, {"scaler": scaler, "kmeans": km, "labels": label_map}
     return df
 
 
+@timed()
 def predict_underperformers(df):
     """Identify states underperforming vs their population potential"""
-    df = df.copy()
+    df = df.copy(deep=False)
     df["Expected_Accounts"] = df["Population"] * 0.45  # 45% coverage target
     df["Coverage_Pct"] = (df["Accounts"] / df["Population"] * 100).round(1)
     df["Gap_Lakh"] = ((df["Expected_Accounts"] - df["Accounts"]) / 1e5).round(1)
@@ -37,8 +43,10 @@ def predict_underperformers(df):
     return df
 
 
+@timed()
 def growth_predictor(df_maha):
     """Predict when Maharashtra districts will reach saturation (based on trend)"""
+    from sklearn.linear_model import LinearRegression
     results = []
     for _, row in df_maha.iterrows():
         district = row["District"]
@@ -69,9 +77,10 @@ def growth_predictor(df_maha):
     return pd.DataFrame(results)
 
 
+@timed()
 def detect_anomalies(df, account_col="Accounts", balance_col=None):
     """Flag districts with unusual patterns using z-score"""
-    df = df.copy()
+    df = df.copy(deep=False)
     df["Z_Score"] = (df[account_col] - df[account_col].mean()) / df[account_col].std()
     df["Anomaly"] = df["Z_Score"].abs() > 2
     df["Anomaly_Type"] = df["Z_Score"].apply(
@@ -0,0 +1,48 @@
+import os
+
+import streamlit as st
+
+from utils import instrument, profiling
+from utils.search import search_box
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
+
+
+@st.cache_resource
+def _load_css():
+    """Read the stylesheet once per process instead of on every rerun"""
+    instrument.cache_miss("css")
+    path = os.path.join(ASSETS_DIR, "style.css")
+    if not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def setup_page(page_title, sidebar_title=None, **config):
+    """Common page bootstrap: config, stylesheet and the standard sidebar heading"""
+    instrument.set_page(sidebar_title or page_title)
+    profiling.label_run(sidebar_title or page_title)
+    config.setdefault("page_icon", "")
+    config.setdefault("layout", "wide")
+    st.set_page_config(page_title=page_title, **config)
+    instrument.cache_call("css")
+    css = _load_css()
+    if css:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+    if sidebar_title:
+        with st.sidebar:
+            st.page_link("app.py", label=" Back to Home")
+            st.markdown("---")
+            st.markdown(f"##  {sidebar_title}")
+            search_box()
+            st.markdown("---")
+
+
+def page_header(title, subtitle, font_size=24):
+    st.markdown(f"""
+<div class='gov-header'>
+    <h1 style='margin:0; font-size:{font_size}px;'> {title}</h1>
+    <p style='margin:5px 0 0 0; opacity:0.9;'>{subtitle}</p>
+</div>
+""", unsafe_allow_html=True)
@@ -0,0 +1,206 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import streamlit as st
+
+from utils.data_loader import data_version, load_state_data
+from utils.districts import _load_source, district_sources, period_columns
+from utils.instrument import cache_call, cache_miss, timed
+
+# Long-format panel of every PMJDY figure we have: one row per (entity, date, metric), written as
+# Parquet partitioned by release month (panel/release=2024-03/...). The CSVs keep their shapes;
+# the panel is derived from them and rebuilt whenever data_version() changes.
+PANEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "panel")
+VERSION_FILE = "_version"
+COLUMNS = ["level", "state", "district", "entity", "date", "metric", "value"]
+SCHEMA = pa.schema([
+    ("level", pa.string()), ("state", pa.string()), ("district", pa.string()), ("entity", pa.string()),
+    ("date", pa.timestamp("ns")), ("metric", pa.string()), ("value", pa.float64()), ("release", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("release", pa.string())]), flavor="hive")
+
+# state_data.csv is "as of 2024"; like the district sources' as_of it is dated to the financial year
+# end, since the answers give the year only. Time-series columns (Mar_2022...) carry their own month.
+STATE_AS_OF = "2024-03-31"
+STATE_METRICS = ["Accounts", "Deposit_Crore", "Avg_Balance_INR", "Accounts_Per_1000"]
+# District columns that are derived from the time series rather than observed at a date
+DERIVED_PREFIXES = ("Growth_", "Accounts_Lakh")
+
+
+def district_entity(state, district):
+    return f"{state}/{district}"
+
+
+def _period_date(column):
+    """Mar_2022 -> 2022-03-31"""
+    month, year = column.split("_")
+    return pd.Timestamp(f"{month} {year}") + pd.offsets.MonthEnd(0)
+
+
+def _melt(df, ids, metrics, date):
+    long = df[ids + metrics].melt(id_vars=ids, var_name="metric", value_name="value")
+    long["date"] = pd.Timestamp(date)
+    return long
+
+
+def panel_rows():
+    """Every loader's output reshaped to the panel's long format"""
+    states = load_state_data()
+    frames = [_melt(states.assign(district=None, entity=states["State"]).rename(columns={"State": "state"}),
+                    ["state", "district", "entity"], [m for m in STATE_METRICS if m in states.columns], STATE_AS_OF)
+              .assign(level="state")]
+
+    for state, spec in district_sources().items():
+        df = _load_source(state, spec).rename(columns={"Total_Accounts": "Accounts"})
+        df = df.assign(state=state, district=df["District"], entity=[district_entity(state, d) for d in df["District"]])
+        ids = ["state", "district", "entity"]
+        periods = list(period_columns(state, df))
+        for column in periods:
+            frames.append(df[ids].assign(metric="Accounts", value=df[column], date=_period_date(column), level="district"))
+        observed = [c for c in df.select_dtypes("number").columns
+                    if c not in periods and not c.startswith(DERIVED_PREFIXES)]
+        if observed:
+            frames.append(_melt(df, ids, observed, spec.get("as_of", STATE_AS_OF)).assign(level="district"))
+
+    panel = pd.concat(frames, ignore_index=True)
+    panel["value"] = pd.to_numeric(panel["value"], errors="coerce")
+    panel = panel.dropna(subset=["value"])
+    panel["date"] = panel["date"].astype("datetime64[ns]")
+    return panel[COLUMNS].sort_values(["entity", "metric", "date"]).reset_index(drop=True)
+
+
+def write_panel(df, path=PANEL_DIR):
+    """Write rows into the store, replacing the release-month partitions they fall in"""
+    df = df[COLUMNS].assign(release=df["date"].dt.strftime("%Y-%m"))
+    table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+    ds.write_dataset(table, path, format="parquet", partitioning=PARTITIONING,
+                     existing_data_behavior="delete_matching", basename_template="part-{i}.parquet")
+    return sorted(df["release"].unique())
+
+
+def build_panel(path=PANEL_DIR, version=None):
+    """Rebuild the whole store from data/ (into a sibling directory, swapped in when complete)"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    write_panel(panel_rows(), tmp)
+    with open(os.path.join(tmp, VERSION_FILE), "w") as f:
+        f.write(version or data_version())
+    # Move the old store aside before swapping, so there is always a complete store at path or old
+    old = f"{path}.old-{os.getpid()}"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def _stored_version(path):
+    try:
+        with open(os.path.join(path, VERSION_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def ensure_panel(path=PANEL_DIR):
+    """The store at path, rebuilt first if it is missing or older than the data files"""
+    version = data_version()
+    if _stored_version(path) != version:
+        build_panel(path, version)
+    return path
+
+
+class PanelStore:
+    """The panel (or the releases between start and end) in memory, sorted by entity, metric, date.
+
+    Each (entity, metric) series is a contiguous slice, so series() is a dict lookup and
+    as_of()/latest() are one vectorised pass over the rows.
+    """
+
+    def __init__(self, path=PANEL_DIR, start=None, end=None):
+        self.path = path
+        self.df = self.read(path, start, end)
+        entity, metric = self.df["entity"].to_numpy(), self.df["metric"].to_numpy()
+        starts = np.flatnonzero(np.r_[len(entity) > 0, (entity[1:] != entity[:-1]) | (metric[1:] != metric[:-1])])
+        ends = np.append(starts[1:], len(entity))
+        self._slices = {(entity[s], metric[s]): slice(s, e) for s, e in zip(starts, ends)}
+
+    @staticmethod
+    @timed("panel.read")
+    def read(path=PANEL_DIR, start=None, end=None):
+        """Rows of the releases in [start, end] - only those partitions' files are opened"""
+        dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+        flt = None
+        if start is not None:
+            flt = ds.field("release") >= pd.Timestamp(start).strftime("%Y-%m")
+        if end is not None:
+            upper = ds.field("release") <= pd.Timestamp(end).strftime("%Y-%m")
+            flt = upper if flt is None else flt & upper
+        df = dataset.to_table(filter=flt, columns=COLUMNS).to_pandas()
+        df = df.sort_values(["entity", "metric", "date"], kind="stable").reset_index(drop=True)
+        for column in ["level", "state"]:
+            df[column] = df[column].astype("category")
+        return df
+
+    def releases(self):
+        return sorted(self.df["date"].dt.strftime("%Y-%m").unique())
+
+    def dates(self, metric=None, **filters):
+        return sorted(self._select(metric, **filters)["date"].unique())
+
+    def _select(self, metric=None, level=None, state=None, entities=None):
+        mask = np.ones(len(self.df), dtype=bool)
+        if metric is not None:
+            mask &= (self.df["metric"] == metric).to_numpy()
+        if level is not None:
+            mask &= (self.df["level"] == level).to_numpy()
+        if state is not None:
+            mask &= (self.df["state"] == state).to_numpy()
+        if entities is not None:
+            mask &= self.df["entity"].isin(entities).to_numpy()
+        return self.df[mask]
+
+    def series(self, entity, metric):
+        """One entity's values of a metric, indexed by date"""
+        rows = self.df.iloc[self._slices.get((entity, metric), slice(0, 0))]
+        return pd.Series(rows["value"].to_numpy(), index=pd.DatetimeIndex(rows["date"], name="date"), name=metric)
+
+    def range(self, start=None, end=None, metric=None, **filters):
+        """Rows with start <= date <= end (either may be None)"""
+        df = self._select(metric, **filters)
+        if start is not None:
+            df = df[df["date"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["date"] <= pd.Timestamp(end)]
+        return df.reset_index(drop=True)
+
+    def as_of(self, date, metric=None, **filters):
+        """Each (entity, metric)'s most recent value on or before date, with the date it was observed"""
+        df = self.range(None, date, metric, **filters)
+        # Rows are sorted by entity, metric, date - the last of each run is the as-of value
+        return df.drop_duplicates(["entity", "metric"], keep="last").reset_index(drop=True)
+
+    def latest(self, metric=None, **filters):
+        return self.as_of(None, metric, **filters)
+
+    def wide(self, metric, **filters):
+        """entity x date table of a metric, the shape trend charts want"""
+        df = self._select(metric, **filters)
+        return df.pivot_table(index="entity", columns="date", values="value", aggfunc="last", observed=True)
+
+
+@st.cache_resource(show_spinner="Loading history...")
+def _get_panel(version):
+    cache_miss("panel")
+    return PanelStore(ensure_panel())
+
+
+def get_panel():
+    """Process-wide PanelStore for the current data version"""
+    cache_call("panel")
+    return _get_panel(data_version())
@@ -0,0 +1,197 @@
+import hashlib
+import inspect
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from utils.profiling import phase_profile
+
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".pipeline")
+
+
+def digest(value):
+    """Stable content hash of a phase result (DataFrames hashed by content, not pickle bytes)"""
+    h = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        h.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        h.update(repr(list(value.dtypes.astype(str)) if isinstance(value, pd.DataFrame) else str(value.dtype)).encode())
+    elif isinstance(value, dict):
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            h.update(digest(value[k]).encode())
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            h.update(digest(v).encode())
+    else:
+        h.update(pickle.dumps(value, protocol=4))
+    return h.hexdigest()
+
+
+def file_digest(path):
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Phase:
+    def __init__(self, name, fn, deps=(), outputs=(), uses=(), updates=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.outputs = tuple(outputs)
+        # Files another phase owns (lists in outputs) that this phase modifies in place
+        self.updates = tuple(updates)
+        # Helpers the phase calls (functions, classes or whole modules) - their source is part of
+        # the phase's code hash
+        self.uses = tuple(uses)
+
+    def code_hash(self):
+        src = "".join(inspect.getsource(f) for f in (self.fn,) + self.uses)
+        return hashlib.sha256(src.encode()).hexdigest()
+
+
+def _run_phase(fn, kwargs, name=None, profile_dir=None):
+    t = time.perf_counter()
+    with phase_profile(name, profile_dir):
+        value = fn(**kwargs)
+    return value, time.perf_counter() - t
+
+
+class Pipeline:
+    """Named phases with content-hashed inputs and outputs.
+
+    A phase's key hashes its code, the digests of the results it depends on and of the files
+    its dependencies wrote. A phase whose key and declared output files match the last run is
+    loaded from the cache instead of re-run; phases whose dependencies are ready run in
+    parallel worker processes.
+    """
+
+    def __init__(self, cache_dir=PIPELINE_DIR):
+        self.cache_dir = cache_dir
+        self.phases = {}
+
+    def phase(self, name=None, deps=(), outputs=(), uses=(), updates=()):
+        """Decorator: register fn as a phase; it receives its dependencies' results as keyword arguments"""
+        def register(fn):
+            phase_name = name or fn.__name__
+            if phase_name in self.phases:
+                raise ValueError(f"Duplicate phase: {phase_name}")
+            missing = [d for d in deps if d not in self.phases]
+            if missing:
+                raise ValueError(f"Phase {phase_name} depends on unknown phases: {missing}")
+            self.phases[phase_name] = Phase(phase_name, fn, deps, outputs, uses, updates)
+            return fn
+        return register
+
+    def _closure(self, targets):
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.phases:
+                raise KeyError(f"Unknown phase: {name}")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.phases[name].deps)
+        return [n for n in self.phases if n in needed]
+
+    def _key(self, phase, digests):
+        h = hashlib.sha256(phase.code_hash().encode())
+        for dep in phase.deps:
+            h.update(f"{dep}={digests[dep]}".encode())
+        return h.hexdigest()[:16]
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+    def _load(self, phase, key):
+        path = self._cache_path(phase.name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+        if entry.get("key") != key:
+            return None
+        if any(file_digest(p) != d for p, d in entry["files"].items()):
+            return None
+        return entry
+
+    def _store(self, phase, key, value, seconds):
+        files = {p: file_digest(p) for p in phase.outputs}
+        entry = {"key": key, "value": value, "digest": digest([digest(value), sorted(files.items())]),
+                 "files": files, "seconds": seconds}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self._cache_path(phase.name) + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._cache_path(phase.name))
+        return entry
+
+    def _refresh_owners(self, phase, ran):
+        """Re-record files a phase updated in place on their owners' cache entries, so the
+        expected in-place change does not invalidate the phase that created the file"""
+        for path in phase.updates:
+            for owner in ran:
+                if path not in self.phases[owner].outputs:
+                    continue
+                with open(self._cache_path(owner), "rb") as f:
+                    entry = pickle.load(f)
+                entry["files"][path] = file_digest(path)
+                tmp = self._cache_path(owner) + ".tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._cache_path(owner))
+
+    def run(self, targets=None, force=(), jobs=None, log=print, profile_dir=None):
+        """Run the phases needed for targets (default: all).
+
+        force: phase names to re-run regardless of the cache (True for all).
+        profile_dir: if set, every phase that runs is profiled into <profile_dir>/<phase>.*
+        Returns ({phase: result}, [{"phase", "status", "seconds"}...]) in completion order.
+        """
+        order = self._closure(targets or list(self.phases))
+        force = set(order) if force is True else set(force)
+        results, digests, report = {}, {}, []
+        pending = list(order)
+        running = {}
+        jobs = jobs or os.cpu_count() or 1
+        ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx) as pool:
+            while pending or running:
+                for name in [n for n in pending if all(d in digests for d in self.phases[n].deps)]:
+                    phase = self.phases[name]
+                    key = self._key(phase, digests)
+                    entry = None if name in force else self._load(phase, key)
+                    pending.remove(name)
+                    if entry is not None:
+                        results[name], digests[name] = entry["value"], entry["digest"]
+                        report.append({"phase": name, "status": "cached", "seconds": 0.0, "saved": entry["seconds"]})
+                        log(f"  {name:<28} cached   (saved {entry['seconds']:.2f}s)")
+                        continue
+                    kwargs = {d: results[d] for d in phase.deps}
+                    running[pool.submit(_run_phase, phase.fn, kwargs, name, profile_dir)] = (name, key)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    value, seconds = future.result()
+                    entry = self._store(self.phases[name], key, value, seconds)
+                    results[name], digests[name] = value, entry["digest"]
+                    report.append({"phase": name, "status": "ran", "seconds": round(seconds, 3)})
+                    self._refresh_owners(self.phases[name], [n for n in results if n != name])
+                    log(f"  {name:<28} ran      {seconds:.2f}s")
+        log(f"  {'total wall time':<28}          {time.perf_counter() - start:.2f}s")
+        return results, report
@@ -0,0 +1,218 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from urllib.parse import parse_qs
+
+import pandas as pd
+
+# Opt-in profiling of Streamlit reruns and analysis.py runs:
+#   PMJDY_PROFILE=1 streamlit run app.py        every rerun is profiled
+#   PMJDY_PROFILE=query streamlit run app.py    only reruns opened with ?profile=1
+#   python analysis.py --profile                every phase that runs is profiled
+# Each profiled run gets its own directory under PROFILE_DIR holding the cProfile stats,
+# the top tracemalloc allocation sites and a small JSON of timings. Unset, nothing is hooked.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.environ.get("PMJDY_PROFILE_DIR", os.path.join(ROOT, "reports", "profiles"))
+MODE = os.environ.get("PMJDY_PROFILE", "").lower()
+ENABLED = MODE in ("1", "true", "yes", "on", "all", "query")
+QUERY_ONLY = MODE == "query"
+TOP_ALLOCATIONS = 30
+# Repo code the viewer reports on by default
+SCOPES = ("utils", "pages", "app.py", "analysis.py", "dashboard.py")
+# Frames stored per allocation; 1 keeps tracemalloc's overhead to roughly 2x
+TRACE_FRAMES = int(os.environ.get("PMJDY_PROFILE_FRAMES", "1"))
+
+_lock = threading.Lock()
+_tracing = 0
+_local = threading.local()
+
+
+def enabled():
+    return ENABLED
+
+
+def label_run(label):
+    """Name the rerun on this script thread (setup_page passes the page title)"""
+    if ENABLED:
+        _local.label = label
+
+
+def _slug(label):
+    return re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_") or "run"
+
+
+def new_run_dir(label, out_dir=None):
+    """A fresh directory for one profiled request: <stamp>_<label>"""
+    stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+    path = os.path.join(out_dir or PROFILE_DIR, f"{stamp}_{_slug(label)}")
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(out_dir or PROFILE_DIR, f"{stamp}_{_slug(label)}_{suffix}")
+    os.makedirs(path)
+    return path
+
+
+def _start_tracing():
+    global _tracing
+    with _lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing
+    with _lock:
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracing -= 1
+        if _tracing == 0:
+            tracemalloc.stop()
+    return snapshot, peak
+
+
+def _write_allocations(snapshot, path):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    stats = snapshot.statistics("lineno")
+    total = sum(s.size for s in stats)
+    with open(path, "w") as f:
+        f.write(f"Live allocations at end of run: {total / 1024:.1f} KiB in {len(stats)} sites\n\n")
+        f.write(f"{'KiB':>10} {'Blocks':>8}  Site\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            f.write(f"{stat.size / 1024:>10.1f} {stat.count:>8}  {frame.filename}:{frame.lineno}\n")
+
+
+@contextmanager
+def profile(name, run_dir, **meta):
+    """Profile the block with cProfile and tracemalloc, writing <name>.pstats, <name>.alloc.txt
+    and <name>.json into run_dir (or the directory a callable run_dir returns afterwards).
+    Only the calling thread is profiled; allocations are process-wide, so concurrent
+    profiled runs see each other's."""
+    profiler = cProfile.Profile()
+    _start_tracing()
+    started = time.time()
+    t = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        seconds = time.perf_counter() - t
+        snapshot, peak = _stop_tracing()
+        if callable(run_dir):
+            run_dir = run_dir()
+        profiler.dump_stats(os.path.join(run_dir, f"{name}.pstats"))
+        _write_allocations(snapshot, os.path.join(run_dir, f"{name}.alloc.txt"))
+        with open(os.path.join(run_dir, f"{name}.json"), "w") as f:
+            json.dump({"name": name, "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started)),
+                       "seconds": round(seconds, 4), "peak_traced_kb": round(peak / 1024, 1),
+                       "pid": os.getpid(), **meta}, f, indent=1)
+
+
+def phase_profile(name, run_dir):
+    """Pipeline hook: profile a phase when the run has a profile directory"""
+    return profile(name, run_dir) if run_dir else nullcontext()
+
+
+def _requested(ctx):
+    if not QUERY_ONLY:
+        return True
+    values = parse_qs(getattr(ctx, "query_string", "") or "").get("profile", [])
+    return any(v.lower() in ("1", "true", "yes", "on") for v in values)
+
+
+def _install_hooks():
+    # Streamlit has no end-of-rerun callback, so wrap the function its script runner execs each
+    # rerun through. Scripts load this module during their first run, so the very first rerun
+    # after the server starts is not profiled.
+    try:
+        from streamlit.runtime.scriptrunner import script_runner
+    except ImportError:
+        return
+    run_script = script_runner.exec_func_with_error_handling
+    if getattr(run_script, "_pmjdy_profiled", False):
+        return
+
+    def profiled(func, ctx):
+        if not _requested(ctx):
+            return run_script(func, ctx)
+        # The page names itself via setup_page while it runs
+        _local.label = "page"
+        with profile("rerun", lambda: new_run_dir(_local.label), query=getattr(ctx, "query_string", "")):
+            return run_script(func, ctx)
+    profiled._pmjdy_profiled = True
+    script_runner.exec_func_with_error_handling = profiled
+
+
+#
+# Reading profiles back
+#
+def list_runs(out_dir=None):
+    """Profiled runs, newest first: run, path, files, seconds"""
+    out_dir = out_dir or PROFILE_DIR
+    if not os.path.isdir(out_dir):
+        return pd.DataFrame(columns=["Run", "Path", "Profiles", "Seconds"])
+    rows = []
+    for run in sorted(os.listdir(out_dir), reverse=True):
+        path = os.path.join(out_dir, run)
+        if not os.path.isdir(path):
+            continue
+        seconds, count = 0.0, 0
+        for name in os.listdir(path):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(path, name)) as f:
+                        seconds += json.load(f).get("seconds", 0)
+                    count += 1
+                except (OSError, ValueError):
+                    pass
+        rows.append((run, path, count, round(seconds, 3)))
+    return pd.DataFrame(rows, columns=["Run", "Path", "Profiles", "Seconds"])
+
+
+def _in_scope(filename, scopes):
+    path = os.path.abspath(filename)
+    return any(path.startswith(os.path.join(ROOT, s) + os.sep) or path == os.path.join(ROOT, s) for s in scopes)
+
+
+def hot_functions(run_dir, scopes=SCOPES, top=25, sort="cumulative"):
+    """Hottest functions across every .pstats in run_dir, limited to files under the given
+    repo-relative scopes (None for everything). Times in ms."""
+    files = sorted(os.path.join(run_dir, f) for f in os.listdir(run_dir) if f.endswith(".pstats"))
+    if not files:
+        return pd.DataFrame(columns=["Function", "Location", "Calls", "Own ms", "Cumulative ms"])
+    stats = pstats.Stats(*files)
+    rows = []
+    for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items():
+        if (scopes and not _in_scope(filename, scopes)) or os.path.abspath(filename) == os.path.abspath(__file__):
+            continue
+        location = os.path.relpath(filename, ROOT) if filename.startswith(ROOT) else filename
+        rows.append((func, f"{location}:{line}", calls, own * 1000, cumulative * 1000))
+    df = pd.DataFrame(rows, columns=["Function", "Location", "Calls", "Own ms", "Cumulative ms"])
+    column = "Own ms" if sort == "own" else "Cumulative ms"
+    return df.sort_values(column, ascending=False).head(top).round(2).reset_index(drop=True)
+
+
+def top_allocations(run_dir):
+    """{profile name: allocation report text} for a run"""
+    reports = {}
+    for name in sorted(os.listdir(run_dir)):
+        if name.endswith(".alloc.txt"):
+            with open(os.path.join(run_dir, name)) as f:
+                reports[name[:-len(".alloc.txt")]] = f.read()
+    return reports
+
+
+if ENABLED:
+    _install_hooks()
@@ -0,0 +1,236 @@
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from utils.data_loader import REGION_MAP
+from utils.pipeline import digest
+
+RENDER_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports", "dashboards")
+MANIFEST = "manifest.json"
+
+AREA_COLORS = {
+    'Urban': '#1F4E79',
+    'Semi-Urban': '#2E86AB',
+    'Rural': '#E84855'
+}
+
+TIER_COLORS = {
+    'High Priority': '#E84855',
+    'Medium Priority': '#F4A261',
+    'On Track': '#2A9D8F'
+}
+
+# Columns the four panels read - a group is re-rendered only when these change
+PANEL_COLUMNS = ['state', 'district', 'area_type', 'zero_balance_pct', 'avg_balance_inr',
+                 'mgnrega_coverage_pct', 'intervention_tier']
+MAX_BARS = 30
+
+
+def _tidy(ax):
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.set_facecolor('#F8F9FA')
+
+
+def draw_area(ax, df):
+    area_zero = df.groupby('area_type')['zero_balance_pct'].mean()
+    bars = ax.bar(area_zero.index, area_zero.values, color=[AREA_COLORS.get(a, '#888') for a in area_zero.index],
+                  width=0.5, edgecolor='white', linewidth=1.5)
+    ax.set_title('Zero-Balance Rate by Area Type', fontweight='bold', pad=10)
+    ax.set_ylabel('Avg Zero-Balance Accounts (%)')
+    ax.set_ylim(0, 80)
+    for bar, val in zip(bars, area_zero.values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1.5,
+                f'{val:.1f}%', ha='center', fontweight='bold', fontsize=11)
+    _tidy(ax)
+
+
+def draw_mgnrega(ax, df, corr):
+    for area, grp in df.groupby('area_type'):
+        ax.scatter(grp['mgnrega_coverage_pct'], grp['avg_balance_inr'],
+                   color=AREA_COLORS.get(area, '#888'), label=area, s=90, alpha=0.85, edgecolors='white', linewidth=0.8)
+    if df['mgnrega_coverage_pct'].nunique() > 1:
+        p = np.poly1d(np.polyfit(df['mgnrega_coverage_pct'], df['avg_balance_inr'], 1))
+        x_line = np.linspace(df['mgnrega_coverage_pct'].min(), df['mgnrega_coverage_pct'].max(), 100)
+        ax.plot(x_line, p(x_line), 'gray', linestyle='--', linewidth=1.5, alpha=0.7)
+    r = 'n/a' if np.isnan(corr) else f'{corr:.2f}'
+    ax.set_title(f'MGNREGA Coverage vs Avg Account Balance\n(r = {r}  - cash dependency effect)',
+                 fontweight='bold', pad=10)
+    ax.set_xlabel('MGNREGA Coverage (%)')
+    ax.set_ylabel('Avg Balance (INR)')
+    ax.legend(title='Area Type', framealpha=0.9)
+    _tidy(ax)
+
+
+def draw_states(ax, df, by='state'):
+    """Zero-balance bars per state (or per district for a single-state dashboard)"""
+    state_zero = df.groupby(by)['zero_balance_pct'].mean().sort_values()
+    label = 'State' if by == 'state' else 'District'
+    title = f'{label}-wise Zero-Balance Rate\n(Red = High Concern > 40%)'
+    if len(state_zero) > MAX_BARS:
+        state_zero = state_zero.tail(MAX_BARS)
+        title = f'{label}-wise Zero-Balance Rate - worst {MAX_BARS}\n(Red = High Concern > 40%)'
+    bar_clrs = ['#E84855' if v > 40 else '#F4A261' if v > 25 else '#2A9D8F' for v in state_zero.values]
+    bars = ax.barh(state_zero.index, state_zero.values, color=bar_clrs, edgecolor='white', linewidth=1)
+    ax.set_title(title, fontweight='bold', pad=10)
+    ax.set_xlabel('Avg Zero-Balance Accounts (%)')
+    ax.axvline(x=40, color='#E84855', linestyle='--', linewidth=1.2, alpha=0.6, label='40% threshold')
+    ax.legend(fontsize=9)
+    for bar, val in zip(bars, state_zero.values):
+        ax.text(val + 0.5, bar.get_y() + bar.get_height()/2, f'{val:.1f}%', va='center', fontsize=9)
+    _tidy(ax)
+
+
+def draw_tiers(ax, df):
+    tier_counts = df['intervention_tier'].value_counts()
+    wedges, texts, autotexts = ax.pie(
+        tier_counts.values,
+        labels=tier_counts.index,
+        colors=[TIER_COLORS.get(t, '#888') for t in tier_counts.index],
+        autopct='%1.0f%%',
+        startangle=90,
+        pctdistance=0.75,
+        wedgeprops={'edgecolor': 'white', 'linewidth': 2}
+    )
+    for text in texts:
+        text.set_fontweight('bold')
+    for autotext in autotexts:
+        autotext.set_fontweight('bold')
+        autotext.set_color('white')
+    ax.set_title('District Intervention Tiers\n(ML Clustering - 3 Priority Groups)', fontweight='bold', pad=10)
+
+
+PANELS = (_tidy, draw_area, draw_mgnrega, draw_states, draw_tiers)
+
+
+class DashboardTemplate:
+    """The 4-panel dashboard figure, built once and redrawn per group.
+
+    Clearing and redrawing the four axes skips figure and subplot construction (and the
+    font/layout setup that comes with it) for every dashboard after the first.
+    """
+
+    def __init__(self, figsize=(18, 14)):
+        self.fig, axes = plt.subplots(2, 2, figsize=figsize)
+        self.axes = axes.ravel()
+        self.title = self.fig.suptitle('', fontsize=16, fontweight='bold', y=1.03)
+        # tight_layout starts from the current subplot parameters - restore them so a dashboard
+        # does not depend on the group drawn before it
+        pars = self.fig.subplotpars
+        self.subplotpars = {k: getattr(pars, k) for k in ("left", "right", "bottom", "top", "wspace", "hspace")}
+
+    def render(self, df, path, title, dpi=180, bar_by='state'):
+        for ax in self.axes:
+            ax.clear()
+        self.fig.subplots_adjust(**self.subplotpars)
+        self.title.set_text(title)
+        corr = df['mgnrega_coverage_pct'].corr(df['avg_balance_inr']) if len(df) > 2 else np.nan
+        draw_area(self.axes[0], df)
+        draw_mgnrega(self.axes[1], df, corr)
+        draw_states(self.axes[2], df, by=bar_by)
+        draw_tiers(self.axes[3], df)
+        self.fig.tight_layout(pad=4.0)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.png"
+        self.fig.savefig(tmp, dpi=dpi, bbox_inches='tight', facecolor='white')
+        os.replace(tmp, path)
+        return path
+
+    def close(self):
+        plt.close(self.fig)
+
+
+def _slug(name):
+    return name.lower().replace(" ", "_").replace("&", "and")
+
+
+def dashboard_groups(df, by=("state", "region")):
+    """{name: (title, frame, bar_by)} - one dashboard per state (district bars) and per region (state bars)"""
+    groups = {}
+    if "state" in by:
+        for state, grp in df.groupby('state'):
+            groups[f"state_{_slug(state)}"] = (
+                f'{state}\nDistrict-Level Financial Inclusion - {len(grp)} districts', grp, 'district')
+    if "region" in by:
+        regions = df['state'].map(REGION_MAP).fillna('Other')
+        for region, grp in df.groupby(regions):
+            groups[f"region_{_slug(region)}"] = (
+                f'{region} Region\nDistrict-Level Financial Inclusion - {grp["state"].nunique()} states', grp, 'state')
+    return groups
+
+
+def template_hash():
+    """Changes whenever any panel's drawing code does, so every dashboard is re-rendered"""
+    src = "".join(inspect.getsource(f) for f in PANELS + (DashboardTemplate,))
+    return hashlib.sha256(src.encode()).hexdigest()[:16]
+
+
+_template = None
+
+
+def _render_one(task):
+    """Worker: render one dashboard on this process's template"""
+    global _template
+    path, title, df, dpi, bar_by = task
+    if _template is None:
+        _template = DashboardTemplate()
+    t = time.perf_counter()
+    _template.render(df, path, title, dpi, bar_by)
+    return path, time.perf_counter() - t
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_dashboards(df, out_dir=RENDER_DIR, by=("state", "region"), jobs=None, force=False, dpi=180, log=None):
+    """Render every group's dashboard into out_dir as PNGs, in parallel.
+
+    A group whose panel data, title, dpi and drawing code hash the same as in the last run
+    (out_dir/manifest.json), and whose PNG still exists, is skipped.
+    Returns {"rendered", "skipped", "seconds", "paths"}.
+    """
+    start = time.perf_counter()
+    groups = dashboard_groups(df, by)
+    manifest = {} if force else _read_manifest(out_dir)
+    code = template_hash()
+    tasks, hashes, skipped = [], {}, 0
+    for name, (title, grp, bar_by) in groups.items():
+        path = os.path.join(out_dir, f"{name}.png")
+        hashes[name] = digest([code, title, dpi, bar_by, grp[PANEL_COLUMNS].reset_index(drop=True)])
+        if manifest.get(name) == hashes[name] and os.path.exists(path):
+            skipped += 1
+            continue
+        tasks.append((path, title, grp[PANEL_COLUMNS], dpi, bar_by))
+
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks)) if tasks else 0
+    if jobs == 1:
+        results = [_render_one(t) for t in tasks]
+    elif jobs > 1:
+        ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx) as pool:
+            results = list(pool.map(_render_one, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    else:
+        results = []
+    for path, seconds in results:
+        if log:
+            log(f"  {os.path.basename(path):<40} {seconds:.2f}s")
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(hashes, f, indent=1, sort_keys=True)
+    return {"rendered": len(tasks), "skipped": skipped, "seconds": round(time.perf_counter() - start, 3),
+            "paths": {name: os.path.join(out_dir, f"{name}.png") for name in groups}}
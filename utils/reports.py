@@ -0,0 +1,248 @@
+import html
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports")
+REPORT_FORMATS = {"HTML": ("html", "text/html"), "PDF": ("pdf", "application/pdf")}
+COVERAGE_TARGET_PCT = 45
+
+RECOMMENDATIONS = [
+    {
+        "icon": "1",
+        "title": "Shift KPIs from Accounts Opened to Accounts Active",
+        "detail": "The government currently measures success by number of accounts opened. This incentivises superficial compliance. Recommended new KPI: % of accounts with at least 4 transactions per quarter. Tie Business Correspondent (BC) agent compensation to active accounts, not opened accounts.",
+        "impact": "High", "feasibility": "High", "timeline": "6 months"
+    },
+    {
+        "icon": "2",
+        "title": "Mandate 7-Day Balance Float on MGNREGA Wages",
+        "detail": "Require all MGNREGA wage payments to PMJDY accounts to maintain a minimum ₹500 balance for 7 days before full withdrawal is permitted. Pair with micro-interest incentive (even 0.5% extra) for maintaining balance. This builds the habit of keeping money in accounts.",
+        "impact": "High", "feasibility": "Medium", "timeline": "12 months"
+    },
+    {
+        "icon": "3",
+        "title": "Prioritize BC Network in ML-Identified High Priority Districts",
+        "detail": "The ML clustering in this dashboard identifies specific states and districts that are underperforming relative to their population. Use this model to guide Business Correspondent network expansion - place new agents in Needs Attention districts first.",
+        "impact": "High", "feasibility": "High", "timeline": "12-18 months"
+    },
+    {
+        "icon": "4",
+        "title": "Women-Specific Financial Literacy at MGNREGA Worksites",
+        "detail": "Karnataka data shows districts with higher female account shares have lower operative rates - suggesting women have accounts but lack agency to use them. Deploy financial literacy camps specifically targeting women at MGNREGA worksites, Anganwadi centres, and SHG meetings.",
+        "impact": "Medium", "feasibility": "High", "timeline": "6 months"
+    },
+    {
+        "icon": "5",
+        "title": "Interoperable Rural Digital Payment Infrastructure",
+        "detail": "People withdraw cash because there's nowhere rural to spend digitally. Expand UPI QR code acceptance among kirana stores, vegetable vendors and transport in districts with low operative rates. Subsidize POS terminals for rural merchants in High Priority districts.",
+        "impact": "High", "feasibility": "Medium", "timeline": "18-24 months"
+    },
+    {
+        "icon": "6",
+        "title": "State-Specific Strategies - One Policy Can't Fit All",
+        "detail": "There is a large gap between top and bottom performing states. These states need fundamentally different approaches. Southern states need activation strategies. Eastern states need infrastructure. Northeastern states need mobile banking solutions adapted to terrain.",
+        "impact": "High", "feasibility": "Medium", "timeline": "Ongoing"
+    }
+]
+
+_executor = None
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _slug(state):
+    return state.lower().replace(" ", "_").replace("&", "and")
+
+
+def report_path(version, state, fmt, directory=REPORT_DIR):
+    return os.path.join(directory, version, f"pmjdy_brief_{_slug(state)}.{REPORT_FORMATS[fmt][0]}")
+
+
+def brief_context(states_df, state):
+    """Plain-dict view of one state's numbers, so rendering needs no shared frames"""
+    row = states_df[states_df["State"] == state].iloc[0]
+    peers = states_df[states_df["Region"] == row["Region"]].sort_values("Avg_Balance_INR", ascending=False)
+    total_accounts = states_df["Accounts"].sum()
+    return {
+        "state": state,
+        "region": row["Region"],
+        "tier": row.get("Tier", "Unknown"),
+        "accounts": float(row["Accounts"]),
+        "deposit_crore": float(row["Deposit_Crore"]),
+        "avg_balance": float(row["Avg_Balance_INR"]),
+        "per_1000": float(row["Accounts_Per_1000"]),
+        "score": float(row["Performance_Score"]),
+        "accounts_rank": int(row["Accounts_Rank"]),
+        "balance_rank": int(row["Avg_Balance_Rank"]),
+        "coverage_pct": float(row.get("Coverage_Pct", row["Accounts"] / row["Population"] * 100)),
+        "gap_lakh": float(row.get("Gap_Lakh", 0.0)),
+        "n_states": int(len(states_df)),
+        "nat_avg_balance": float(states_df["Deposit_Crore"].sum() * 1e7 / total_accounts) if total_accounts else 0.0,
+        "nat_avg_per_1000": float(states_df["Accounts_Per_1000"].mean()),
+        "peers": [(p["State"], float(p["Avg_Balance_INR"]), float(p["Accounts_Per_1000"])) for _, p in peers.iterrows()],
+    }
+
+
+def _findings(ctx):
+    out = []
+    diff = ctx["avg_balance"] - ctx["nat_avg_balance"]
+    out.append(f"Average balance of Rs.{ctx['avg_balance']:,.0f} is Rs.{abs(diff):,.0f} "
+               f"{'above' if diff >= 0 else 'below'} the national average (Rs.{ctx['nat_avg_balance']:,.0f}), "
+               f"ranking #{ctx['balance_rank']} of {ctx['n_states']}.")
+    if ctx["coverage_pct"] < COVERAGE_TARGET_PCT:
+        out.append(f"Coverage is {ctx['coverage_pct']:.1f}% of population against a {COVERAGE_TARGET_PCT}% target - "
+                   f"roughly {ctx['gap_lakh']:,.1f} lakh more accounts are needed.")
+    else:
+        out.append(f"Coverage of {ctx['coverage_pct']:.1f}% of population meets the {COVERAGE_TARGET_PCT}% target; "
+                   f"the priority is activation, not opening.")
+    out.append(f"K-Means clustering places {ctx['state']} in the '{ctx['tier']}' tier "
+               f"(performance score {ctx['score']:.1f}/100).")
+    return out
+
+
+def render_html(ctx):
+    e = html.escape
+    findings = "".join(f"<li>{e(f)}</li>" for f in _findings(ctx))
+    peers = "".join(
+        f"<tr class='{'sel' if name == ctx['state'] else ''}'><td>{e(name)}</td>"
+        f"<td>Rs.{bal:,.0f}</td><td>{per:,.1f}</td></tr>" for name, bal, per in ctx["peers"])
+    recs = "".join(f"<li><b>{e(r['title'])}</b> - {e(r['detail'])} "
+                   f"<i>(Impact: {r['impact']}, Feasibility: {r['feasibility']}, Timeline: {r['timeline']})</i></li>"
+                   for r in RECOMMENDATIONS)
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>PMJDY Policy Brief - {e(ctx['state'])}</title>
+<style>
+body {{ font-family: Arial, sans-serif; color: #1E293B; max-width: 860px; margin: 30px auto; line-height: 1.6; }}
+h1 {{ background: #0D2B5E; color: white; padding: 16px 20px; border-radius: 8px; font-size: 22px; }}
+h2 {{ color: #0D2B5E; border-bottom: 2px solid #2563B0; padding-bottom: 4px; font-size: 17px; }}
+table {{ border-collapse: collapse; width: 100%; font-size: 14px; }}
+td, th {{ border: 1px solid #DDD; padding: 6px 10px; text-align: left; }}
+tr.sel {{ background: #FFF3CD; font-weight: bold; }}
+.kpi td:first-child {{ width: 45%; color: #555; }}
+small {{ color: #777; }}
+</style></head><body>
+<h1>PMJDY Policy Brief - {e(ctx['state'])}</h1>
+<p><small>Generated {datetime.now().strftime('%d %B %Y')} &middot; Region: {e(ctx['region'])} &middot;
+Data: Ministry of Finance, GoI (Rajya Sabha Questions, 2022-2024)</small></p>
+<h2>Scorecard</h2>
+<table class="kpi">
+<tr><td>Total PMJDY accounts</td><td>{ctx['accounts']/1e5:,.1f} lakh (rank #{ctx['accounts_rank']} of {ctx['n_states']})</td></tr>
+<tr><td>Total deposits</td><td>Rs.{ctx['deposit_crore']:,.0f} crore</td></tr>
+<tr><td>Average balance per account</td><td>Rs.{ctx['avg_balance']:,.0f} (national Rs.{ctx['nat_avg_balance']:,.0f})</td></tr>
+<tr><td>Accounts per 1,000 population</td><td>{ctx['per_1000']:,.1f} (national mean {ctx['nat_avg_per_1000']:,.1f})</td></tr>
+<tr><td>Performance tier</td><td>{e(str(ctx['tier']))}</td></tr>
+</table>
+<h2>Key Findings</h2><ul>{findings}</ul>
+<h2>{e(ctx['region'])} Region Peers</h2>
+<table><tr><th>State</th><th>Avg Balance</th><th>Accounts / 1000</th></tr>{peers}</table>
+<h2>Recommendations</h2><ol>{recs}</ol>
+<p><small>Independent research project. Not affiliated with GoI.</small></p>
+</body></html>
+"""
+
+
+def render_pdf(ctx, path):
+    # Figure API rather than pyplot - pyplot's global state is not safe to share between worker threads
+    from matplotlib.figure import Figure
+    import textwrap
+
+    fig = Figure(figsize=(8.27, 11.69))
+    fig.text(0.06, 0.95, f"PMJDY Policy Brief - {ctx['state']}", fontsize=18, fontweight="bold", color="#0D2B5E")
+    fig.text(0.06, 0.925, f"Region: {ctx['region']}  |  Tier: {ctx['tier']}  |  Generated {datetime.now().strftime('%d %B %Y')}",
+             fontsize=9, color="#555555")
+    lines = [
+        f"Total accounts: {ctx['accounts']/1e5:,.1f} lakh (rank #{ctx['accounts_rank']} of {ctx['n_states']})",
+        f"Total deposits: Rs.{ctx['deposit_crore']:,.0f} crore",
+        f"Average balance: Rs.{ctx['avg_balance']:,.0f} (national Rs.{ctx['nat_avg_balance']:,.0f})",
+        f"Accounts per 1,000 population: {ctx['per_1000']:,.1f}",
+        "",
+        "Key findings:",
+    ] + [l for f in _findings(ctx) for l in textwrap.wrap(f, 84, initial_indent="  - ", subsequent_indent="    ")]
+    fig.text(0.06, 0.9, "\n".join(lines), fontsize=9.5, va="top", family="monospace")
+
+    ax = fig.add_axes([0.3, 0.42, 0.62, 0.2])
+    names = [p[0] for p in ctx["peers"]][::-1]
+    vals = [p[1] for p in ctx["peers"]][::-1]
+    ax.barh(names, vals, color=["#E74C3C" if n == ctx["state"] else "#AED6F1" for n in names])
+    ax.axvline(ctx["nat_avg_balance"], color="#1F4E79", linestyle="--", linewidth=1)
+    ax.set_title(f"Avg balance - {ctx['region']} region peers (dashed = national)", fontsize=10)
+    ax.tick_params(labelsize=8)
+    for side in ("top", "right"):
+        ax.spines[side].set_visible(False)
+
+    recs = []
+    for r in RECOMMENDATIONS:
+        recs.extend(textwrap.wrap(f"{r['icon']}. {r['title']} (Impact: {r['impact']}, Timeline: {r['timeline']})", 100,
+                                  subsequent_indent="    "))
+    fig.text(0.06, 0.36, "Recommendations:\n" + "\n".join(recs), fontsize=9, va="top")
+    fig.text(0.06, 0.03, "Data: Ministry of Finance, GoI. Independent research project, not affiliated with GoI.",
+             fontsize=7, color="#777777")
+    fig.savefig(path, format="pdf")
+
+
+def render_brief(ctx, fmt, path):
+    """Render one brief to disk atomically - runs on a worker thread"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    if fmt == "HTML":
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(render_html(ctx))
+    else:
+        render_pdf(ctx, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="brief")
+        return _executor
+
+
+def submit_brief(states_df, version, state, fmt):
+    """Queue a brief unless it is already on disk or in flight; returns its status"""
+    path = report_path(version, state, fmt)
+    key = (version, state, fmt)
+    executor = _get_executor()  # before taking _lock, which _get_executor also takes
+    # Check, submit and record under one lock so concurrent sessions can't queue the same brief twice
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and not job.done():
+            return "pending"
+        if os.path.exists(path):
+            return "ready"
+        _jobs[key] = executor.submit(render_brief, brief_context(states_df, state), fmt, path)
+    return "pending"
+
+
+def submit_all(states_df, version, fmt):
+    return [submit_brief(states_df, version, s, fmt) for s in sorted(states_df["State"])]
+
+
+def pending_briefs(version, fmt):
+    """Number of briefs of this data version and format still rendering - no file checks"""
+    with _lock:
+        return sum(1 for (v, _, f), job in _jobs.items() if v == version and f == fmt and not job.done())
+
+
+def brief_status(version, state, fmt):
+    """'ready', 'pending', 'failed' or 'missing'"""
+    with _lock:
+        job = _jobs.get((version, state, fmt))
+    if job is not None and not job.done():
+        return "pending"
+    if os.path.exists(report_path(version, state, fmt)):
+        return "ready"
+    if job is not None and job.exception() is not None:
+        return "failed"
+    return "missing"
+
+
+def read_brief(version, state, fmt):
+    with open(report_path(version, state, fmt), "rb") as f:
+        return f.read()
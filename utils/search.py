@@ -0,0 +1,195 @@
+import re
+import time
+from collections import defaultdict
+
+import streamlit as st
+
+STATE_PAGE = "pages/2_State_Analysis.py"
+DISTRICT_PAGE = "pages/3_District_View.py"
+
+# Spellings that refer to the same place; (state, names) for districts, (None, names) for states.
+# Whichever spelling the data uses becomes the entity name, the others are searchable aliases.
+ALIAS_GROUPS = [
+    (None, ["Odisha", "Orissa"]),
+    (None, ["Puducherry", "Pondicherry"]),
+    (None, ["Uttarakhand", "Uttaranchal"]),
+    (None, ["Jammu and Kashmir", "J&K", "Jammu & Kashmir"]),
+    (None, ["Delhi", "NCT of Delhi", "New Delhi"]),
+    (None, ["Andaman and Nicobar Islands", "Andaman & Nicobar"]),
+    (None, ["Dadra and Nagar Haveli and Daman and Diu", "Daman and Diu", "Dadra and Nagar Haveli"]),
+    ("Karnataka", ["Bangalore", "Bengaluru", "Bangalore Urban", "Bengaluru Urban"]),
+    ("Karnataka", ["Bangalore Rural", "Bengaluru Rural"]),
+    ("Karnataka", ["Belgaum", "Belagavi"]),
+    ("Karnataka", ["Bellary", "Ballari"]),
+    ("Karnataka", ["Bijapur", "Vijayapura"]),
+    ("Karnataka", ["Bagalkot", "Bagalkote"]),
+    ("Karnataka", ["Chikmagalur", "Chikkamagaluru"]),
+    ("Karnataka", ["Gulbarga", "Kalaburagi"]),
+    ("Karnataka", ["Mysore", "Mysuru"]),
+    ("Karnataka", ["Shimoga", "Shivamogga"]),
+    ("Karnataka", ["Tumkur", "Tumakuru"]),
+    ("Karnataka", ["Chamarajanagar", "Chamarajanagara"]),
+    ("Karnataka", ["Davanagere", "Davangere"]),
+    ("Maharashtra", ["Mumbai", "Bombay", "Mumbai City"]),
+    ("Maharashtra", ["Pune", "Poona"]),
+    ("Maharashtra", ["Aurangabad", "Chhatrapati Sambhajinagar"]),
+    ("Maharashtra", ["Osmanabad", "Dharashiv"]),
+    ("Maharashtra", ["Ahmednagar", "Ahilyanagar"]),
+    ("Maharashtra", ["Beed", "Bid"]),
+    ("Maharashtra", ["Gondia", "Gondiya"]),
+    ("Bihar", ["Pashchim Champaran", "West Champaran"]),
+    ("Bihar", ["Purba Champaran", "East Champaran"]),
+    ("Bihar", ["Purnia", "Purnea"]),
+    ("Bihar", ["Munger", "Monghyr"]),
+    ("Bihar", ["Kaimur (Bhabua)", "Kaimur", "Bhabua"]),
+    ("Uttar Pradesh", ["Prayagraj", "Allahabad"]),
+    ("Uttar Pradesh", ["Ayodhya", "Faizabad"]),
+    ("Haryana", ["Gurugram", "Gurgaon"]),
+]
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Prefix trie + trigram index over state and district names and their aliases.
+
+    Built once per data release (it ships inside the snapshot); a query touches only the
+    trie path of its prefix and the postings of its trigrams.
+    """
+
+    def __init__(self):
+        self.entities = []
+        self.keys = []        # (entity id, normalized text, is alias)
+        self.trie = {}
+        self.grams = defaultdict(set)
+
+    def _add_key(self, eid, text, alias):
+        kid = len(self.keys)
+        self.keys.append((eid, text, alias))
+        # Index every word-suffix so "rural" and "bangalore ru" both walk to "Bangalore Rural"
+        words = text.split(" ")
+        for i in range(len(words)):
+            node = self.trie
+            for ch in " ".join(words[i:]):
+                node = node.setdefault(ch, {})
+                node.setdefault("$", set()).add(kid)
+        for g in trigrams(text):
+            self.grams[g].add(kid)
+
+    def add(self, name, kind, state=None, aliases=()):
+        eid = len(self.entities)
+        self.entities.append({"name": name, "kind": kind, "state": state,
+                              "page": STATE_PAGE if kind == "state" else DISTRICT_PAGE})
+        self._add_key(eid, normalize(name), False)
+        for alias in aliases:
+            self._add_key(eid, normalize(alias), True)
+
+    def _score(self, q, text):
+        if text == q:
+            return 1.0
+        if text.startswith(q):
+            return 0.9 + 0.05 * len(q) / len(text)
+        if f" {q}" in f" {text}":
+            return 0.8 + 0.05 * len(q) / len(text)
+        if q in text:
+            return 0.6
+        tq, tt = trigrams(q), trigrams(text)
+        return 0.7 * 2 * len(tq & tt) / (len(tq) + len(tt))
+
+    def search(self, query, limit=8, kinds=None, state=None, min_score=0.3):
+        """Ranked matches: exact > prefix > word prefix > substring > fuzzy (trigram similarity)"""
+        q = normalize(query)
+        if not q:
+            return []
+        candidates = set()
+        node = self.trie
+        for ch in q:
+            node = node.get(ch)
+            if node is None:
+                break
+        else:
+            candidates |= node["$"]
+        for g in trigrams(q):
+            candidates |= self.grams.get(g, set())
+
+        best = {}
+        for kid in candidates:
+            eid, text, alias = self.keys[kid]
+            score = self._score(q, text) * (0.98 if alias else 1.0)
+            if score >= min_score and score > best.get(eid, (0, None))[0]:
+                best[eid] = (score, text if alias else None)
+        results = []
+        for eid, (score, alias) in best.items():
+            entity = self.entities[eid]
+            if (kinds and entity["kind"] not in kinds) or (state and entity["state"] != state):
+                continue
+            results.append({**entity, "score": round(score, 4), "alias": alias})
+        results.sort(key=lambda r: (-r["score"], r["kind"] != "state", len(r["name"]), r["name"]))
+        return results[:limit]
+
+
+def _aliases(name, state=None):
+    key = normalize(name)
+    for group_state, names in ALIAS_GROUPS:
+        if group_state == state and key in {normalize(n) for n in names}:
+            return [n for n in names if normalize(n) != key]
+    return []
+
+
+def build_search_index(states, districts):
+    """states: iterable of state names; districts: {state: [district names]}"""
+    index = SearchIndex()
+    for state in sorted(states):
+        index.add(state, "state", aliases=_aliases(state))
+    for state, names in sorted(districts.items()):
+        for name in sorted(names):
+            index.add(name, "district", state, aliases=_aliases(name, state))
+    return index
+
+
+def get_search_index():
+    from utils.snapshot import get_snapshot
+    return get_snapshot()["search"]
+
+
+def matching_names(query, kind, state=None, min_score=0.5):
+    """Names a page filter should keep - prefix, word, substring, alias and close fuzzy matches"""
+    results = get_search_index().search(query, limit=None, kinds=(kind,), state=state, min_score=min_score)
+    return {r["name"] for r in results}
+
+
+def jump_to(result):
+    """Open the page for a search result with that state or district preselected"""
+    if result["kind"] == "state":
+        st.session_state["state_analysis_search"] = ""
+        st.session_state["state_analysis_state"] = result["name"]
+    else:
+        st.session_state["district_state"] = result["state"]
+        st.session_state["district_search"] = result["name"]
+    st.switch_page(result["page"])
+
+
+def search_box(key="global_search", limit=6):
+    """Sidebar search over every state and district - click a result to jump to it"""
+    query = st.text_input(" Search states & districts", key=key, placeholder="e.g. Bengaluru, Patna, Orissa")
+    if not query:
+        return
+    t = time.perf_counter()
+    results = get_search_index().search(query, limit=limit)
+    ms = (time.perf_counter() - t) * 1000
+    if not results:
+        st.caption("No matching state or district.")
+        return
+    for i, r in enumerate(results):
+        where = "State" if r["kind"] == "state" else f"District, {r['state']}"
+        label = f"{r['name']} - {where}" + (f" (as '{r['alias'].title()}')" if r["alias"] else "")
+        if st.button(label, key=f"{key}_{i}", use_container_width=True):
+            jump_to(r)
+    st.caption(f"{len(results)} matches in {ms:.2f} ms")
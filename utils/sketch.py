@@ -0,0 +1,251 @@
+import math
+import os
+import pickle
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import REGION_MAP
+from utils.instrument import cache_call, cache_miss, timed
+
+SKETCH_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sketches")
+SKETCH_FILE = "balance_sketches.pkl"
+SKETCH_FORMAT = 1
+RELATIVE_ACCURACY = 0.01
+
+# Same slabs as data/balance_distribution.csv, as [low, high) in rupees
+BALANCE_SLABS = [
+    ("Less than Rs. 1000", 0, 1000),
+    ("Between Rs. 1000 - 4999", 1000, 5000),
+    ("Between Rs. 5000 - 9999", 5000, 10000),
+    ("Between Rs. 10000 - 20000", 10000, 20001),
+    ("More than Rs. 20000", 20001, math.inf),
+]
+
+
+class BalanceSketch:
+    """Mergeable streaming quantile sketch of account balances.
+
+    Log-spaced buckets (DDSketch): every quantile is within RELATIVE_ACCURACY of the true
+    balance, whatever the skew, and two sketches merge exactly by adding bucket counts.
+    Zero balances - a large share of PMJDY accounts - are counted separately.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _grow(self, lo, hi):
+        if not len(self.counts):
+            self.offset = lo
+            self.counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            return
+        new_lo, new_hi = min(lo, self.offset), max(hi, self.offset + len(self.counts) - 1)
+        if new_lo == self.offset and new_hi == self.offset + len(self.counts) - 1:
+            return
+        counts = np.zeros(new_hi - new_lo + 1, dtype=np.int64)
+        counts[self.offset - new_lo:self.offset - new_lo + len(self.counts)] = self.counts
+        self.offset, self.counts = new_lo, counts
+
+    def add(self, values):
+        """Add an array of balances. Negative balances fall in the zero bucket for quantiles and
+        histograms but count at face value in total, min and max - the same sums aggregate.py makes"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        if len(positive):
+            idx = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            lo, hi = int(idx.min()), int(idx.max())
+            self._grow(lo, hi)
+            self.counts += np.bincount(idx - self.offset, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one; exact as long as both share relative_accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if len(other.counts):
+            self._grow(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            self.counts[start:start + len(other.counts)] += other.counts
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, sketches, relative_accuracy=RELATIVE_ACCURACY):
+        out = cls(relative_accuracy)
+        for s in sketches:
+            out.merge(s)
+        return out
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def bucket_values(self):
+        """Representative balance and account count of every non-empty bucket, zeros first"""
+        nz = np.flatnonzero(self.counts)
+        values = 2 * self.gamma ** (nz + self.offset) / (self.gamma + 1)
+        return np.concatenate([[0.0], values]), np.concatenate([[self.zero_count], self.counts[nz]])
+
+    def quantiles(self, qs):
+        if not self.count:
+            return np.full(len(qs), np.nan)
+        values, counts = self.bucket_values()
+        cum = np.cumsum(counts)
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        out = values[np.searchsorted(cum, ranks, side="right")]
+        return np.clip(out, self.min, self.max)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def histogram(self, edges):
+        """Approximate account counts between consecutive edges"""
+        values, counts = self.bucket_values()
+        return np.histogram(values, bins=edges, weights=counts)[0].astype(np.int64)
+
+    def to_state(self):
+        return {"relative_accuracy": self.relative_accuracy, "offset": self.offset, "counts": self.counts,
+                "zero_count": self.zero_count, "count": self.count, "total": self.total,
+                "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_state(cls, state):
+        s = cls(state["relative_accuracy"])
+        s.offset, s.counts = state["offset"], state["counts"]
+        s.zero_count, s.count, s.total = state["zero_count"], state["count"], state["total"]
+        s.min, s.max = state["min"], state["max"]
+        return s
+
+
+def _iter_chunks(path, columns, chunksize):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+@timed()
+def sketch_accounts(paths, state_col="State", district_col="District", balance_col="Balance",
+                    chunksize=1_000_000, relative_accuracy=RELATIVE_ACCURACY):
+    """Stream account-level exports (CSV or Parquet) into one sketch per (state, district)"""
+    sketches = {}
+    rows = 0
+    for path in paths:
+        for chunk in _iter_chunks(path, [state_col, district_col, balance_col], chunksize):
+            rows += len(chunk)
+            for key, balances in chunk.groupby([state_col, district_col], sort=False)[balance_col]:
+                key = (str(key[0]).strip(), str(key[1]).strip())
+                if key not in sketches:
+                    sketches[key] = BalanceSketch(relative_accuracy)
+                sketches[key].add(balances.to_numpy())
+    return sketches, rows
+
+
+def write_sketches(sketches, sources=(), directory=SKETCH_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, SKETCH_FILE)
+    payload = {
+        "format": SKETCH_FORMAT,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "sources": [os.path.basename(p) for p in sources],
+        "relative_accuracy": next(iter(sketches.values())).relative_accuracy if sketches else RELATIVE_ACCURACY,
+        "districts": {key: s.to_state() for key, s in sketches.items()},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+class SketchStore:
+    """District sketches with state, region and national roll-ups merged on load"""
+
+    def __init__(self, payload):
+        self.built_at = payload["built_at"]
+        self.sources = payload["sources"]
+        self.districts = {key: BalanceSketch.from_state(s) for key, s in payload["districts"].items()}
+        # The accuracy build_sketches.py --accuracy used; stores written before it was recorded
+        # carry it on every district sketch
+        first = next(iter(payload["districts"].values()), {})
+        self.relative_accuracy = payload.get("relative_accuracy", first.get("relative_accuracy", RELATIVE_ACCURACY))
+        by_state = {}
+        for (state, _), s in self.districts.items():
+            by_state.setdefault(state, []).append(s)
+        self.states = {state: BalanceSketch.merged(group, self.relative_accuracy) for state, group in by_state.items()}
+        self.national = BalanceSketch.merged(self.states.values(), self.relative_accuracy)
+
+    def region_of(self, state):
+        return REGION_MAP.get(state, "Other")
+
+    def regions(self):
+        return sorted({self.region_of(s) for s in self.states})
+
+    def districts_of(self, state):
+        return sorted(d for s, d in self.districts if s == state)
+
+    def combine(self, regions=None, states=None, districts=None):
+        """Merged sketch for a filter; returns (sketch, number of sketches merged, milliseconds)"""
+        t = time.perf_counter()
+        if districts:
+            parts = [self.districts[k] for k in districts if k in self.districts]
+        elif states:
+            parts = [self.states[s] for s in states if s in self.states]
+        elif regions:
+            parts = [s for state, s in self.states.items() if self.region_of(state) in regions]
+        else:
+            parts = [self.national]
+        merged = BalanceSketch.merged(parts, self.relative_accuracy)
+        return merged, len(parts), (time.perf_counter() - t) * 1000
+
+
+def load_sketch_store(directory=SKETCH_DIR):
+    path = os.path.join(directory, SKETCH_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        payload = pickle.load(f)
+    if payload.get("format") != SKETCH_FORMAT:
+        return None
+    return SketchStore(payload)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_sketch_store(mtime):
+    cache_miss("sketches")
+    return load_sketch_store()
+
+
+def get_sketch_store():
+    """Process-wide sketch store, reloaded when build_sketches.py rewrites the file; None if never built"""
+    cache_call("sketches")
+    path = os.path.join(SKETCH_DIR, SKETCH_FILE)
+    if not os.path.exists(path):
+        return None
+    return _get_sketch_store(os.stat(path).st_mtime_ns)
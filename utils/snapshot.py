@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from utils.data_loader import (
+    data_version, load_state_data, load_bihar_districts, load_karnataka_districts,
+    load_maharashtra_districts, load_balance_distribution,
+)
+from utils.compare import STATE_METRICS, build_similarity
+from utils.districts import district_names
+from utils.instrument import cache_call, cache_miss, timed
+from utils.search import build_search_index
+from utils.ml_models import cluster_states, predict_underperformers, growth_predictor, detect_anomalies
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "snapshots")
+SNAPSHOT_FORMAT = 3
+
+def snapshot_path(version=None, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, f"pmjdy_{version or data_version()}.pkl")
+
+
+def _cluster_params(model):
+    # Plain numpy parameters rather than pickled sklearn objects, so booting never imports sklearn
+    return {
+        "features": ["Accounts_Per_1000", "Avg_Balance_INR", "Performance_Score"],
+        "scaler_mean": model["scaler"].mean_.copy(),
+        "scaler_scale": model["scaler"].scale_.copy(),
+        "centers": model["kmeans"].cluster_centers_.copy(),
+        "inertia": float(model["kmeans"].inertia_),
+        "labels": {int(k): v for k, v in model["labels"].items()},
+    }
+
+
+@timed()
+def build_snapshot():
+    """Run every loader and model once and bundle frames, fitted models and headline metrics"""
+    timings = {}
+
+    def timed(name, fn, *args, **kwargs):
+        t = time.perf_counter()
+        out = fn(*args, **kwargs)
+        timings[name] = round(time.perf_counter() - t, 4)
+        return out
+
+    states = timed("load_state_data", load_state_data)
+    bihar = timed("load_bihar_districts", load_bihar_districts)
+    karnataka = timed("load_karnataka_districts", load_karnataka_districts)
+    maharashtra = timed("load_maharashtra_districts", load_maharashtra_districts)
+    balance = timed("load_balance_distribution", load_balance_distribution)
+
+    states_ml, cluster_model = timed("cluster_states", cluster_states, states, return_model=True)
+    states_ml = timed("predict_underperformers", predict_underperformers, states_ml)
+    growth = timed("growth_predictor", growth_predictor, maharashtra)
+    anomalies = {
+        "bihar": timed("detect_anomalies.bihar", detect_anomalies, bihar, "Accounts", "Balance_Crore"),
+        "karnataka": timed("detect_anomalies.karnataka", detect_anomalies, karnataka, "Total_Accounts"),
+        "state_accounts": timed("detect_anomalies.state_accounts", detect_anomalies, states_ml.reset_index(drop=True), "Accounts"),
+        "state_balance": timed("detect_anomalies.state_balance", detect_anomalies, states_ml.reset_index(drop=True), "Avg_Balance_INR"),
+    }
+
+    similarity = {"states": timed("build_similarity.states", build_similarity, states, "State", list(STATE_METRICS))}
+    search = timed("build_search_index", lambda: build_search_index(states["State"], district_names()))
+
+    total_accounts = float(states["Accounts"].sum())
+    total_deposit = float(states["Deposit_Crore"].sum())
+    metrics = {
+        "states": int(len(states)),
+        "districts": int(len(bihar) + len(karnataka) + len(maharashtra)),
+        "total_accounts": total_accounts,
+        "total_deposit_crore": total_deposit,
+        "avg_balance_inr": round(total_deposit * 1e7 / total_accounts, 2) if total_accounts else 0.0,
+        "tier_counts": states_ml["Tier"].value_counts().to_dict(),
+        "underperforming_states": int(states_ml["Underperforming"].sum()),
+        "state_anomalies": int(anomalies["state_accounts"]["Anomaly"].sum()),
+    }
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "data_version": data_version(),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "frames": {
+            "states": states,
+            "states_ml": states_ml,
+            "bihar": bihar,
+            "karnataka": karnataka,
+            "maharashtra": maharashtra,
+            "balance": balance,
+            "growth": growth,
+        },
+        "anomalies": anomalies,
+        "models": {"state_clusters": _cluster_params(cluster_model)},
+        "similarity": similarity,
+        "search": search,
+        "metrics": metrics,
+        "timings": timings,
+    }
+
+
+def write_snapshot(snap, directory=SNAPSHOT_DIR):
+    """Pickle the snapshot and write a JSON manifest next to it for auditing"""
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(snap["data_version"], directory)
+    payload = pickle.dumps(snap, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    manifest = {
+        "format": snap["format"],
+        "data_version": snap["data_version"],
+        "built_at": snap["built_at"],
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "bytes": len(payload),
+        "frames": {name: list(frame.shape) for name, frame in snap["frames"].items()},
+        "metrics": snap["metrics"],
+        "timings": snap["timings"],
+    }
+    with open(path[:-4] + ".json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return path
+
+
+@timed()
+def load_snapshot(version=None, directory=SNAPSHOT_DIR):
+    """Snapshot for the given (default: current) data version, or None if it hasn't been built"""
+    path = snapshot_path(version, directory)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        snap = pickle.load(f)
+    if snap.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return snap
+
+
+@st.cache_resource(show_spinner=False)
+def _get_snapshot(version):
+    cache_miss("snapshot")
+    snap = load_snapshot(version)
+    if snap is None:
+        # No prebuilt artifact for this data release - compute in-process so the app still works
+        snap = build_snapshot()
+    return snap
+
+
+def get_snapshot():
+    """Snapshot for the current data release, loaded once per process"""
+    cache_call("snapshot")
+    return _get_snapshot(data_version())
+
+
+def get_frames(*names, group="frames"):
+    """Views of snapshot frames shared by every session - one copy in memory per process.
+
+    Each call returns shallow copies that share the cached column buffers. Under copy-on-write
+    any column a caller modifies is copied first, so no session can change another's data.
+    """
+    snap = get_snapshot()
+    frames = tuple(snap[group][name].copy(deep=False) for name in names)
+    return frames[0] if len(frames) == 1 else frames
@@ -0,0 +1,212 @@
+import pandas as pd
+from sqlalchemy import text
+
+from utils.data_loader import REGION_MAP
+from utils.db import _batches, _quote, get_engine, read_engine
+
+# Summary tables kept inside the database: name -> group keys. summary_cell is the finest grain
+# (every filter the dashboard offers) and the others are its one-dimensional roll-ups.
+SUMMARIES = {
+    "summary_state": ["state"],
+    "summary_area_type": ["area_type"],
+    "summary_tier": ["intervention_tier"],
+    "summary_region": ["region"],
+    "summary_cell": ["state", "region", "area_type", "intervention_tier"],
+}
+KINDS = {"state": "summary_state", "area_type": "summary_area_type", "tier": "summary_tier",
+         "region": "summary_region", "cell": "summary_cell"}
+
+# Stored measures are plain sums and counts - a delta of districts adds (or subtracts) exactly,
+# so appending a partition never has to re-read the fact table. Means are taken on read.
+MEASURES = {
+    "districts": "COUNT(*)",
+    "accounts_lakh": "TOTAL(total_accounts_lakh)",
+    "zero_balance_sum": "TOTAL(zero_balance_pct)",
+    "balance_sum": "TOTAL(avg_balance_inr)",
+    "outlets_sum": "TOTAL(banking_outlets_per_1000)",
+    "outlets_n": "COUNT(banking_outlets_per_1000)",
+    "mgnrega_sum": "TOTAL(mgnrega_coverage_pct)",
+    "mgnrega_n": "COUNT(mgnrega_coverage_pct)",
+}
+UNASSIGNED = "Unassigned"
+
+# One row per district with every summary key resolved; {source} is pmjdy_accounts or a staged delta
+FACTS = f"""
+    SELECT p.district_id, p.state, COALESCE(r.region, 'Other') AS region, p.area_type,
+           COALESCE(t.intervention_tier, '{UNASSIGNED}') AS intervention_tier,
+           p.total_accounts_lakh, p.zero_balance_pct, p.avg_balance_inr,
+           i.banking_outlets_per_1000, i.mgnrega_coverage_pct
+    FROM {{source}} p
+    LEFT JOIN infrastructure i ON i.district_id = p.district_id
+    LEFT JOIN state_regions r ON r.state = p.state
+    LEFT JOIN district_tiers t ON t.district_id = p.district_id
+    {{where}}
+"""
+PMJDY_COLUMNS = ["district_id", "district", "state", "area_type", "total_accounts_lakh", "zero_balance_pct", "avg_balance_inr"]
+
+
+def _create(conn):
+    # Account-only stores (build_aggregates.py) have no infrastructure yet; the join just finds nothing
+    conn.execute("CREATE TABLE IF NOT EXISTS infrastructure (district_id INTEGER, mgnrega_coverage_pct REAL, "
+                 "banking_outlets_per_1000 REAL, bc_agents_per_1000 REAL, mobile_banking_pct REAL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS state_regions (state TEXT PRIMARY KEY, region TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS district_tiers (district_id INTEGER PRIMARY KEY, intervention_tier TEXT)")
+    conn.executemany("INSERT OR REPLACE INTO state_regions VALUES (?, ?)", sorted(REGION_MAP.items()))
+    for table, keys in SUMMARIES.items():
+        columns = [f"{k} TEXT NOT NULL" for k in keys] + [f"{m} {'INTEGER' if m == 'districts' or m.endswith('_n') else 'REAL'}"
+                                                          for m in MEASURES]
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)}, PRIMARY KEY ({', '.join(keys)}))")
+
+
+def _apply(conn, source, sign, where="", params=(), tables=None):
+    """Add sign * (group sums of the district facts in source) to each summary table"""
+    facts = FACTS.format(source=source, where=where)
+    for table in tables or SUMMARIES:
+        keys = ", ".join(SUMMARIES[table])
+        measures = ", ".join(f"{sign} * {expr}" for expr in MEASURES.values())
+        # "WHERE true" keeps SQLite from reading ON CONFLICT as part of the SELECT
+        conn.execute(f"INSERT INTO {table} ({keys}, {', '.join(MEASURES)}) "
+                     f"SELECT {keys}, {measures} FROM ({facts}) WHERE true GROUP BY {keys} "
+                     f"ON CONFLICT ({keys}) DO UPDATE SET " + ", ".join(f"{m} = {m} + excluded.{m}" for m in MEASURES),
+                     params)
+        conn.execute(f"DELETE FROM {table} WHERE districts <= 0")
+
+
+def _transaction(engine, work):
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+    finally:
+        raw.driver_connection.isolation_level = ""
+        raw.close()
+
+
+def ensure_summaries(engine=None):
+    """Create the summary tables (empty) and the region/tier lookups they group by"""
+    _transaction(engine or get_engine(), _create)
+
+
+def rebuild_summaries(engine=None):
+    """Recompute every summary from pmjdy_accounts - after a replace load, or to reset float drift"""
+    def work(conn):
+        _create(conn)
+        for table in SUMMARIES:
+            conn.execute(f"DELETE FROM {table}")
+        _apply(conn, "pmjdy_accounts", 1)
+    _transaction(engine or get_engine(), work)
+
+
+def append_districts(df, engine=None, mode="append"):
+    """Write a partition of districts into pmjdy_accounts and fold it into the summaries.
+
+    mode "append" adds the rows; "upsert" first takes any existing rows with the same
+    district_id out of the summaries and the table. The work is proportional to the
+    partition, not the fact table, and runs in one transaction.
+    Returns the number of districts written.
+    """
+    if mode not in ("append", "upsert"):
+        raise ValueError("mode must be append or upsert")
+    df = df[PMJDY_COLUMNS]
+    cols = ", ".join(_quote(c) for c in PMJDY_COLUMNS)
+
+    def work(conn):
+        _create(conn)
+        conn.execute("CREATE TABLE IF NOT EXISTS pmjdy_accounts (district_id INTEGER, district TEXT, state TEXT, area_type TEXT, "
+                     "total_accounts_lakh REAL, zero_balance_pct REAL, avg_balance_inr REAL)")
+        conn.execute("DROP TABLE IF EXISTS temp._delta_districts")
+        conn.execute(f"CREATE TEMP TABLE _delta_districts AS SELECT {cols} FROM pmjdy_accounts WHERE 0")
+        for rows in _batches(df, 100_000):
+            conn.executemany(f"INSERT INTO temp._delta_districts VALUES ({', '.join('?' * len(PMJDY_COLUMNS))})", rows)
+        if mode == "upsert":
+            replaced = "WHERE p.district_id IN (SELECT district_id FROM temp._delta_districts)"
+            _apply(conn, "pmjdy_accounts", -1, where=replaced)
+            conn.execute("DELETE FROM pmjdy_accounts WHERE district_id IN (SELECT district_id FROM temp._delta_districts)")
+        conn.execute(f"INSERT INTO pmjdy_accounts ({cols}) SELECT {cols} FROM temp._delta_districts")
+        _apply(conn, "temp._delta_districts", 1)
+        conn.execute("DROP TABLE temp._delta_districts")
+        return len(df)
+    return _transaction(engine or get_engine(), work)
+
+
+def assign_tiers(tiers, engine=None):
+    """Record each district's intervention tier ({district_id: tier} or a Series) and move the
+    districts whose tier changed between the tier-keyed summary rows"""
+    tiers = pd.Series(tiers)
+    tier_tables = [t for t, keys in SUMMARIES.items() if "intervention_tier" in keys]
+
+    def work(conn):
+        _create(conn)
+        current = dict(conn.execute("SELECT district_id, intervention_tier FROM district_tiers"))
+        changed = [(int(d), str(t)) for d, t in tiers.items() if current.get(int(d)) != t]
+        if not changed:
+            return 0
+        conn.execute("DROP TABLE IF EXISTS temp._tier_changes")
+        conn.execute("CREATE TEMP TABLE _tier_changes (district_id INTEGER PRIMARY KEY)")
+        conn.executemany("INSERT INTO temp._tier_changes VALUES (?)", [(d,) for d, _ in changed])
+        moved = "WHERE p.district_id IN (SELECT district_id FROM temp._tier_changes)"
+        _apply(conn, "pmjdy_accounts", -1, where=moved, tables=tier_tables)
+        conn.executemany("INSERT OR REPLACE INTO district_tiers VALUES (?, ?)", changed)
+        _apply(conn, "pmjdy_accounts", 1, where=moved, tables=tier_tables)
+        conn.execute("DROP TABLE temp._tier_changes")
+        return len(changed)
+    return _transaction(engine or get_engine(), work)
+
+
+def _means(df, keys):
+    out = pd.DataFrame({
+        "Districts": df["districts"].astype(int),
+        "Total_Accounts_Lakh": df["accounts_lakh"],
+        "Avg_Zero_Balance": df["zero_balance_sum"] / df["districts"],
+        "Avg_Balance_INR": df["balance_sum"] / df["districts"],
+        "Avg_Outlets": df["outlets_sum"] / df["outlets_n"].where(df["outlets_n"] > 0),
+        "Avg_MGNREGA": df["mgnrega_sum"] / df["mgnrega_n"].where(df["mgnrega_n"] > 0),
+    })
+    out.index = pd.MultiIndex.from_frame(df[keys]) if len(keys) > 1 else pd.Index(df[keys[0]])
+    return out.round(2)
+
+
+def read_summary(kind, engine=None):
+    """One summary table ("state", "area_type", "tier", "region" or "cell") with per-district means"""
+    table = KINDS[kind]
+    keys = SUMMARIES[table]
+    with (engine or read_engine()).connect() as conn:
+        df = pd.read_sql(text(f"SELECT * FROM {table} ORDER BY {', '.join(keys)}"), conn)
+    return _means(df, keys)
+
+
+def summarize(by, engine=None, **filters):
+    """Roll summary_cell up to the keys in by, keeping cells whose keys are in the filter lists,
+    e.g. summarize("area_type", state=[...], intervention_tier=[...])"""
+    keys = [by] if isinstance(by, str) else list(by)
+    clauses, params = [], {}
+    for column, values in filters.items():
+        if column not in SUMMARIES["summary_cell"]:
+            raise ValueError(f"summary_cell has no {column} column")
+        names = [f"{column}_{i}" for i in range(len(values))]
+        params.update(zip(names, values))
+        clauses.append(f"{column} IN ({', '.join(':' + n for n in names)})" if names else "0")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sums = ", ".join(f"SUM({m}) AS {m}" for m in MEASURES)
+    sql = f"SELECT {', '.join(keys)}, {sums} FROM summary_cell {where} GROUP BY {', '.join(keys)} ORDER BY {', '.join(keys)}"
+    with (engine or read_engine()).connect() as conn:
+        df = pd.read_sql(text(sql), conn, params=params)
+    return _means(df, keys)
+
+
+def district_tiers(engine=None):
+    """{(state, district): tier} as last published by analysis.py, or None if tiers were never assigned"""
+    with (engine or read_engine()).connect() as conn:
+        if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'district_tiers'")).first() is None:
+            return None
+        rows = conn.execute(text("SELECT p.state, p.district, t.intervention_tier FROM district_tiers t "
+                                 "JOIN pmjdy_accounts p ON p.district_id = t.district_id")).all()
+    return {(state, district): tier for state, district, tier in rows} or None
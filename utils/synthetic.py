@@ -0,0 +1,303 @@
+import json
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.stats import norm
+
+from utils.data_loader import REGION_MAP, load_balance_distribution, load_state_data
+from utils.districts import accounts_column, district_sources, load_district_source
+from utils.sketch import BALANCE_SLABS
+
+# Area-type profiles, from the district sample in analysis.py (mean per area type)
+AREA_PROFILES = {
+    "Urban":      {"share": 0.25, "zero": 0.21, "balance": 1.45, "mgnrega": 37, "outlets": 3.9, "bc_agents": 2.2, "mobile": 52},
+    "Semi-Urban": {"share": 0.30, "zero": 0.31, "balance": 1.00, "mgnrega": 50, "outlets": 2.3, "bc_agents": 1.2, "mobile": 35},
+    "Rural":      {"share": 0.45, "zero": 0.52, "balance": 0.55, "mgnrega": 78, "outlets": 0.8, "bc_agents": 0.4, "mobile": 15},
+}
+# Karnataka's district spread (mean, sd) - the only source with gender and operative splits
+FEMALE_SHARE = (0.562, 0.027)
+OPERATIVE_SHARE = (0.709, 0.087)
+
+SYNTHETIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "synthetic")
+FORMATS = ("csv", "parquet", "sqlite")
+PEOPLE_PER_DISTRICT = 1_800_000
+BLOCKS_PER_DISTRICT = (4, 14)
+FIRST_YEAR, LAST_YEAR = 2014, 2024
+ACCOUNT_COLUMNS = ["Account_ID", "State", "District", "District_ID", "Block_ID", "Area_Type",
+                   "Gender", "Opened_Year", "Balance", "Operative"]
+
+
+def fit_balance_sigma(zero_share):
+    """Lognormal sigma for non-zero balances so that, with zero_share of accounts at 0, the
+    account shares per slab best match data/balance_distribution.csv (counts in crore)"""
+    target = load_balance_distribution()["Pct"].to_numpy() / 100
+    target = target / target.sum()
+    log_edges = np.log([hi for _, _, hi in BALANCE_SLABS[:-1]])
+
+    def error(params):
+        mu, sigma = params
+        cdf = zero_share + (1 - zero_share) * norm.cdf((log_edges - mu) / sigma)
+        shares = np.diff(np.concatenate([[0.0], cdf, [1.0]]))
+        return float(((shares - target) ** 2).sum())
+
+    result = minimize(error, x0=[math.log(1000), 1.5], bounds=[(0, 15), (0.3, 4.0)])
+    return float(result.x[1])
+
+
+class NationalSpec:
+    """States, districts and blocks with every parameter the account generator needs.
+
+    Built deterministically from the seed and the repo's CSVs: real account totals, average
+    balances and population per state; real district names and account splits where a district
+    source exists, population-scaled districts elsewhere.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        rng = np.random.default_rng([seed, 0])
+        sources = district_sources()
+        rows = []
+        for st in load_state_data().itertuples():
+            if st.State in sources:
+                real = load_district_source(st.State)
+                acc_col = accounts_column(st.State, real)
+                names = real["District"].tolist()
+                weights = real[acc_col].fillna(real[acc_col].median()).to_numpy(dtype=np.float64)
+            else:
+                n = max(1, round(st.Population / PEOPLE_PER_DISTRICT))
+                names = [f"{st.State} {i + 1:02d}" for i in range(n)]
+                weights = rng.lognormal(0, 0.5, n)
+            weights = weights / weights.sum()
+            areas = rng.choice(list(AREA_PROFILES), size=len(names), p=[p["share"] for p in AREA_PROFILES.values()])
+            for name, w, area in zip(names, weights, areas):
+                rows.append({"state": st.State, "district": name, "region": REGION_MAP.get(st.State, "Other"),
+                             "area_type": area, "accounts": w * st.Accounts, "population": w * st.Population,
+                             "state_avg_balance": st.Avg_Balance_INR})
+        d = pd.DataFrame(rows)
+        d.insert(0, "district_id", np.arange(1, len(d) + 1))
+        n = len(d)
+        profile = lambda key: d["area_type"].map({a: p[key] for a, p in AREA_PROFILES.items()}).to_numpy(dtype=np.float64)
+
+        d["zero_rate"] = np.clip(profile("zero") + rng.normal(0, 0.05, n), 0.02, 0.9)
+        d["female_share"] = np.clip(rng.normal(*FEMALE_SHARE, n), 0.4, 0.7)
+        d["operative_share"] = np.clip(rng.normal(*OPERATIVE_SHARE, n), 0.4, 0.97)
+        self.sigma = fit_balance_sigma(float(np.average(d["zero_rate"], weights=d["accounts"])))
+        # Expected balance over all of a district's accounts (zeros included) averages out to its
+        # state's real average: area multipliers are normalised by account weight within each state
+        mult = pd.Series(profile("balance") * rng.lognormal(0, 0.15, n))
+        mult /= (mult * d["accounts"]).groupby(d["state"]).transform("sum") / d.groupby("state")["accounts"].transform("sum")
+        mean_positive = d["state_avg_balance"] * mult / (1 - d["zero_rate"])
+        d["mu"] = np.log(mean_positive) - self.sigma ** 2 / 2
+        for key in ("mgnrega", "outlets", "bc_agents", "mobile"):
+            d[key] = profile(key) * rng.lognormal(0, 0.15, n)
+        d["blocks"] = rng.integers(BLOCKS_PER_DISTRICT[0], BLOCKS_PER_DISTRICT[1] + 1, n)
+        self.districts = d
+
+        self.district_cdf = np.cumsum(d["accounts"].to_numpy() / d["accounts"].sum())
+        self.district_cdf[-1] = 1.0
+        # Block cdf laid out as district_index + within-district cdf, so one searchsorted of
+        # (district_index + u) lands in a block of that district
+        self.block_district = np.repeat(np.arange(n), d["blocks"].to_numpy())
+        self.block_cdf = np.concatenate([i + np.cumsum(rng.dirichlet(np.full(k, 2.0)))
+                                         for i, k in enumerate(d["blocks"].to_numpy())])
+        self.block_cdf[np.cumsum(d["blocks"].to_numpy()) - 1] = np.arange(1, n + 1)
+
+        # Category codes so account chunks carry compact categoricals
+        self._state_codes, self._states = pd.factorize(d["state"])
+        self._district_codes, self._district_names = pd.factorize(d["district"])
+        self._area_codes, self._areas = pd.factorize(d["area_type"])
+        self._zero = d["zero_rate"].to_numpy()
+        self._mu = d["mu"].to_numpy()
+        self._female = d["female_share"].to_numpy()
+        self._operative = d["operative_share"].to_numpy()
+
+    def district_table(self):
+        """Districts in the column style of analysis.py's pmjdy_accounts table"""
+        d = self.districts
+        return pd.DataFrame({
+            "district_id": d["district_id"], "district": d["district"], "state": d["state"], "region": d["region"],
+            "area_type": d["area_type"], "population": d["population"].round().astype(np.int64), "blocks": d["blocks"],
+        })
+
+    def block_table(self):
+        out = pd.DataFrame({"block_id": np.arange(1, len(self.block_district) + 1),
+                            "district_id": self.districts["district_id"].to_numpy()[self.block_district]})
+        out["block"] = "Block " + out.groupby("district_id").cumcount().add(1).astype(str).str.zfill(2)
+        return out
+
+    def infrastructure(self):
+        """Same columns as analysis.py's infrastructure table"""
+        d = self.districts
+        return pd.DataFrame({
+            "district_id": d["district_id"],
+            "mgnrega_coverage_pct": d["mgnrega"].clip(5, 98).round(0).astype(np.int64),
+            "banking_outlets_per_1000": d["outlets"].round(2),
+            "bc_agents_per_1000": d["bc_agents"].round(2),
+            "mobile_banking_pct": d["mobile"].clip(2, 95).round(0).astype(np.int64),
+        })
+
+    def monthly(self, accounts, months=24, end="2024-06"):
+        """District x month snapshots ending at `end`, scaled to `accounts` in the last month"""
+        rng = np.random.default_rng([self.seed, 1])
+        d = self.districts
+        growth = rng.normal(0.06, 0.03, len(d)) / 12
+        last = d["accounts"].to_numpy() / d["accounts"].sum() * accounts
+        frames = []
+        for k, period in enumerate(pd.period_range(end=end, periods=months, freq="M")):
+            back = months - 1 - k
+            acc = last / (1 + growth) ** back
+            zero = np.clip(self._zero * (1 + 0.004 * back), 0, 0.95)
+            mean_balance = np.exp(self._mu + self.sigma ** 2 / 2) * (1 - zero) / 1.004 ** back
+            frames.append(pd.DataFrame({
+                "month": str(period), "district_id": d["district_id"].to_numpy(),
+                "accounts": np.round(acc).astype(np.int64),
+                "deposit_crore": np.round(acc * mean_balance / 1e7, 3),
+                "zero_balance_pct": np.round(zero * 100, 2),
+                "operative_pct": np.round(self._operative * 100, 2),
+                "female_pct": np.round(self._female * 100, 2),
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def accounts(self, start, rows, chunk):
+        """Account records with ids start .. start+rows-1. Each chunk has its own seeded stream,
+        so chunks can be generated in any order or in parallel and still reproduce exactly."""
+        rng = np.random.default_rng([self.seed, 2, chunk])
+        n = len(self.districts)
+        di = np.searchsorted(self.district_cdf, rng.random(rows), side="right").clip(0, n - 1)
+        bi = np.searchsorted(self.block_cdf, di + rng.random(rows), side="right").clip(0, len(self.block_cdf) - 1)
+        zero = rng.random(rows) < self._zero[di]
+        balance = np.where(zero, 0.0, np.round(rng.lognormal(self._mu[di], self.sigma), 2))
+        female = rng.random(rows) < self._female[di]
+        operative = rng.random(rows) < self._operative[di] * np.where(zero, 0.75, 1.08)
+        # About a third opened in the 2014-15 enrolment drive, the rest spread over later years
+        opened = np.where(rng.random(rows) < 0.35, FIRST_YEAR, rng.integers(FIRST_YEAR + 1, LAST_YEAR + 1, rows))
+        return pd.DataFrame({
+            "Account_ID": np.arange(start, start + rows, dtype=np.int64),
+            "State": pd.Categorical.from_codes(self._state_codes[di], self._states),
+            "District": pd.Categorical.from_codes(self._district_codes[di], self._district_names),
+            "District_ID": self.districts["district_id"].to_numpy()[di],
+            "Block_ID": bi + 1,
+            "Area_Type": pd.Categorical.from_codes(self._area_codes[di], self._areas),
+            "Gender": pd.Categorical.from_codes(female.astype(np.int8), ["M", "F"]),
+            "Opened_Year": opened.astype(np.int16),
+            "Balance": balance,
+            "Operative": operative,
+        })
+
+
+_worker_spec = None
+
+
+def _init_worker(seed):
+    global _worker_spec
+    _worker_spec = NationalSpec(seed)
+
+
+def _write_part(out_dir, formats, chunk, start, rows):
+    df = _worker_spec.accounts(start, rows, chunk)
+    paths = []
+    if "csv" in formats:
+        paths.append(os.path.join(out_dir, "accounts", f"part-{chunk:05d}.csv"))
+        df.to_csv(paths[-1], index=False)
+    if "parquet" in formats:
+        paths.append(os.path.join(out_dir, "accounts", f"part-{chunk:05d}.parquet"))
+        df.to_parquet(paths[-1], index=False)
+    return paths
+
+
+def _clear_output(out_dir, tables):
+    """Remove everything a previous write_dataset left in out_dir, whatever its formats or size,
+    so a smaller or differently-formatted run never sits next to stale parts"""
+    shutil.rmtree(os.path.join(out_dir, "accounts"), ignore_errors=True)
+    names = [f"{name}.{ext}" for name in tables for ext in ("csv", "parquet")]
+    names += ["synthetic.db", "synthetic.db-wal", "synthetic.db-shm", "manifest.json"]
+    for name in names:
+        path = os.path.join(out_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _chunks(accounts, chunk_rows):
+    return [(i, start, min(chunk_rows, accounts - start)) for i, start in enumerate(range(0, accounts, chunk_rows))]
+
+
+def write_dataset(out_dir=SYNTHETIC_DIR, accounts=1_000_000, formats=FORMATS, seed=0, chunk_rows=1_000_000,
+                  months=24, jobs=None, log=print):
+    """Write states, districts, blocks, infrastructure, monthly snapshots and account records.
+
+    Output of any earlier run in out_dir is removed first. Account parts are independent seeded
+    chunks written by a process pool; the SQLite copy re-generates each chunk in this process
+    (cheaper than shipping frames back) and appends it with utils.db.bulk_load.
+    Returns the manifest, also written to <out_dir>/manifest.json.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats: {sorted(unknown)}")
+    timings = {}
+    t = time.perf_counter()
+    spec = NationalSpec(seed)
+    states = load_state_data()[["State", "Region", "Population", "Accounts", "Deposit_Crore", "Avg_Balance_INR"]]
+    tables = {
+        "states": states,
+        "districts": spec.district_table(),
+        "blocks": spec.block_table(),
+        "infrastructure": spec.infrastructure(),
+        "district_monthly": spec.monthly(accounts, months),
+    }
+    timings["dimensions"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    _clear_output(out_dir, tables)
+    os.makedirs(os.path.join(out_dir, "accounts"), exist_ok=True)
+    for name, df in tables.items():
+        if "csv" in formats:
+            df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+        if "parquet" in formats:
+            df.to_parquet(os.path.join(out_dir, f"{name}.parquet"), index=False)
+    chunks = _chunks(accounts, chunk_rows)
+    files = []
+    file_formats = [f for f in formats if f != "sqlite"]
+    if file_formats:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), initializer=_init_worker, initargs=(seed,)) as pool:
+            futures = [pool.submit(_write_part, out_dir, file_formats, *c) for c in chunks]
+            for done, future in enumerate(futures, 1):
+                files += future.result()
+                log(f"    accounts part {done}/{len(chunks)}")
+    timings["files"] = time.perf_counter() - t
+
+    if "sqlite" in formats:
+        from utils.db import bulk_load, get_engine
+        t = time.perf_counter()
+        path = os.path.join(out_dir, "synthetic.db")
+        engine = get_engine(path)
+        for name, df in tables.items():
+            bulk_load(df, name, engine, mode="replace")
+        for i, start, rows in chunks:
+            df = spec.accounts(start, rows, i)
+            for col in ("State", "District", "Area_Type", "Gender"):
+                df[col] = df[col].astype(str)
+            bulk_load(df, "accounts", engine, mode="replace" if i == 0 else "append")
+            log(f"    sqlite chunk {i + 1}/{len(chunks)}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS idx_accounts_district ON accounts (District_ID)")
+            conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ux_monthly ON district_monthly (month, district_id)")
+        engine.dispose()
+        files.append(path)
+        timings["sqlite"] = time.perf_counter() - t
+
+    manifest = {
+        "seed": seed, "accounts": accounts, "chunk_rows": chunk_rows, "months": months, "formats": list(formats),
+        "districts": len(spec.districts), "blocks": len(spec.block_district), "balance_sigma": round(spec.sigma, 4),
+        "tables": {name: len(df) for name, df in tables.items()},
+        "account_files": sorted(os.path.relpath(f, out_dir) for f in files),
+        "timings": {k: round(v, 2) for k, v in timings.items()},
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest